@@ -1,24 +1,93 @@
 from abc import ABC, abstractmethod
+from array import array as _array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from enum import IntEnum
+from itertools import compress, islice
+from operator import ne
+import random
+import sys
+import threading
 import time
-from typing import Callable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
+# Typecode of the compact buffers holding array values and indices (C int)
+INT_TYPECODE = "i"
 
-@dataclass
+# A set of indices: a range, a list of ranges or any iterable of indices
+Region = Union[range, List[range], Iterable[int]]
+
+
+def int_array(values: Iterable[int] = ()) -> _array:
+    """
+    Pack integers into a compact array('i') buffer.
+    
+    Args:
+        values: Integers to pack
+        
+    Returns:
+        array: 4 bytes per value instead of a pointer plus an int object per value
+    """
+    return _array(INT_TYPECODE, values)
+
+
+@dataclass(slots=True)
 class SortingStats:
     """
     Track statistics for sorting algorithm performance.
     
+    A swap exchanges two elements and also counts as two writes; reads and
+    writes are element accesses to the array being sorted, not to auxiliary
+    buffers. TrackedArray and count() apply these rules for every plugin.
+    
+    The wall-clock duration includes pauses, sleeps and visualization; the
+    *_ns counters split the time a run was actually going into its parts.
+    
     Attributes:
         comparisons (int): Number of comparisons performed
         swaps (int): Number of element swaps performed
         start_time (float): Timestamp when sorting started
         end_time (float): Timestamp when sorting completed
+        reads (int): Number of element reads
+        writes (int): Number of element writes
+        algorithm_ns (int): Nanoseconds spent producing steps, i.e. in the
+            algorithm and the instrumentation inside it
+        callback_ns (int): Nanoseconds spent handling steps in the update
+            callback (diffing, queueing, counting)
+        throttle_ns (int): Nanoseconds spent waiting on purpose, for the speed
+            setting or for a full step queue
     """
     comparisons: int = 0
     swaps: int = 0
     start_time: float = 0.0
     end_time: float = 0.0
+    reads: int = 0
+    writes: int = 0
+    algorithm_ns: int = 0
+    callback_ns: int = 0
+    throttle_ns: int = 0
+    
+    def count(self, op: "SortingOp") -> None:
+        """
+        Add the cost of an operation event to the counters.
+        
+        Args:
+            op: Operation that was applied
+        """
+        kind, a, b = op
+        if kind == OpKind.COMPARE:
+            self.comparisons += 1
+        elif kind == OpKind.SWAP:
+            self.swaps += 1
+            self.writes += 2
+        elif kind == OpKind.WRITE:
+            self.writes += 1
+        elif kind == OpKind.REVERSE:
+            self.swaps += (b - a) // 2
+            self.writes += b - a
+        elif kind == OpKind.ACCESS:
+            self.reads += a
+            self.writes += b
     
     @property
     def duration(self) -> float:
@@ -34,32 +103,1000 @@ class SortingStats:
         return self.end_time - self.start_time
 
 
-@dataclass
 class SortingState:
     """
     Represent the current state of the sorting process for visualization.
     
+    States are slotted and take their arguments as passed, so building one
+    costs no more than the copies the plugin already made. States that are
+    kept around (recordings, keyframes) should be packed with compact(), which
+    moves the array and index lists into array('i') buffers and the sorted
+    indices into half-open (start, end) runs: about 4 bytes per element,
+    however many indices are marked sorted, instead of a pointer per element
+    plus an int object per index.
+    
+    Regions are best passed as range objects: sorted_indices accepts a range or
+    a list of ranges as well as a list of indices, and the active and pivot
+    regions are single ranges, so annotating a step costs O(1) however large
+    the regions are.
+    
     Attributes:
         array (List[int]): Current state of the array being sorted
+            (an array('i') once compacted)
         highlighted_indices (List[int]): Indices of elements to highlight
         compared_indices (List[int]): Indices of elements being compared
         sorted_indices (List[int]): Indices of elements in their final sorted position
+        sorted_runs (List[Tuple[int, int]]): The sorted indices as (start, end) runs
         pivot_index (int): Index of the current pivot element (for algorithms like QuickSort)
         stats (SortingStats): Current statistics of the sorting process
+        active_range (range): Region the algorithm is currently working on, e.g.
+            the partition or the pair of runs being merged
+        pivot_range (range): Elements equal to the pivot, for partitioning schemes
+            that gather them in a band
+    """
+    __slots__ = ("array", "highlighted_indices", "compared_indices", "_sorted",
+                 "pivot_index", "stats", "active_range", "pivot_range")
+    
+    def __init__(self, array: List[int], highlighted_indices: List[int] = None,
+                 compared_indices: List[int] = None, sorted_indices: Region = None,
+                 pivot_index: int = None, stats: SortingStats = None,
+                 active_range: range = None, pivot_range: range = None):
+        self.array = array
+        self.highlighted_indices = highlighted_indices or []
+        self.compared_indices = compared_indices or []
+        self._sorted = sorted_indices or []
+        self.pivot_index = pivot_index
+        self.stats = stats or SortingStats()
+        self.active_range = active_range
+        self.pivot_range = pivot_range
+    
+    @property
+    def compacted(self) -> bool:
+        return isinstance(self._sorted, _array)
+    
+    @property
+    def sorted_indices(self) -> List[int]:
+        if self.compacted or _is_range_list(self._sorted):
+            return [i for start, end in self.sorted_runs for i in range(start, end)]
+        return self._sorted
+    
+    @sorted_indices.setter
+    def sorted_indices(self, indices: Region):
+        self._sorted = self._pack_runs(indices) if self.compacted else indices
+    
+    @property
+    def sorted_runs(self) -> List[Tuple[int, int]]:
+        if self.compacted:
+            flat = self._sorted
+            return list(zip(flat[::2], flat[1::2]))
+        return region_runs(self._sorted)
+    
+    @staticmethod
+    def _pack_runs(indices: Region) -> _array:
+        return int_array(i for run in region_runs(indices) for i in run)
+    
+    def compact(self) -> "SortingState":
+        """
+        Pack the state into array('i') buffers and the sorted indices into runs (O(n)).
+        
+        Returns:
+            SortingState: self, for chaining
+        """
+        if not self.compacted:
+            self._sorted = self._pack_runs(self._sorted)
+        for name in ("array", "highlighted_indices", "compared_indices"):
+            value = getattr(self, name)
+            if not (isinstance(value, _array) and value.typecode == INT_TYPECODE):
+                setattr(self, name, int_array(value))
+        return self
+    
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by this state, in bytes.
+        
+        Counts the state object, its containers and the int objects of its
+        index lists. The stats object is shared between the states of a run,
+        and the int objects of a list array are shared with the array being
+        sorted, so neither is counted.
+        
+        Returns:
+            int: Size of the state in bytes
+        """
+        total = sys.getsizeof(self) + sys.getsizeof(self.array)
+        for indices in (self.highlighted_indices, self.compared_indices, self._sorted):
+            total += sys.getsizeof(indices)
+            if _is_range_list(indices):
+                total += sum(map(sys.getsizeof, indices))
+            elif isinstance(indices, (list, tuple, set, frozenset)):
+                # Ints outside CPython's small-int cache are separate objects
+                total += sum(map(sys.getsizeof, filter(_boxed, indices)))
+        for region in (self.active_range, self.pivot_range):
+            if region is not None:
+                total += sys.getsizeof(region)
+        return total
+
+
+def _boxed(i: int) -> bool:
+    return not -5 <= i <= 256
+
+
+def _is_range_list(region) -> bool:
+    return isinstance(region, list) and bool(region) and isinstance(region[0], range)
+
+
+def region_runs(region: Region) -> List[Tuple[int, int]]:
+    """
+    Normalize a region annotation into sorted, disjoint half-open (start, end) runs.
+    
+    Ranges are taken as-is instead of being expanded into indices and collapsed
+    again, so a range or a short list of ranges costs O(1) whatever its length.
+    
+    Args:
+        region: None, a range, a list of ranges or an iterable of indices
+        
+    Returns:
+        List[Tuple[int, int]]: Runs in ascending order, adjacent runs merged
+    """
+    if not region:
+        return []
+    if isinstance(region, range) and region.step == 1:
+        return [(region.start, region.stop)]
+    if _is_range_list(region):
+        runs = IntervalSet()
+        for r in region:
+            if r.step != 1:
+                return index_runs(i for r in region for i in r)
+            runs.add(r.start, r.stop)
+        return runs.runs
+    return index_runs(region)
+
+
+class IntervalSet:
+    """
+    A set of indices stored as sorted, disjoint half-open runs.
+    
+    Marking or unmarking a range costs O(log r + r) for r runs instead of
+    O(b - a), and membership is a binary search, so large sorted regions cost
+    no more than small ones.
+    """
+    __slots__ = ("_starts", "_ends")
+    
+    def __init__(self, runs: Iterable[Tuple[int, int]] = ()):
+        self._starts = []
+        self._ends = []
+        for start, end in runs:
+            self.add(start, end)
+    
+    @property
+    def runs(self) -> List[Tuple[int, int]]:
+        """The runs as (start, end) pairs in ascending order."""
+        return list(zip(self._starts, self._ends))
+    
+    def add(self, start: int, end: int) -> None:
+        """Add the indices start..end-1, merging with overlapping or adjacent runs."""
+        if start >= end:
+            return
+        starts, ends = self._starts, self._ends
+        i = bisect_left(ends, start)
+        j = bisect_right(starts, end)
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+        starts[i:j] = [start]
+        ends[i:j] = [end]
+    
+    def discard(self, start: int, end: int) -> None:
+        """Remove the indices start..end-1, splitting a run if needed."""
+        if start >= end:
+            return
+        starts, ends = self._starts, self._ends
+        i = bisect_right(ends, start)
+        j = bisect_left(starts, end)
+        if i >= j:
+            return
+        new_starts, new_ends = [], []
+        if starts[i] < start:
+            new_starts.append(starts[i])
+            new_ends.append(start)
+        if ends[j - 1] > end:
+            new_starts.append(end)
+            new_ends.append(ends[j - 1])
+        starts[i:j] = new_starts
+        ends[i:j] = new_ends
+    
+    def clear(self) -> None:
+        self._starts.clear()
+        self._ends.clear()
+    
+    def overlapping(self, lo: int, hi: int) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over the runs clipped to lo..hi-1.
+        
+        Args:
+            lo: First index
+            hi: End index (exclusive)
+            
+        Yields:
+            Tuple[int, int]: Non-empty (start, end) runs within [lo, hi)
+        """
+        starts, ends = self._starts, self._ends
+        for k in range(bisect_right(ends, lo), len(starts)):
+            if starts[k] >= hi:
+                break
+            yield max(starts[k], lo), min(ends[k], hi)
+    
+    def difference(self, other: "IntervalSet") -> List[Tuple[int, int]]:
+        """
+        Get the runs of indices in this set but not in another one.
+        
+        Args:
+            other: Indices to leave out
+            
+        Returns:
+            List[Tuple[int, int]]: Runs in ascending order
+        """
+        result = IntervalSet()
+        result._starts = self._starts[:]
+        result._ends = self._ends[:]
+        for start, end in zip(other._starts, other._ends):
+            result.discard(start, end)
+        return result.runs
+    
+    def __contains__(self, index: int) -> bool:
+        k = bisect_right(self._starts, index) - 1
+        return k >= 0 and index < self._ends[k]
+    
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end)
+    
+    def __len__(self) -> int:
+        return sum(map(int.__sub__, self._ends, self._starts))
+    
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+
+class OpKind(IntEnum):
+    """
+    Kinds of operation events a sorting run can emit.
+    
+    Every operation carries two integer operands (a, b) whose meaning depends
+    on the kind. Ranges are half-open, i.e. [a, b).
+    """
+    COMPARE = 0        # a, b: indices being compared
+    SWAP = 1           # a, b: indices being swapped
+    WRITE = 2          # a: index, b: value written to it
+    REVERSE = 3        # a, b: range reversed in place
+    MARK_SORTED = 4    # a, b: range now in its final position
+    UNMARK_SORTED = 5  # a, b: range no longer marked as sorted
+    HIGHLIGHT = 6      # a: index to highlight for the current step
+    PIVOT = 7          # a: index of the current pivot
+    ACTIVE = 8         # a, b: range being worked on, until the next ACTIVE (empty clears)
+    PIVOT_RANGE = 9    # a, b: range of elements equal to the pivot, for the current step
+    ACCESS = 10        # a, b: reads and writes with no event of their own (counters only)
+
+
+# Builds a SortingOp from a (kind, a, b) tuple without going through the
+# generated __new__; TrackedArray creates one per comparison
+_new_op = tuple.__new__
+
+# Plain ints for the hot loops; comparing them skips the enum attribute lookups
+_COMPARE, _SWAP, _WRITE, _ACCESS = (int(kind) for kind in
+                                    (OpKind.COMPARE, OpKind.SWAP, OpKind.WRITE, OpKind.ACCESS))
+
+
+class SortingOp(NamedTuple):
+    """
+    A single, fixed-size operation event.
+    
+    Applying an operation to a copy of the array costs O(1) (O(b - a) for
+    REVERSE, O(log r) for the sorted-range markers), independent of the array size.
+    
+    Attributes:
+        kind (OpKind): Kind of operation
+        a (int): First operand
+        b (int): Second operand
+    """
+    kind: OpKind
+    a: int
+    b: int = 0
+    
+    @classmethod
+    def compare(cls, i: int, j: int) -> "SortingOp":
+        return cls(OpKind.COMPARE, i, j)
+    
+    @classmethod
+    def swap(cls, i: int, j: int) -> "SortingOp":
+        return cls(OpKind.SWAP, i, j)
+    
+    @classmethod
+    def write(cls, i: int, value: int) -> "SortingOp":
+        return cls(OpKind.WRITE, i, value)
+    
+    @classmethod
+    def reverse_range(cls, start: int, end: int) -> "SortingOp":
+        return cls(OpKind.REVERSE, start, end)
+    
+    @classmethod
+    def mark_sorted(cls, start: int, end: int) -> "SortingOp":
+        return cls(OpKind.MARK_SORTED, start, end)
+    
+    @classmethod
+    def unmark_sorted(cls, start: int, end: int) -> "SortingOp":
+        return cls(OpKind.UNMARK_SORTED, start, end)
+    
+    @classmethod
+    def highlight(cls, i: int) -> "SortingOp":
+        return cls(OpKind.HIGHLIGHT, i)
+    
+    @classmethod
+    def pivot(cls, i: int) -> "SortingOp":
+        return cls(OpKind.PIVOT, i)
+    
+    @classmethod
+    def active(cls, start: int, end: int) -> "SortingOp":
+        return cls(OpKind.ACTIVE, start, end)
+    
+    @classmethod
+    def pivot_range(cls, start: int, end: int) -> "SortingOp":
+        return cls(OpKind.PIVOT_RANGE, start, end)
+    
+    @classmethod
+    def access(cls, reads: int, writes: int = 0) -> "SortingOp":
+        return cls(OpKind.ACCESS, reads, writes)
+
+
+class SortingStep(NamedTuple):
+    """
+    One visualization step: the operations emitted by a single update callback
+    together with the running counters at that point.
+    
+    A step can also be a keyframe carrying the complete state after its
+    operations, so a consumer that missed earlier steps can resynchronize
+    from it instead of replaying them.
+    
+    Attributes:
+        ops (List[SortingOp]): Operations to apply, in order
+        comparisons (int): Total comparisons so far
+        swaps (int): Total swaps so far
+        keyframe (SortingState): Full state after this step, or None for a plain delta
+        reads (int): Total element reads so far
+        writes (int): Total element writes so far
     """
-    array: List[int]
-    highlighted_indices: List[int] = None
-    compared_indices: List[int] = None
-    sorted_indices: List[int] = None
-    pivot_index: int = None
-    stats: SortingStats = None
+    ops: List[SortingOp]
+    comparisons: int
+    swaps: int
+    keyframe: Optional[SortingState] = None
+    reads: int = 0
+    writes: int = 0
+
+
+# Anything a plugin may pass to its update callback
+SortingEvent = Union[SortingState, SortingOp, List[SortingOp]]
+
+
+class StateMirror:
+    """
+    A private copy of the array being sorted, kept in sync by applying operation events.
+    
+    It exposes the same attributes as SortingState, so it can be drawn directly,
+    but the sorted indices are an IntervalSet and transient marks (highlighted,
+    compared, pivot) only live for one step.
+    
+    Attributes:
+        array (List[int]): Current contents of the mirrored array, a list or an
+            array('i') depending on what the mirror was created from
+        highlighted_indices (List[int]): Indices highlighted in the current step
+        compared_indices (List[int]): Indices compared in the current step
+        sorted_runs (IntervalSet): Indices in their final sorted position
+        pivot_index (int): Current pivot, if any
+        stats (SortingStats): Counters accumulated from the applied operations
+        active_range (range): Region being worked on, kept until the next ACTIVE op
+        pivot_range (range): Elements equal to the pivot in the current step
+    """
+    __slots__ = ("array", "highlighted_indices", "compared_indices", "sorted_runs",
+                 "pivot_index", "stats", "active_range", "pivot_range")
+    
+    def __init__(self, array: Iterable[int], stats: SortingStats = None):
+        # Copying keeps the representation: a list shares its int objects, an
+        # array('i') copy is a flat memcpy, while converting between them is not
+        self.array = array[:] if isinstance(array, _array) else list(array)
+        self.highlighted_indices = []
+        self.compared_indices = []
+        self.sorted_runs = IntervalSet()
+        self.pivot_index = None
+        self.stats = stats or SortingStats()
+        self.active_range = None
+        self.pivot_range = None
+    
+    def begin_step(self) -> None:
+        """Clear the transient marks left by the previous step."""
+        self.highlighted_indices = []
+        self.compared_indices = []
+        self.pivot_index = None
+        self.pivot_range = None
+    
+    def apply(self, op: SortingOp, count: bool = True) -> None:
+        """
+        Apply a single operation to the mirrored array.
+        
+        Args:
+            op: Operation to apply
+            count: Whether the operation should be added to the statistics
+        """
+        kind, a, b = op
+        arr = self.array
+        if count:
+            self.stats.count(op)
+        if kind == OpKind.COMPARE:
+            self.compared_indices += (a, b)
+        elif kind == OpKind.SWAP:
+            arr[a], arr[b] = arr[b], arr[a]
+            self.highlighted_indices += (a, b)
+        elif kind == OpKind.WRITE:
+            arr[a] = b
+            self.highlighted_indices.append(a)
+        elif kind == OpKind.REVERSE:
+            arr[a:b] = arr[a:b][::-1]
+            if b > a:
+                self.highlighted_indices += (a, b - 1)
+        elif kind == OpKind.MARK_SORTED:
+            self.sorted_runs.add(a, b)
+        elif kind == OpKind.UNMARK_SORTED:
+            self.sorted_runs.discard(a, b)
+        elif kind == OpKind.HIGHLIGHT:
+            self.highlighted_indices.append(a)
+        elif kind == OpKind.PIVOT:
+            self.pivot_index = a
+        elif kind == OpKind.ACTIVE:
+            self.active_range = range(a, b) if b > a else None
+        elif kind == OpKind.PIVOT_RANGE:
+            self.pivot_range = range(a, b) if b > a else None
+    
+    def apply_step(self, ops: Iterable[SortingOp], count: bool = True,
+                   overwritten: Optional[List[int]] = None) -> None:
+        """
+        Start a new step and apply its operations.
+        
+        Args:
+            ops: Operations belonging to the step
+            count: Whether the operations should be added to the statistics
+            overwritten: If given, the value each WRITE replaces is appended to
+                it, so the step can be undone
+        """
+        self.begin_step()
+        # Batched steps carry thousands of operations, so the common kinds are
+        # handled inline and counted locally; everything else goes through apply()
+        arr = self.array
+        compared = self.compared_indices
+        highlighted = self.highlighted_indices
+        apply = self.apply
+        comparisons = swaps = reads = writes = 0
+        for op in ops:
+            kind = op[0]
+            if kind == _ACCESS:
+                reads += op[1]
+                writes += op[2]
+            elif kind == _COMPARE:
+                comparisons += 1
+                compared += op[1:]
+            elif kind == _SWAP:
+                _, a, b = op
+                arr[a], arr[b] = arr[b], arr[a]
+                highlighted += op[1:]
+                swaps += 1
+                writes += 2
+            elif kind == _WRITE:
+                if overwritten is not None:
+                    overwritten.append(arr[op[1]])
+                arr[op[1]] = op[2]
+                highlighted.append(op[1])
+                writes += 1
+            else:
+                apply(op, count)
+        if count:
+            stats = self.stats
+            stats.comparisons += comparisons
+            stats.swaps += swaps
+            stats.reads += reads
+            stats.writes += writes
+    
+    def load_regions(self, state: SortingState) -> None:
+        """
+        Take over the sorted, active and pivot regions of a state.
+        
+        Args:
+            state: State whose region annotations replace the mirror's
+        """
+        self.sorted_runs = IntervalSet(state.sorted_runs)
+        self.active_range = state.active_range
+        self.pivot_range = state.pivot_range
+    
+    def snapshot(self) -> SortingState:
+        """
+        Materialize the mirror as a standalone SortingState (O(n)).
+        
+        Returns:
+            SortingState: Copy of the current state
+        """
+        return SortingState(
+            array=self.array[:],
+            highlighted_indices=self.highlighted_indices,
+            compared_indices=self.compared_indices,
+            sorted_indices=[range(start, end) for start, end in self.sorted_runs.runs],
+            pivot_index=self.pivot_index,
+            stats=self.stats,
+            active_range=self.active_range,
+            pivot_range=self.pivot_range
+        )
+
+
+def index_runs(indices: Iterable[int]) -> List[tuple]:
+    """
+    Collapse indices into half-open (start, end) runs of consecutive values.
     
-    def __post_init__(self):
-        """Initialize default values for optional attributes."""
-        self.highlighted_indices = self.highlighted_indices or []
-        self.compared_indices = self.compared_indices or []
-        self.sorted_indices = self.sorted_indices or []
-        self.stats = self.stats or SortingStats()
+    Args:
+        indices: Indices to collapse
+        
+    Returns:
+        List[tuple]: Sorted list of (start, end) pairs
+    """
+    unique = indices if isinstance(indices, (set, frozenset)) else set(indices)
+    if not unique:
+        return []
+    # Common case: one contiguous block, found without sorting
+    first, last = min(unique), max(unique)
+    if last - first + 1 == len(unique):
+        return [(first, last + 1)]
+    ordered = sorted(unique)
+    # Positions where the next index does not continue the current run
+    breaks = list(compress(range(1, len(ordered)),
+                           map(ne, islice(ordered, 1, None), map((1).__add__, ordered))))
+    starts = [0] + breaks
+    ends = breaks + [len(ordered)]
+    return [(ordered[s], ordered[e - 1] + 1) for s, e in zip(starts, ends)]
+
+
+class OperationAdapter:
+    """
+    Normalize whatever a plugin passes to its update callback into operation events.
+    
+    Native events (a SortingOp or a list of them) are passed through. Full
+    SortingState snapshots from existing plugins are diffed against the adapter's
+    own mirror and turned into the equivalent WRITE and marker operations, so
+    everything downstream only ever handles operations.
+    
+    Attributes:
+        mirror (StateMirror): The adapter's copy of the array being sorted
+    """
+    
+    def __init__(self, array: List[int]):
+        self.mirror = StateMirror(array)
+    
+    def __call__(self, event: SortingEvent,
+                 overwritten: Optional[List[int]] = None) -> List[SortingOp]:
+        """
+        Convert an update callback payload into a list of operations.
+        
+        Args:
+            event: SortingOp, list of SortingOp or legacy SortingState
+            overwritten: If given, receives the values replaced by WRITE operations
+                (see StateMirror.apply_step)
+            
+        Returns:
+            List[SortingOp]: Operations making up this step, already applied to the mirror
+        """
+        if isinstance(event, SortingState):
+            return self._from_state(event, overwritten)
+        if isinstance(event, SortingOp):
+            ops = [event]
+        else:
+            # A batch is never touched again by its producer, so it needs no copy
+            ops = event if isinstance(event, EventBatch) else list(event)
+        self.mirror.apply_step(ops, overwritten=overwritten)
+        return ops
+    
+    def _from_state(self, state: SortingState,
+                    overwritten: Optional[List[int]] = None) -> List[SortingOp]:
+        """
+        Diff a legacy SortingState against the mirror.
+        
+        Args:
+            state: Snapshot produced by a plugin
+            overwritten: If given, receives the values replaced by WRITE operations
+            
+        Returns:
+            List[SortingOp]: Operations that turn the mirror into the snapshot
+        """
+        mirror = self.mirror
+        ops = []
+        
+        if state.array != mirror.array:
+            # Locate the changed indices at C speed; only those become Python-level ops
+            new_array = state.array
+            ops.extend(SortingOp.write(i, new_array[i])
+                       for i in compress(range(len(new_array)), map(ne, mirror.array, new_array)))
+        
+        # Regions are compared run by run, so range annotations diff in O(runs)
+        runs = state.sorted_runs
+        if runs != mirror.sorted_runs.runs:
+            new_sorted = IntervalSet(runs)
+            for start, end in mirror.sorted_runs.difference(new_sorted):
+                ops.append(SortingOp.unmark_sorted(start, end))
+            for start, end in new_sorted.difference(mirror.sorted_runs):
+                ops.append(SortingOp.mark_sorted(start, end))
+        active = state.active_range or None
+        if active != mirror.active_range:
+            ops.append(SortingOp.active(active.start, active.stop) if active
+                       else SortingOp.active(0, 0))
+        if state.pivot_range:
+            ops.append(SortingOp.pivot_range(state.pivot_range.start, state.pivot_range.stop))
+        
+        compared = state.compared_indices
+        for k in range(0, len(compared), 2):
+            ops.append(SortingOp.compare(compared[k], compared[min(k + 1, len(compared) - 1)]))
+        ops.extend(SortingOp.highlight(i) for i in state.highlighted_indices)
+        if state.pivot_index is not None:
+            ops.append(SortingOp.pivot(state.pivot_index))
+        
+        # The plugin keeps its own counters, so the diff is not counted again
+        mirror.apply_step(ops, count=False, overwritten=overwritten)
+        mirror.stats.comparisons = state.stats.comparisons
+        mirror.stats.swaps = state.stats.swaps
+        mirror.stats.reads = state.stats.reads
+        mirror.stats.writes = state.stats.writes
+        mirror.stats.start_time = state.stats.start_time
+        mirror.stats.end_time = state.stats.end_time
+        return ops
+    
+    def step(self, event: SortingEvent) -> SortingStep:
+        """
+        Convert a callback payload into a SortingStep carrying the current counters.
+        
+        Args:
+            event: SortingOp, list of SortingOp or legacy SortingState
+            
+        Returns:
+            SortingStep: Operations plus the counters after applying them
+        """
+        ops = self(event)
+        stats = self.mirror.stats
+        return SortingStep(ops, stats.comparisons, stats.swaps,
+                           reads=stats.reads, writes=stats.writes)
+
+
+class TrackedArray:
+    """
+    Array wrapper that counts comparisons, reads, writes and swaps as a plugin sorts it.
+    
+    Plugins sort the wrapper instead of the list: indexing, comparisons, swaps
+    and reversals go through it, so every plugin is counted by the same rules
+    (see SortingStats) without any bookkeeping of its own. The list is sorted
+    in place.
+    
+    With an emit callback, usually the plugin's update_callback, every
+    comparison, swap, write and reversal is also reported as a SortingOp, and
+    the reads since the previous event ride along as an ACCESS op, so whatever
+    applies the events counts exactly what the wrapper counted.
+    
+    Attributes:
+        data (List[int]): The list being sorted
+        stats (SortingStats): Counters for the accesses made through the wrapper
+        emit (Callable): Receives the operation events, or None to only count
+        marks (Tuple[SortingOp, ...]): Visualization-only operations sent along
+            with every event, so transient marks such as a PIVOT_RANGE stay
+            visible on each step until the plugin replaces them
+    """
+    __slots__ = ("data", "stats", "emit", "marks", "_reported")
+    
+    def __init__(self, data: List[int], emit: Optional[Callable[[SortingEvent], None]] = None,
+                 stats: SortingStats = None):
+        """
+        Args:
+            data: List to sort in place
+            emit: Called with the operation events, or None
+            stats: Counters to add to; a new SortingStats starting now by default
+        """
+        self.data = data
+        self.emit = emit
+        self.stats = stats or SortingStats(start_time=time.time())
+        self.marks = ()
+        # Reads already reported through emit
+        self._reported = self.stats.reads
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        value = self.data[index]
+        self.stats.reads += len(value) if isinstance(index, slice) else 1
+        return value
+    
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        data = self.data
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(data)))
+            values = list(value)
+            if len(values) != len(indices):
+                raise ValueError("TrackedArray cannot change its length")
+            data[index] = values
+            self.stats.writes += len(values)
+            if self.emit and values:
+                self._send([_new_op(SortingOp, (OpKind.WRITE, i, v))
+                            for i, v in zip(indices, values)])
+            return
+        data[index] = value
+        self.stats.writes += 1
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.WRITE, index % len(data), value)))
+    
+    def compare(self, i: int, j: int) -> int:
+        """
+        Compare the elements at two indices.
+        
+        Returns:
+            int: Negative, zero or positive as arr[i] is less than, equal to or
+            greater than arr[j]
+        """
+        data = self.data
+        a, b = data[i], data[j]
+        stats = self.stats
+        stats.comparisons += 1
+        stats.reads += 2
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.COMPARE, i, j)))
+        return (a > b) - (a < b)
+    
+    def compare_value(self, i: int, value: int) -> int:
+        """
+        Compare an element with a value held outside the array, e.g. a key or a pivot.
+        
+        Returns:
+            int: Negative, zero or positive as arr[i] is less than, equal to or
+            greater than value
+        """
+        a = self.data[i]
+        stats = self.stats
+        stats.comparisons += 1
+        stats.reads += 1
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.COMPARE, i, i)))
+        return (a > value) - (a < value)
+    
+    def compare_values(self, a: int, b: int, i: int, j: int) -> int:
+        """
+        Compare two values held outside the array, e.g. in a merge buffer.
+        
+        Args:
+            a: First value
+            b: Second value
+            i: Index shown as compared for a
+            j: Index shown as compared for b
+            
+        Returns:
+            int: Negative, zero or positive as a is less than, equal to or greater than b
+        """
+        self.stats.comparisons += 1
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.COMPARE, i, j)))
+        return (a > b) - (a < b)
+    
+    def swap(self, i: int, j: int) -> None:
+        """Exchange the elements at two indices."""
+        data = self.data
+        data[i], data[j] = data[j], data[i]
+        stats = self.stats
+        stats.swaps += 1
+        stats.reads += 2
+        stats.writes += 2
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.SWAP, i, j)))
+    
+    def reverse(self, start: int, end: int) -> None:
+        """Reverse the elements start..end-1 in place."""
+        data = self.data
+        data[start:end] = data[start:end][::-1]
+        length = max(0, end - start)
+        stats = self.stats
+        stats.swaps += length // 2
+        stats.reads += length
+        stats.writes += length
+        if self.emit:
+            self._send(_new_op(SortingOp, (OpKind.REVERSE, start, end)))
+    
+    def annotate(self, *ops: SortingOp) -> None:
+        """
+        Report visualization-only operations (sorted, active and pivot marks) as one step.
+        
+        Args:
+            ops: Operations to report; they are not counted
+        """
+        if self.emit and ops:
+            self._send(list(ops) if len(ops) > 1 else ops[0])
+    
+    def flush(self) -> None:
+        """Report reads made since the last event, e.g. before the sort returns."""
+        if self.emit and self.stats.reads != self._reported:
+            self._send([])
+    
+    def _send(self, event: Union[SortingOp, List[SortingOp]]) -> None:
+        reads = self.stats.reads - self._reported
+        if reads:
+            self._reported += reads
+            access = _new_op(SortingOp, (OpKind.ACCESS, reads, 0))
+            event = [access, *event] if event.__class__ is list else [access, event]
+        if self.marks:
+            event = [*event, *self.marks] if event.__class__ is list else [event, *self.marks]
+        self.emit(event)
+
+
+class SortCancelled(BaseException):
+    """
+    Raised inside a callback-based sort whose steps() generator was closed.
+    
+    Like GeneratorExit it is not an Exception, so a plugin's own
+    ``except Exception:`` handlers do not swallow it.
+    """
+
+
+class EventBatch(list):
+    """
+    The operations of several consecutive events, merged into one step by callback_steps().
+    
+    Attributes:
+        ends (List[int]): Number of operations in the batch up to the end of
+            each merged event, so event boundaries survive the merge
+    """
+    __slots__ = ("ends",)
+    
+    def __init__(self):
+        super().__init__()
+        self.ends = []
+    
+    @property
+    def events(self) -> int:
+        """Number of update callback events merged into the batch."""
+        return len(self.ends)
+
+
+def callback_steps(sort: Callable[[List[int], Callable[[SortingEvent], None]], None],
+                   arr: List[int]) -> Iterator[SortingEvent]:
+    """
+    Turn a callback-based sort into a generator of the events it reports.
+    
+    The sort runs on a helper thread that is parked inside its update callback
+    until the consumer asks for the next event, so the two sides never run at
+    the same time and the sort only advances as fast as it is pulled. Closing
+    the generator raises SortCancelled from the parked callback, which unwinds
+    the sort within one step. Exceptions raised by the sort are re-raised to
+    the consumer.
+    
+    Handing a step over between the threads costs far more than producing an
+    event, so the consumer can ask for several events per step by sending
+    the number it wants with generator.send(). Up to that many consecutive
+    operation events are then merged into one EventBatch; SortingState
+    snapshots are always yielded on their own. The limit stays in effect
+    until another one is sent; next() keeps it at one event per step.
+    
+    Args:
+        sort: Function with the signature of SortingAlgorithm.sort
+        arr: Array to sort in place
+        
+    Yields:
+        SortingEvent: Each payload the sort passes to its update callback, or
+        an EventBatch of several of them
+    """
+    produced = threading.Semaphore(0)
+    resumed = threading.Semaphore(0)
+    box = [None]
+    done = []
+    cancelled = False
+    # Events per step requested by the consumer, and the batch being filled;
+    # the semaphores make sure only one thread touches them at a time
+    limit = 1
+    pending = EventBatch()
+    
+    def hand_off(event: SortingEvent) -> None:
+        # A sort that kept going after the cancellation must not park again:
+        # nobody is left to resume it
+        if cancelled:
+            raise SortCancelled()
+        box[0] = event
+        produced.release()
+        resumed.acquire()
+        if cancelled:
+            raise SortCancelled()
+    
+    def update_callback(event: SortingEvent) -> None:
+        nonlocal pending
+        if limit == 1 and not pending:
+            hand_off(event)
+        elif isinstance(event, SortingState):
+            if pending:
+                batch, pending = pending, EventBatch()
+                hand_off(batch)
+            hand_off(event)
+        else:
+            if isinstance(event, SortingOp):
+                pending.append(event)
+            else:
+                pending.extend(event)
+            pending.ends.append(len(pending))
+            if len(pending.ends) >= limit:
+                batch, pending = pending, EventBatch()
+                hand_off(batch)
+    
+    def run() -> None:
+        resumed.acquire()
+        try:
+            if not cancelled:
+                sort(arr, update_callback)
+                if pending:
+                    hand_off(pending)
+        except SortCancelled:
+            pass
+        except BaseException as e:
+            done.append(e)
+        else:
+            done.append(None)
+        produced.release()
+    
+    thread = threading.Thread(target=run, name="callback-steps", daemon=True)
+    thread.start()
+    try:
+        while True:
+            resumed.release()
+            produced.acquire()
+            if done:
+                if done[0] is not None:
+                    raise done[0]
+                return
+            requested = yield box[0]
+            if requested is not None:
+                limit = max(1, requested)
+    finally:
+        if not done:
+            cancelled = True
+            resumed.release()
+        thread.join()
+
+
+class AlgorithmOption(NamedTuple):
+    """
+    A setting a sorting algorithm accepts, with the values it can take.
+    
+    Attributes:
+        key (str): Keyword argument of the algorithm's constructor
+        label (str): Name shown next to the choices in the GUI
+        choices (tuple): Allowed values; the first one is the default
+    """
+    key: str
+    label: str
+    choices: tuple
+    
+    @property
+    def default(self) -> Any:
+        return self.choices[0]
+    
+    def parse(self, text: str) -> Any:
+        """
+        Find the choice written as text, e.g. on the command line.
+        
+        Args:
+            text: A choice as str() shows it, in any case
+            
+        Returns:
+            The matching choice
+            
+        Raises:
+            ValueError: If text names none of the choices
+        """
+        for choice in self.choices:
+            if str(choice).lower() == text.strip().lower():
+                return choice
+        raise ValueError(f"{self.key} must be one of: {', '.join(map(str, self.choices))}")
 
 
 class SortingAlgorithm(ABC):
@@ -68,7 +1105,34 @@ class SortingAlgorithm(ABC):
     
     This class defines the interface that all sorting algorithms must implement,
     including methods for sorting and properties for algorithm metadata.
+    
+    Attributes:
+        options (Tuple[AlgorithmOption, ...]): Settings the algorithm accepts as
+            keyword arguments; plugins declare them as a class attribute
+        settings (Dict[str, Any]): The value of every option for this instance
+        metrics (Dict[str, Any]): Algorithm-specific measurements of the latest
+            sort (e.g. recursion depth), by snake_case name; plugins fill it in
     """
+    options: Tuple[AlgorithmOption, ...] = ()
+    
+    def __init__(self, **settings):
+        """
+        Args:
+            settings: Values for the declared options; options left out take
+                their default
+        
+        Raises:
+            ValueError: For an unknown option or a value that is not one of its choices
+        """
+        declared = {option.key: option for option in self.options}
+        for key, value in settings.items():
+            if key not in declared:
+                raise ValueError(f"{self.name()} has no option '{key}'")
+            if value not in declared[key].choices:
+                raise ValueError(f"{self.name()}: {value!r} is not a choice for {key}")
+        self.settings: Dict[str, Any] = {option.key: option.default for option in self.options}
+        self.settings.update(settings)
+        self.metrics: Dict[str, Any] = {}
     
     @abstractmethod
     def name(self) -> str:
@@ -81,17 +1145,43 @@ class SortingAlgorithm(ABC):
         pass
     
     @abstractmethod
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def sort(self, arr: List[int],
+             update_callback: Optional[Callable[[SortingEvent], None]]) -> None:
         """
         Sort the input array and provide visualization updates.
         
         Args:
             arr (List[int]): Array to be sorted
-            update_callback (Callable[[SortingState], None]): Function to call with
-                updated sorting state for visualization
+            update_callback (Callable[[SortingEvent], None]): Function to call for
+                every visualization step, either with operation events
+                (a SortingOp or a list of them) or with a full SortingState.
+                None runs the sort without visualization: no events or states
+                are built at all, so the run measures the algorithm alone.
+        
+        Sorting a TrackedArray(arr, update_callback) instead of arr counts
+        comparisons, reads, writes and swaps and reports them as operation
+        events, and handles update_callback=None by only counting.
         """
         pass
     
+    def steps(self, arr: List[int]) -> Iterator[SortingEvent]:
+        """
+        Sort the input array step by step, yielding each visualization update.
+        
+        The caller decides when the next step runs, so a run can be paused,
+        single-stepped or abandoned between any two steps by closing the
+        generator. The default implementation drives sort() through
+        callback_steps(); plugins can override it with a native generator
+        (and implement sort() by passing every yielded event to the callback).
+        
+        Args:
+            arr (List[int]): Array to be sorted
+            
+        Yields:
+            SortingEvent: The payloads sort() would pass to its update callback
+        """
+        return callback_steps(self.sort, arr)
+    
     @property
     def description(self) -> str:
         """
@@ -120,4 +1210,94 @@ class SortingAlgorithm(ABC):
         Returns:
             str: Space complexity in Big O notation
         """
-        return "Unknown"
\ No newline at end of file
+        return "Unknown"
+
+
+# Building blocks shared by the quick sort plugins
+
+# Partitions at least this large pick a ninther (median of three medians of 3)
+NINTHER_MIN = 40
+
+
+def median_of_3(arr: TrackedArray, a: int, b: int, c: int) -> int:
+    """Get the index of the median of three elements, in at most 3 comparisons."""
+    if arr.compare(a, b) < 0:
+        if arr.compare(b, c) < 0:
+            return b
+        return c if arr.compare(a, c) < 0 else a
+    if arr.compare(a, c) < 0:
+        return a
+    return c if arr.compare(b, c) < 0 else b
+
+
+def choose_pivot(arr: TrackedArray, low: int, high: int, strategy: str, rng: random.Random) -> int:
+    """
+    Pick the pivot of the partition arr[low:high].
+    
+    Args:
+        arr: Array being sorted
+        low: First index of the partition
+        high: End of the partition (exclusive)
+        strategy: "median of 3", "ninther", "random" or "last"
+        rng: Random source for the random strategy
+    
+    Returns:
+        int: Index of the pivot
+    """
+    last = high - 1
+    if strategy == "last":
+        return last
+    if strategy == "random":
+        return rng.randrange(low, high)
+    mid = low + (high - low) // 2
+    if strategy == "ninther" and high - low >= NINTHER_MIN:
+        step = (high - low) // 8
+        return median_of_3(arr,
+                           median_of_3(arr, low, low + step, low + 2 * step),
+                           median_of_3(arr, mid - step, mid, mid + step),
+                           median_of_3(arr, last - 2 * step, last - step, last))
+    # low + 1 rather than low: the median is parked at low, and moving an end
+    # element into the middle of a reversed run would feed the next partitions
+    # a median-of-3 killer pattern
+    return median_of_3(arr, low + 1, mid, last)
+
+
+def insertion_sort_range(arr: TrackedArray, low: int, high: int) -> None:
+    """Sort a small partition arr[low:high] by insertion and mark it sorted."""
+    arr.annotate(SortingOp.active(low, high))
+    for i in range(low + 1, high):
+        key = arr[i]
+        j = i - 1
+        while j >= low and arr.compare_value(j, key) > 0:
+            arr[j + 1] = arr[j]
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key
+    arr.annotate(SortingOp.mark_sorted(low, high))
+
+
+def _sift_down(arr: TrackedArray, base: int, root: int, size: int) -> None:
+    """Restore the max-heap below root, for a heap stored in arr[base:base + size]."""
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return
+        if child + 1 < size and arr.compare(base + child, base + child + 1) < 0:
+            child += 1
+        if arr.compare(base + root, base + child) >= 0:
+            return
+        arr.swap(base + root, base + child)
+        root = child
+
+
+def heap_sort_range(arr: TrackedArray, low: int, high: int) -> None:
+    """Heap sort a partition arr[low:high], e.g. one past a quick sort's depth limit."""
+    arr.annotate(SortingOp.active(low, high))
+    size = high - low
+    for root in range(size // 2 - 1, -1, -1):
+        _sift_down(arr, low, root, size)
+    for end in range(size - 1, 0, -1):
+        arr.swap(low, low + end)
+        arr.annotate(SortingOp.mark_sorted(low + end, low + end + 1))
+        _sift_down(arr, low, 0, end)
+    arr.annotate(SortingOp.mark_sorted(low, low + 1))
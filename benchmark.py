@@ -0,0 +1,475 @@
+"""
+Headless benchmark for the sorting algorithm plugins.
+
+Runs every discovered plugin across a set of sizes and input distributions
+without a display and without importing PyQt6, and writes the results as
+JSON or CSV. Every plugin is also timed without visualization
+(update_callback=None), next to Python's list.sort() and numpy.sort() on the
+same input.
+
+Usage:
+    python -m benchmark --sizes 100,1000 --distributions random,reversed -o results.json
+    python main.py --bench --sizes 500 -o results.csv
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from algorithms import SortingAlgorithm, SortingOp, SortingState, SortingStats
+from datasets import ARRAY_GENERATORS, generate_array
+from plugin_loader import PluginLoader
+
+DEFAULT_PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Outcome of a single benchmark run.
+
+    Attributes:
+        algorithm (str): Name of the sorting algorithm
+        size (int): Number of elements sorted
+        distribution (str): Input distribution name
+        repeat (int): Index of the repetition
+        wall_time (float): Wall-clock time of the sort in seconds, with the
+            counting update callback
+        algorithm_time (float): Part of wall_time spent in the algorithm,
+            including the instrumentation that produces its events
+        callback_time (float): Part of wall_time spent in the update callback
+        throttle_time (float): Time spent deliberately waiting; always 0 here,
+            since benchmark runs are unthrottled
+        pure_time (float): Wall-clock time of sort() with update_callback=None,
+            i.e. the cost of the algorithm's own logic
+        list_sort_time (float): list.sort() on the same input, for reference
+        numpy_sort_time (float): numpy.sort() on the same input, for reference
+        comparisons (int): Comparisons reported by the algorithm
+        swaps (int): Swaps reported by the algorithm
+        reads (int): Element reads reported by the algorithm
+        writes (int): Element writes reported by the algorithm
+        steps (int): Number of update callbacks issued
+        bytes_per_step (float): Mean size in bytes of the payload passed per update
+            callback (SortingState.nbytes for snapshots, the op list for events)
+        compact_bytes_per_step (float): The same after SortingState.compact(),
+            i.e. what a recorded step would cost
+        sorted_ok (bool): Whether the output was correctly sorted
+        error (str): Error message if the run failed, empty otherwise
+        settings (Dict[str, Any]): Value of every option the algorithm declares
+        metrics (Dict[str, Any]): Algorithm-specific measurements the plugin
+            reported for the counted run (e.g. recursion depth)
+    """
+    algorithm: str
+    size: int
+    distribution: str
+    repeat: int
+    wall_time: float = 0.0
+    algorithm_time: float = 0.0
+    callback_time: float = 0.0
+    throttle_time: float = 0.0
+    pure_time: float = 0.0
+    list_sort_time: float = 0.0
+    numpy_sort_time: float = 0.0
+    comparisons: int = 0
+    swaps: int = 0
+    reads: int = 0
+    writes: int = 0
+    steps: int = 0
+    bytes_per_step: float = 0.0
+    compact_bytes_per_step: float = 0.0
+    sorted_ok: bool = False
+    error: str = ""
+    settings: Dict[str, Any] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BaselineTimes:
+    """
+    Unvisualized timings of one input, in seconds.
+
+    Attributes:
+        pure_time (float): The plugin's sort() with update_callback=None
+        list_sort_time (float): Python's list.sort()
+        numpy_sort_time (float): numpy.sort() on an int64 array (conversion not timed)
+    """
+    pure_time: float = 0.0
+    list_sort_time: float = 0.0
+    numpy_sort_time: float = 0.0
+
+
+def time_pure(algorithm: SortingAlgorithm, data: List[int]) -> float:
+    """
+    Time a plugin without visualization: sort() on a copy of data with update_callback=None.
+
+    Args:
+        algorithm: Sorting algorithm instance
+        data: Input array (left untouched)
+
+    Returns:
+        float: Wall-clock time in seconds
+    """
+    arr = list(data)
+    start = time.perf_counter()
+    algorithm.sort(arr, None)
+    return time.perf_counter() - start
+
+
+def time_builtin_sorts(data: List[int]) -> Tuple[float, float]:
+    """
+    Time list.sort() and numpy.sort() on copies of data.
+
+    Args:
+        data: Input array (left untouched)
+
+    Returns:
+        Tuple[float, float]: (list.sort seconds, numpy.sort seconds)
+    """
+    arr = list(data)
+    start = time.perf_counter()
+    arr.sort()
+    list_time = time.perf_counter() - start
+
+    values = np.array(data, dtype=np.int64)
+    start = time.perf_counter()
+    np.sort(values)
+    return list_time, time.perf_counter() - start
+
+
+def measure_baselines(algorithm: SortingAlgorithm, data: List[int]) -> BaselineTimes:
+    """
+    Time a plugin without visualization next to the built-in sorts on the same input.
+
+    Args:
+        algorithm: Sorting algorithm instance
+        data: Input array (left untouched)
+
+    Returns:
+        BaselineTimes: The three timings
+    """
+    return BaselineTimes(time_pure(algorithm, data), *time_builtin_sorts(data))
+
+
+class CountingCallback:
+    """
+    Update callback that records counters without building any visualization state.
+
+    Operation events are counted directly with SortingStats.count(); for
+    plugins that pass full SortingState snapshots the counters they report
+    are taken as-is.
+
+    The size of the payloads is measured on every sample_every-th step only,
+    so measuring does not dominate the timing. The time spent in the callback
+    is accumulated in stats.callback_ns.
+    """
+
+    def __init__(self, sample_every: int = 256):
+        self.steps = 0
+        self.stats = SortingStats()
+        self.last_state = None
+        self.sample_every = sample_every
+        self.samples = 0
+        self.nbytes = 0
+        self.compact_nbytes = 0
+
+    def __call__(self, event) -> None:
+        start = time.perf_counter_ns()
+        self._record(event)
+        self.stats.callback_ns += time.perf_counter_ns() - start
+
+    def _record(self, event) -> None:
+        self.steps += 1
+        sample = (self.steps - 1) % self.sample_every == 0
+        if isinstance(event, SortingState):
+            self.last_state = event
+            if sample:
+                self._measure(event.nbytes, event.compact().nbytes)
+            return
+        ops = [event] if isinstance(event, SortingOp) else event
+        if sample:
+            size = sum(map(sys.getsizeof, ops))
+            if ops is event:
+                size += sys.getsizeof(event)
+            self._measure(size, size)
+        count = self.stats.count
+        for op in ops:
+            count(op)
+
+    def _measure(self, nbytes: int, compact_nbytes: int) -> None:
+        self.samples += 1
+        self.nbytes += nbytes
+        self.compact_nbytes += compact_nbytes
+
+    def totals(self) -> SortingStats:
+        """
+        Get the final counters for the run.
+
+        Returns:
+            SortingStats: Counters from the operation events plus those of the
+            last snapshot
+        """
+        totals = self.stats
+        if self.last_state is not None and self.last_state.stats is not None:
+            reported = self.last_state.stats
+            totals = SortingStats(comparisons=totals.comparisons + reported.comparisons,
+                                  swaps=totals.swaps + reported.swaps,
+                                  reads=totals.reads + reported.reads,
+                                  writes=totals.writes + reported.writes)
+        return totals
+
+
+def option_settings(algorithm_cls: Type[SortingAlgorithm],
+                    options: Dict[str, str] = None) -> Dict[str, Any]:
+    """
+    Pick the options an algorithm declares out of command line settings.
+
+    Args:
+        algorithm_cls: Sorting algorithm class
+        options: Option values as text by key; keys the class does not declare are skipped
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for the class
+
+    Raises:
+        ValueError: If a value is not one of the option's choices
+    """
+    declared = {option.key: option for option in algorithm_cls.options}
+    return {key: declared[key].parse(text)
+            for key, text in (options or {}).items() if key in declared}
+
+
+def run_one(algorithm_cls: Type[SortingAlgorithm], data: List[int],
+            distribution: str, repeat: int,
+            builtin_times: Tuple[float, float] = None,
+            settings: Dict[str, Any] = None) -> BenchmarkResult:
+    """
+    Sort a copy of the data once with counting and once without visualization, and measure both.
+
+    Args:
+        algorithm_cls: Sorting algorithm class to instantiate
+        data: Input array (left untouched)
+        distribution: Name of the input distribution, for the report
+        repeat: Index of the repetition, for the report
+        builtin_times: (list.sort, numpy.sort) seconds for the same input;
+            measured here when omitted
+        settings: Options to create the algorithm with; defaults otherwise
+
+    Returns:
+        BenchmarkResult: Measurements of the run
+    """
+    settings = settings or {}
+    algorithm = algorithm_cls(**settings)
+    result = BenchmarkResult(algorithm.name(), len(data), distribution, repeat)
+    result.settings = dict(algorithm.settings)
+    arr = data.copy()
+    callback = CountingCallback()
+
+    start = time.perf_counter_ns()
+    try:
+        algorithm.sort(arr, callback)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    wall_ns = time.perf_counter_ns() - start
+    result.wall_time = wall_ns / 1e9
+    result.callback_time = callback.stats.callback_ns / 1e9
+    result.algorithm_time = (wall_ns - callback.stats.callback_ns) / 1e9
+
+    totals = callback.totals()
+    result.comparisons = totals.comparisons
+    result.swaps = totals.swaps
+    result.reads = totals.reads
+    result.writes = totals.writes
+    result.steps = callback.steps
+    if callback.samples:
+        result.bytes_per_step = callback.nbytes / callback.samples
+        result.compact_bytes_per_step = callback.compact_nbytes / callback.samples
+    result.sorted_ok = not result.error and arr == sorted(data)
+    result.metrics = dict(algorithm.metrics)
+
+    if not result.error:
+        try:
+            result.pure_time = time_pure(algorithm_cls(**settings), data)
+        except Exception as e:
+            result.error = f"update_callback=None: {type(e).__name__}: {e}"
+            result.sorted_ok = False
+    result.list_sort_time, result.numpy_sort_time = builtin_times or time_builtin_sorts(data)
+    return result
+
+
+def run_benchmark(algorithms: Sequence[Type[SortingAlgorithm]], sizes: Sequence[int],
+                  distributions: Sequence[str], repeats: int = 1,
+                  seed: Optional[int] = None, progress=None,
+                  options: Dict[str, str] = None) -> List[BenchmarkResult]:
+    """
+    Run every algorithm on every (size, distribution) combination.
+
+    All algorithms see the same input for a given size, distribution and repetition.
+
+    Args:
+        algorithms: Sorting algorithm classes to run
+        sizes: Array sizes
+        distributions: Input distribution names
+        repeats: Number of repetitions per combination
+        seed: Seed for the input generator
+        progress: Optional callable invoked with every finished BenchmarkResult
+        options: Option values as text by key, applied to the algorithms that
+            declare them (see option_settings)
+
+    Returns:
+        List[BenchmarkResult]: One result per run
+    """
+    rng = random.Random(seed)
+    settings = {algorithm_cls: option_settings(algorithm_cls, options)
+                for algorithm_cls in algorithms}
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            for repeat in range(repeats):
+                data = generate_array(size, distribution, rng)
+                builtin_times = time_builtin_sorts(data)
+                for algorithm_cls in algorithms:
+                    result = run_one(algorithm_cls, data, distribution, repeat, builtin_times,
+                                     settings[algorithm_cls])
+                    results.append(result)
+                    if progress:
+                        progress(result)
+    return results
+
+
+def write_results(results: List[BenchmarkResult], path: str, fmt: str = None) -> None:
+    """
+    Write benchmark results to a JSON or CSV file.
+
+    Args:
+        results: Results to write
+        path: Output file path, "-" for stdout
+        fmt: "json" or "csv"; inferred from the file extension when omitted
+    """
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "json"
+    rows = [asdict(r) for r in results]
+
+    out = sys.stdout if path == "-" else open(path, "w", newline="")
+    try:
+        if fmt == "csv":
+            for row in rows:
+                row["settings"] = json.dumps(row["settings"])
+                row["metrics"] = json.dumps(row["metrics"])
+            writer = csv.DictWriter(out, fieldnames=list(BenchmarkResult.__dataclass_fields__))
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, out, indent=2)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def _csv_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="benchmark",
+        description="Run every sorting plugin headlessly and record timings and counters.")
+    parser.add_argument("--sizes", type=lambda v: [int(x) for x in _csv_list(v)],
+                        default=[100, 500, 1000],
+                        help="comma-separated array sizes (default: 100,500,1000)")
+    parser.add_argument("--distributions", type=_csv_list, default=["random"],
+                        help="comma-separated input distributions: "
+                             f"{', '.join(ARRAY_GENERATORS)} (default: random)")
+    parser.add_argument("--algorithms", type=_csv_list, default=None,
+                        help="comma-separated algorithm names to run (default: all)")
+    parser.add_argument("--option", dest="options", action="append", default=[],
+                        metavar="KEY=VALUE",
+                        help="algorithm option, e.g. pivot=ninther; repeatable, and applied "
+                             "to the algorithms that declare it")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="repetitions per size and distribution (default: 1)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for the input generator")
+    parser.add_argument("--plugin-dir", default=DEFAULT_PLUGIN_DIR,
+                        help="directory to discover plugins in")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, .json or .csv (default: JSON on stdout)")
+    parser.add_argument("--format", choices=["json", "csv"], default=None,
+                        help="output format (default: inferred from --output)")
+    return parser
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Arguments without the program name; defaults to sys.argv[1:]
+
+    Returns:
+        int: Process exit code
+    """
+    args = build_parser().parse_args(argv)
+
+    for distribution in args.distributions:
+        if distribution not in ARRAY_GENERATORS:
+            print(f"Unknown distribution '{distribution}'", file=sys.stderr)
+            return 2
+
+    plugins = PluginLoader(args.plugin_dir).discover_plugins()
+    if args.algorithms:
+        wanted = {name.lower() for name in args.algorithms}
+        plugins = [p for p in plugins if p.name.lower() in wanted]
+    # Only the selected plugins are imported
+    algorithms = [cls for cls in (p.load() for p in plugins) if cls is not None]
+    if not algorithms:
+        print("No sorting algorithms found", file=sys.stderr)
+        return 1
+
+    options = {}
+    for option in args.options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            print(f"Option '{option}' is not KEY=VALUE", file=sys.stderr)
+            return 2
+        options[key.strip()] = value
+    for key in options:
+        if not any(key == option.key for a in algorithms for option in a.options):
+            print(f"No selected algorithm has an option '{key}'", file=sys.stderr)
+            return 2
+    try:
+        for algorithm_cls in algorithms:
+            option_settings(algorithm_cls, options)
+    except ValueError as e:
+        print(f"Invalid option: {e}", file=sys.stderr)
+        return 2
+
+    def progress(result: BenchmarkResult):
+        status = "ok" if result.sorted_ok else (result.error or "NOT SORTED")
+        print(f"{result.algorithm:<16} n={result.size:<7} {result.distribution:<14} "
+              f"{result.wall_time:9.4f}s (algorithm {result.algorithm_time:.4f}s, "
+              f"callback {result.callback_time:.4f}s)  pure={result.pure_time:.4f}s "
+              f"(list.sort {result.list_sort_time * 1000:.3f}ms, "
+              f"numpy.sort {result.numpy_sort_time * 1000:.3f}ms)  cmp={result.comparisons:<10} "
+              f"swp={result.swaps:<10} rd={result.reads:<10} wr={result.writes:<10} "
+              f"{result.bytes_per_step:9.0f} B/step "
+              f"({result.compact_bytes_per_step:.0f} compacted)  {status}"
+              + "".join(f"  {name}={value:.3g}" if isinstance(value, float) else f"  {name}={value}"
+                        for name, value in result.metrics.items()),
+              file=sys.stderr)
+
+    results = run_benchmark(algorithms, args.sizes, args.distributions,
+                            args.repeats, args.seed, progress, options)
+    write_results(results, args.output, args.format)
+    return 0 if all(r.sorted_ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
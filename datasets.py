@@ -0,0 +1,97 @@
+import random
+from typing import Callable, Dict, List
+
+
+def random_array(size: int, rng: random.Random = random) -> List[int]:
+    """
+    Generate a random permutation of 1..size.
+    
+    Args:
+        size: Number of elements
+        rng: Random number generator to use
+        
+    Returns:
+        List[int]: Shuffled values
+    """
+    return rng.sample(range(1, size + 1), size)
+
+
+def nearly_sorted_array(size: int, rng: random.Random = random) -> List[int]:
+    """
+    Generate 1..size in order with size // 10 random swaps.
+    
+    Args:
+        size: Number of elements
+        rng: Random number generator to use
+        
+    Returns:
+        List[int]: Mostly ordered values
+    """
+    arr = list(range(1, size + 1))
+    # Introduce some randomness
+    for _ in range(size // 10):
+        i, j = rng.sample(range(size), 2)
+        arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+
+def reversed_array(size: int, rng: random.Random = random) -> List[int]:
+    """
+    Generate size..1 in descending order.
+    
+    Args:
+        size: Number of elements
+        rng: Unused, accepted for a uniform signature
+        
+    Returns:
+        List[int]: Values in reverse order
+    """
+    return list(range(size, 0, -1))
+
+
+def few_unique_array(size: int, rng: random.Random = random,
+                     distinct: int = 8) -> List[int]:
+    """
+    Generate size elements drawn from a handful of values spread over 1..size.
+    
+    Args:
+        size: Number of elements
+        rng: Random number generator to use
+        distinct: Number of different values
+        
+    Returns:
+        List[int]: Values with long runs of duplicates in random order
+    """
+    distinct = max(1, min(distinct, size))
+    values = [size * (k + 1) // distinct for k in range(distinct)]
+    return [rng.choice(values) for _ in range(size)]
+
+
+# Input distributions by name, shared by the GUI and the benchmark
+ARRAY_GENERATORS: Dict[str, Callable[..., List[int]]] = {
+    "random": random_array,
+    "nearly_sorted": nearly_sorted_array,
+    "reversed": reversed_array,
+    "few_unique": few_unique_array,
+}
+
+
+def generate_array(size: int, distribution: str = "random",
+                   rng: random.Random = random) -> List[int]:
+    """
+    Generate an input array of the given size and distribution.
+    
+    Args:
+        size: Number of elements
+        distribution: Key of ARRAY_GENERATORS
+        rng: Random number generator to use
+        
+    Returns:
+        List[int]: Generated array
+    """
+    try:
+        generator = ARRAY_GENERATORS[distribution]
+    except KeyError:
+        raise ValueError(f"Unknown distribution '{distribution}', "
+                         f"expected one of {', '.join(ARRAY_GENERATORS)}")
+    return generator(size, rng)
@@ -0,0 +1,425 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Iterator, List, Optional
+
+from algorithms import EventBatch, SortingEvent, SortingState, SortingStats, SortingStep
+
+
+# Below this rate every operation is a step of its own; above it operations are
+# merged so that about this many steps per second cross the thread boundary
+STEP_RATE = 1000
+# Operations per step when running unthrottled
+MAX_BATCH = 1024
+
+
+def batch_size(ops_per_second: Optional[float]) -> int:
+    """
+    Get how many operations to merge into one step to reach a target rate.
+    
+    Args:
+        ops_per_second: Target operation rate, or None for unthrottled
+        
+    Returns:
+        int: Operations per step, at least 1
+    """
+    if not ops_per_second:
+        return MAX_BATCH
+    return max(1, min(MAX_BATCH, int(ops_per_second // STEP_RATE)))
+
+
+class QueuePolicy(Enum):
+    """What StepBuffer does with a new step when the queue is full."""
+    BLOCK = "block"              # Wait until the consumer drains (backpressure)
+    DROP_OLDEST = "drop_oldest"  # Drop the oldest step that is not a keyframe
+    KEEP_LATEST = "keep_latest"  # Keep only the newest step, as a keyframe
+
+
+class StepBuffer:
+    """
+    Bounded, thread-safe hand-off of steps from the sorting thread to the frame clock.
+    
+    The sorting thread pushes every step as it happens; the GUI drains everything
+    that accumulated since the previous frame, applies it in one go and repaints
+    once. Steps that were applied but never shown on their own are counted as
+    coalesced.
+    
+    At most capacity steps are queued. When the queue is full the policy decides
+    whether the producer waits for the consumer or steps are dropped. Steps are
+    deltas, so once one is dropped the consumer can no longer replay the steps
+    after it: the next step is then queued as a keyframe carrying the full state,
+    and drain() only returns steps from the newest keyframe on.
+    
+    Attributes:
+        capacity (int): Maximum number of queued steps
+        policy (QueuePolicy): What to do when the queue is full
+        pushed (int): Total steps pushed by the producer
+        frames (int): Number of non-empty drains (frames that showed new state)
+        coalesced (int): Steps that were applied without being shown individually
+        dropped (int): Steps discarded without ever reaching the consumer
+        keyframes (int): Keyframes created to resynchronize the consumer
+        peak_depth (int): Largest number of steps queued at once
+        blocked_ns (int): Nanoseconds the producer spent waiting under QueuePolicy.BLOCK
+    """
+    
+    def __init__(self, capacity: int = 4096, policy: QueuePolicy = QueuePolicy.BLOCK,
+                 keyframe: Optional[Callable[[], SortingState]] = None):
+        """
+        Args:
+            capacity: Maximum number of queued steps
+            policy: What to do when the queue is full
+            keyframe: Returns the producer's full state after the step being
+                pushed; required by the dropping policies
+        """
+        if policy is not QueuePolicy.BLOCK and keyframe is None:
+            raise ValueError(f"Queue policy {policy.value} needs a keyframe source")
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        self.keyframe = keyframe
+        self._cond = threading.Condition()
+        self._steps = deque()
+        # Number of queued steps in front of the newest keyframe; they are obsolete
+        self._superseded = 0
+        self._closed = False
+        self.pushed = 0
+        self.frames = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.keyframes = 0
+        self.peak_depth = 0
+        self.blocked_ns = 0
+    
+    @property
+    def depth(self) -> int:
+        """Number of steps currently queued."""
+        with self._cond:
+            return len(self._steps)
+    
+    @property
+    def blocked_time(self) -> float:
+        """Seconds the producer spent waiting under QueuePolicy.BLOCK."""
+        return self.blocked_ns / 1e9
+    
+    def push(self, step: SortingStep) -> None:
+        """
+        Queue a step for the next frame, applying the policy if the queue is full.
+        
+        Args:
+            step: Step produced by the sorting thread
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self.pushed += 1
+            steps = self._steps
+            if self.policy is QueuePolicy.KEEP_LATEST:
+                if steps:
+                    self.dropped += len(steps)
+                    steps.clear()
+                    step = self._as_keyframe(step)
+                    self._superseded = 0
+            elif len(steps) >= self.capacity:
+                if self.policy is QueuePolicy.BLOCK:
+                    start = time.perf_counter_ns()
+                    while len(steps) >= self.capacity and not self._closed:
+                        self._cond.wait()
+                    self.blocked_ns += time.perf_counter_ns() - start
+                    if self._closed:
+                        return
+                elif self._superseded:
+                    # Obsolete steps go first, and need no resynchronization
+                    steps.popleft()
+                    self._superseded -= 1
+                    self.dropped += 1
+                else:
+                    # The oldest non-keyframe is either the head or right behind
+                    # the keyframe at the head; everything queued is obsolete
+                    # once the new step carries the full state
+                    if steps[0].keyframe is not None and len(steps) > 1:
+                        del steps[1]
+                    else:
+                        steps.popleft()
+                    self.dropped += 1
+                    step = self._as_keyframe(step)
+                    self._superseded = len(steps)
+            steps.append(step)
+            self.peak_depth = max(self.peak_depth, len(steps))
+    
+    def _as_keyframe(self, step: SortingStep) -> SortingStep:
+        """Attach the producer's full state to a step."""
+        self.keyframes += 1
+        return step._replace(keyframe=self.keyframe())
+    
+    def drain(self) -> List[SortingStep]:
+        """
+        Take every step queued since the last call that the consumer still needs.
+        
+        Returns:
+            List[SortingStep]: Pending steps in the order they were pushed; if a
+            keyframe is among them it is the first one returned
+        """
+        with self._cond:
+            steps = list(self._steps)
+            self._steps.clear()
+            if self._superseded:
+                self.dropped += self._superseded
+                steps = steps[self._superseded:]
+                self._superseded = 0
+            self._cond.notify_all()
+        if steps:
+            self.frames += 1
+            self.coalesced += len(steps) - 1
+        return steps
+    
+    def close(self) -> None:
+        """Release a producer waiting on a full queue and ignore further pushes."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class Throttle:
+    """
+    Pace a producer to a target operation rate without sleeping after every operation.
+
+    The throttle keeps a schedule relative to the first tick and only sleeps once
+    the producer is ahead of it by at least min_sleep, so fast rates are reached
+    by sleeping rarely rather than by sleeping for tiny intervals.
+    """
+
+    def __init__(self, rate: Optional[float] = None, min_sleep: float = 0.002,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate: Target operations per second, or None to run unthrottled
+            min_sleep: Smallest lag in seconds worth sleeping for
+            sleep: Function used to wait, e.g. one that returns early on cancel
+        """
+        self.rate = rate
+        self.min_sleep = min_sleep
+        self.sleep = sleep
+        self._start = None
+        self._count = 0
+    
+    def reset(self) -> None:
+        """Restart the schedule, e.g. after a pause, so no burst follows it."""
+        self._start = None
+        self._count = 0
+
+    def tick(self, count: int = 1) -> None:
+        """
+        Account for operations and sleep if the producer is ahead of schedule.
+        
+        Args:
+            count: Number of operations done since the previous tick
+        """
+        if not self.rate:
+            return
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        self._count += count
+        ahead = self._start + self._count / self.rate - now
+        if ahead >= self.min_sleep:
+            self.sleep(ahead)
+
+
+class SortDriver:
+    """
+    Pull steps from a SortingAlgorithm.steps() generator with pause, single-step and cancel.
+    
+    The driver owns the pacing, so algorithms never sleep: between two steps it
+    checks for pause and cancel requests and waits for the throttle on a
+    condition that those requests wake up. A cancel therefore takes effect
+    within one algorithm step, whatever the speed.
+    
+    Speed is a target rate of operations, i.e. update callback events. To
+    reach high rates the driver asks the generator for batch operations per
+    step (see callback_steps()), so the cost of a step is shared by many
+    operations; while paused it asks for one, so single steps stay single
+    operations. Other threads can hand a paused run work to do between two
+    steps with post().
+    
+    The driver also times the run with perf_counter_ns(): time spent in the
+    generator is algorithm time, time spent in the sink is callback time and
+    time spent in the throttle (or blocked on the sink's full StepBuffer) is
+    throttle time. Time spent paused counts as none of them.
+    
+    Attributes:
+        throttle (Throttle): Paces the operations; its waits end early on pause or cancel
+        batch (int): Operations requested per step when not paused
+        steps (int): Number of steps pulled so far
+        ops (int): Number of operations pulled so far
+        stats (SortingStats): Receives the algorithm_ns, callback_ns and throttle_ns totals
+        run_ns (int): Nanoseconds spent in run(), pauses excluded
+    """
+    
+    def __init__(self, ops_per_second: Optional[float] = None,
+                 stats: Optional[SortingStats] = None):
+        """
+        Args:
+            ops_per_second: Target operation rate, or None to run unthrottled
+            stats: Statistics to accumulate the timings into; a new
+                SortingStats is used when omitted
+        """
+        self._cond = threading.Condition()
+        self._paused = False
+        self._cancelled = False
+        self._budget = 0
+        self._posted = deque()
+        self.throttle = Throttle(ops_per_second, sleep=self._wait)
+        self.batch = batch_size(ops_per_second)
+        self.steps = 0
+        self.ops = 0
+        self.stats = stats if stats is not None else SortingStats()
+        self.run_ns = 0
+    
+    @property
+    def paused(self) -> bool:
+        return self._paused
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+    
+    def set_speed(self, ops_per_second: Optional[float]) -> None:
+        """
+        Change the target rate of a running sort, starting from the next step.
+        
+        Args:
+            ops_per_second: Target operation rate, or None to run unthrottled
+        """
+        self.batch = batch_size(ops_per_second)
+        self.throttle.rate = ops_per_second
+        self.throttle.reset()
+    
+    def run(self, events: Iterator[SortingEvent], sink: Callable[[SortingEvent], None],
+            buffer: Optional[StepBuffer] = None) -> bool:
+        """
+        Pull every event from the generator and hand it to the sink.
+        
+        Args:
+            events: Generator returned by SortingAlgorithm.steps(); the
+                number of operations wanted in the next step is sent to it
+            sink: Called with every event, on the calling thread
+            buffer: StepBuffer the sink pushes into, if any; time the sink
+                spends blocked on it counts as throttle time, not callback time
+            
+        Returns:
+            bool: True if the sort ran to completion, False if it was cancelled
+        """
+        clock = time.perf_counter_ns
+        stats = self.stats
+        request = None
+        # The stats may be shared with other drivers, so this run's own time is a difference
+        before = stats.algorithm_ns + stats.callback_ns + stats.throttle_ns
+        try:
+            start = clock()
+            while True:
+                try:
+                    event = events.send(request)
+                except StopIteration:
+                    break
+                pulled = clock()
+                stats.algorithm_ns += pulled - start
+                blocked = buffer.blocked_ns if buffer is not None else 0
+                sink(event)
+                handled = clock()
+                waited = buffer.blocked_ns - blocked if buffer is not None else 0
+                stats.callback_ns += handled - pulled - waited
+                count = event.events if event.__class__ is EventBatch else 1
+                self.steps += 1
+                self.ops += count
+                self.throttle.tick(count)
+                start = clock()
+                stats.throttle_ns += start - handled + waited
+                # Plain attribute reads keep the hot path lock-free
+                if self._paused or self._cancelled:
+                    if not self._hold():
+                        return False
+                    # Time spent paused is not part of the run
+                    start = clock()
+                request = 1 if self._paused else self.batch
+            stats.algorithm_ns += clock() - start
+            return True
+        finally:
+            self.run_ns += stats.algorithm_ns + stats.callback_ns + stats.throttle_ns - before
+            events.close()
+    
+    def _hold(self) -> bool:
+        """Wait while paused and out of single-step budget; False once cancelled."""
+        with self._cond:
+            self._run_posted()
+            if self._paused and self._budget:
+                self._budget -= 1
+                return True
+            while self._paused and not self._budget and not self._cancelled:
+                self._cond.wait()
+                self._run_posted()
+            if self._budget:
+                self._budget -= 1
+        self.throttle.reset()
+        return not self._cancelled
+    
+    def _run_posted(self) -> None:
+        """Call the posted functions; entered and left with the condition held."""
+        while self._posted:
+            func, args = self._posted.popleft()
+            # They may block on the consumer, which must still be able to reach the driver
+            self._cond.release()
+            try:
+                func(*args)
+            finally:
+                self._cond.acquire()
+    
+    def _wait(self, seconds: float) -> None:
+        """Throttle sleep that returns as soon as a pause or cancel is requested."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._paused or self._cancelled, seconds)
+    
+    def pause(self) -> None:
+        """Stop pulling steps after the current one."""
+        with self._cond:
+            self._paused = True
+            self._budget = 0
+            self._cond.notify_all()
+    
+    def resume(self) -> None:
+        """Continue a paused run at the normal pace."""
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+    
+    def step(self, count: int = 1) -> None:
+        """
+        Let a paused run advance by a number of steps.
+        
+        Args:
+            count: Steps to run before pausing again
+        """
+        with self._cond:
+            self._budget += count
+            self._cond.notify_all()
+    
+    def post(self, func: Callable, *args) -> None:
+        """
+        Call a function on the driver's thread, between two steps of a paused run.
+        
+        The generator and the sink are idle while it runs, so it may change
+        the state they share, e.g. move a Timeline. Functions posted to a
+        running sort wait for the next pause.
+        
+        Args:
+            func: Function to call
+            *args: Arguments to pass to it
+        """
+        with self._cond:
+            self._posted.append((func, args))
+            self._cond.notify_all()
+    
+    def cancel(self) -> None:
+        """Abandon the run; run() returns False before pulling another step."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
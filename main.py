@@ -1,23 +1,96 @@
 import math
 import sys
-import random
+import threading
 import time
-from typing import List, Type
+
+# The benchmark must run on headless machines, so dispatch to it before PyQt6 is imported
+if __name__ == "__main__" and "--bench" in sys.argv[1:]:
+    import benchmark
+    sys.exit(benchmark.main([arg for arg in sys.argv[1:] if arg != "--bench"]))
+
+from typing import List, NamedTuple, Optional, Type
 from enum import Enum, auto
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QComboBox, QSpinBox, QLabel, QFrame, QSlider,
     QStyle, QStyleFactory, QMessageBox, QGroupBox, QRadioButton,
-    QStatusBar, QToolBar
+    QStatusBar, QToolBar, QCheckBox, QFileDialog, QFormLayout
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QThread, QSize, QTimer, QRect, QPointF, QLineF
 from PyQt6.QtGui import (
-    QPainter, QColor, QPalette, QPen, QAction
+    QPainter, QColor, QPalette, QPen, QAction, QPolygonF, QImage, QStaticText
 )
 import inspect
 from typing import List, Type
 from algorithms import *
-from plugin_loader import PluginLoader
+from plugin_loader import PluginInfo, PluginLoader
+from datasets import generate_array
+from driver import QueuePolicy, SortDriver, StepBuffer
+from benchmark import BaselineTimes, measure_baselines
+from raster import BAND_GAP, BAND_HEIGHT, RasterRenderer
+from traces import OperationTrace, Timeline, TraceFile, TraceWriter
+
+# Repaint rate of the visualizer while sorting, independent of the step rate
+FRAME_RATE = 60
+
+# Most of the time the render thread may take from the sorting thread
+RENDER_SHARE = 0.25
+
+# Largest array the GUI will generate
+MAX_ARRAY_SIZE = 1_000_000
+
+# Speed slider positions 1-99 span 1 to 10**SPEED_DECADES operations per second
+# on a log scale; the maximum position runs unthrottled
+SPEED_DECADES = 6
+SPEED_UNTHROTTLED = 100
+
+# Seconds over which the achieved operation rate is averaged
+RATE_WINDOW = 0.5
+
+# File dialog filter for recorded runs
+TRACE_FILTER = "Sort traces (*.strace);;All files (*)"
+
+
+def speed_rate(speed: int) -> Optional[float]:
+    """
+    Map a speed slider position to a target operation rate.
+    
+    Args:
+        speed: Slider position, 1 to SPEED_UNTHROTTLED
+        
+    Returns:
+        Optional[float]: Operations per second, or None for unthrottled
+    """
+    if speed >= SPEED_UNTHROTTLED:
+        return None
+    return 10 ** ((speed - 1) * SPEED_DECADES / (SPEED_UNTHROTTLED - 2))
+
+
+def format_rate(rate: Optional[float]) -> str:
+    """Format an operation rate for display, e.g. 12.5k ops/s."""
+    if rate is None:
+        return "unthrottled"
+    for scale, suffix in ((1e6, "M"), (1e3, "k")):
+        if rate >= scale:
+            return f"{rate / scale:.3g}{suffix} ops/s"
+    return f"{rate:.3g} ops/s"
+
+
+def format_metric(name: str, value) -> str:
+    """Format an algorithm metric for the stats panel, e.g. max_depth=18 as 'Max depth: 18'."""
+    if isinstance(value, float):
+        value = f"{value:,.3f}"
+    elif isinstance(value, int):
+        value = f"{value:,}"
+    return f"<b>{name.replace('_', ' ').capitalize()}:</b> {value}"
+
+# Most steps queued between the sorting thread and the frame clock
+QUEUE_CAPACITY = 4096
+QUEUE_POLICY_LABELS = {
+    QueuePolicy.BLOCK: "Block (backpressure)",
+    QueuePolicy.DROP_OLDEST: "Drop oldest",
+    QueuePolicy.KEEP_LATEST: "Keep latest",
+}
 
 def discover_sorting_algorithms() -> List[Type]:
     """
@@ -66,53 +139,450 @@ class ColorTheme(Enum):
         "text": QColor(236, 240, 241)
     }
 
-# Enhanced visualization widget
-class VisualizerWidget(QFrame):
-    def __init__(self, parent=None):
-        super().__init__(parent)
+# Per-index status codes, computed once per frame
+STATUS_PRIMARY = 0
+STATUS_SORTED = 1
+STATUS_HIGHLIGHTED = 2
+STATUS_COMPARED = 3
+
+# Styles that switch to the NumPy rasterizer above RASTER_THRESHOLD elements
+# or when there are more elements than pixel columns
+RASTER_STYLES = (VisualizationStyle.BARS, VisualizationStyle.SCATTER)
+RASTER_THRESHOLD = 2000
+
+# Operations whose operands are a half-open index range
+RANGE_OPS = frozenset((OpKind.REVERSE, OpKind.MARK_SORTED, OpKind.UNMARK_SORTED,
+                       OpKind.PIVOT_RANGE))
+
+class RenderedFrame(NamedTuple):
+    """
+    A finished frame handed from the render thread to the GUI thread.
+    
+    Attributes:
+        image (QImage): Complete frame; never modified after it is handed over
+        rects (List[QRect]): Widget areas that changed, or None if everything did
+        render_ms (float): Time spent rendering the frame in milliseconds
+    """
+    image: QImage
+    rects: Optional[List[QRect]]
+    render_ms: float
+
+
+class FrameRenderer:
+    """
+    Render a SortingState into a QImage without touching any widget.
+    
+    All methods are called from the render thread only: it owns the mirrored
+    array, the backing canvas and the dirty-index bookkeeping, and produces
+    immutable copies of the canvas for the GUI to blit.
+    """
+    
+    def __init__(self):
         self.state = None
         self.style = VisualizationStyle.BARS
         self.theme = ColorTheme.CLASSIC
-        self.setMinimumSize(800, 500)
-        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Sunken)
-        self.setAutoFillBackground(True)
-        self.updateTheme()
+        self._width = 0
+        self._height = 0
+        self._ratio = 1.0
+        
+        # Back buffer: the last rendered frame plus the indices changed since then
+        self._canvas = None
+        self._full_redraw = True
+        self._dirty = set()
+        self._max_val = 1
+        self._raster = RasterRenderer()
+        
+        # Geometry and glyph caches, rebuilt for a new array, size or style
+        self._trig = None       # (key, cos table, sin table, outer points) for CIRCULAR
+        self._polyline = None   # (key, QPolygonF of point centers) for DOTS
+        self._glyphs = {}       # value -> QStaticText for bar labels
     
-    def updateTheme(self):
-        palette = self.palette()
-        palette.setColor(QPalette.ColorRole.Window, self.theme.value["background"])
-        self.setPalette(palette)
+    def width(self) -> int:
+        return self._width
+    
+    def height(self) -> int:
+        return self._height
+    
+    def invalidate(self):
+        """Discard the back buffer and caches and redraw everything in the next frame."""
+        self._full_redraw = True
+        self._dirty.clear()
+        self._trig = None
+        self._polyline = None
+        self._glyphs.clear()
+    
+    def resize(self, width: int, height: int, ratio: float):
+        self._width = width
+        self._height = height
+        self._ratio = ratio
+        self.invalidate()
     
     def setState(self, state: SortingState):
-        self.state = state
-        self.update()
+        self.state = StateMirror(state.array, state.stats)
+        self.state.load_regions(state)
+        self.invalidate()
+    
+    def loadKeyframe(self, keyframe: SortingState):
+        """Replace the renderer's copy of the array with a keyframe, marks included."""
+        # The keyframe's stats belong to the sorting thread, so they are not shared
+        self.state = StateMirror(keyframe.array)
+        self.state.load_regions(keyframe)
+        self.invalidate()
+        self.state.highlighted_indices = list(keyframe.highlighted_indices)
+        self.state.compared_indices = list(keyframe.compared_indices)
+        self.state.pivot_index = keyframe.pivot_index
+    
+    def applySteps(self, steps: List[SortingStep]):
+        """Apply steps of operation events to the renderer's own copy of the array."""
+        last = steps[-1]
+        # Keyframes already include their own operations and everything before them
+        for k in range(len(steps) - 1, -1, -1):
+            if steps[k].keyframe is not None:
+                self.loadKeyframe(steps[k].keyframe)
+                steps = steps[k + 1:]
+                break
+        
+        state = self.state
+        dirty = self._dirty
+        
+        # Marks from the frame on screen go away, so those indices change color too
+        dirty.update(state.highlighted_indices)
+        dirty.update(state.compared_indices)
+        if state.pivot_range:
+            dirty.update(state.pivot_range)
+        if state.pivot_index is not None:
+            dirty.add(state.pivot_index)
+        active = state.active_range
+        for step in steps:
+            state.apply_step(step.ops, count=False)
+            # Swapped, written, compared and highlighted indices end up in the
+            # marks; only range operations need a look at the ops themselves
+            dirty.update(state.highlighted_indices)
+            dirty.update(state.compared_indices)
+            for op in step.ops:
+                if op[0] in RANGE_OPS:
+                    dirty.update(range(op[1], op[2]))
+        if state.pivot_index is not None:
+            dirty.add(state.pivot_index)
+        # The band moves, so both its old and its new extent are redrawn
+        if state.active_range != active:
+            if active:
+                dirty.update(active)
+            if state.active_range:
+                dirty.update(state.active_range)
+        state.stats.comparisons = last.comparisons
+        state.stats.swaps = last.swaps
+        state.stats.reads = last.reads
+        state.stats.writes = last.writes
     
     def setStyle(self, style: VisualizationStyle):
         self.style = style
-        self.update()
+        self.invalidate()
     
     def setTheme(self, theme: ColorTheme):
         self.theme = theme
-        self.updateTheme()
-        self.update()
+        self.invalidate()
     
-    def paintEvent(self, event):
-        if not self.state:
-            return
+    def render(self) -> tuple:
+        """
+        Bring the back buffer up to date and copy it out as a new front frame.
         
-        painter = QPainter(self)
+        Returns:
+            tuple: (QImage, rects) where rects lists the changed widget areas or is
+                   None for a full update; (None, None) if nothing changed
+        """
+        if self.state is None or self._width <= 0 or self._height <= 0:
+            return None, None
+        n = len(self.state.array)
+        self._dirty = {i for i in self._dirty if 0 <= i < n}
+        if not self._full_redraw and not self._dirty:
+            return None, None
+        
+        if self.useRaster():
+            # The rasterizer redraws the whole frame in a few vector operations
+            return self.renderRaster().copy(), None
+        
+        size = QSize(int(self._width * self._ratio), int(self._height * self._ratio))
+        if self._canvas is None or self._canvas.size() != size:
+            self._canvas = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+            self._canvas.setDevicePixelRatio(self._ratio)
+            self._full_redraw = True
+        
+        # A new maximum changes the vertical scale of every column
+        if (not self._full_redraw
+                and (max(self.state.array[i] for i in self._dirty) > self._max_val
+                     or len(self._dirty) * 2 > n
+                     or self.style == VisualizationStyle.CIRCULAR)):
+            self._full_redraw = True
+        
+        rects = None if self._full_redraw else self.dirtyRects()
+        self.renderCanvas(rects)
+        return self._canvas.copy(), rects
+    
+    def dirtyRects(self) -> List[QRect]:
+        """
+        Get the widget strips that have to be redrawn for the dirty indices.
+        
+        Returns:
+            List[QRect]: Non-overlapping full-height strips
+        """
+        rects = []
+        for lo, hi in index_runs(self._dirty):
+            x0, x1 = self.columnSpan(lo, hi)
+            if rects and x0 <= rects[-1].right() + 1:
+                x0 = rects.pop().left()
+            rects.append(QRect(x0, 0, x1 - x0, self.height()))
+        return rects
+    
+    def columnSpan(self, lo: int, hi: int) -> tuple:
+        """
+        Get the horizontal pixel span covering elements lo..hi-1 and anything drawn from them.
+        
+        Args:
+            lo: First index
+            hi: End index (exclusive)
+        
+        Returns:
+            tuple: (left, right) x coordinates
+        """
+        width = self.width()
+        n = len(self.state.array)
+        PADDING = int(min(max(10, width * 0.02), 20))
+        available_width = width - (2 * PADDING)
+        
+        if self.style == VisualizationStyle.BARS:
+            bar_width = max(1, int(available_width / n))
+            return PADDING + lo * bar_width, PADDING + hi * bar_width
+        
+        if self.style == VisualizationStyle.DOTS:
+            spacing = available_width / (n - 1) if n > 1 else available_width
+            margin = int(min(spacing * 0.8, 20)) // 2 + 2
+            # Connecting lines reach over to the neighbouring points
+            return (int(PADDING + max(0, lo - 1) * spacing) - margin,
+                    int(PADDING + min(n - 1, hi) * spacing) + margin)
+        
+        # SCATTER
+        spacing = available_width / (n - 1) if n > 1 else 0
+        margin = int(min(available_width / n * 0.8, 15)) // 2 + 2
+        return (int(PADDING + lo * spacing) - margin,
+                int(PADDING + (hi - 1) * spacing) + margin)
+    
+    def useRaster(self) -> bool:
+        """
+        Whether the current frame is drawn by the NumPy rasterizer instead of QPainter.
+        
+        Besides large arrays, this covers every array with more elements than
+        pixel columns, which the rasterizer draws as one min/max/mean envelope
+        per column (level of detail) instead of overdrawing bars.
+        """
+        if self.style not in RASTER_STYLES:
+            return False
+        n = len(self.state.array)
+        PADDING = int(min(max(10, self.width() * 0.02), 20))
+        return n > RASTER_THRESHOLD or n > self.width() - (2 * PADDING)
+    
+    def renderRaster(self) -> QImage:
+        """Sync the rasterizer's NumPy buffers with the dirty indices and render a frame."""
+        array = self.state.array
+        raster = self._raster
+        if self._full_redraw or len(raster.values) != len(array):
+            raster.load(array, self.statusArray())
+        else:
+            for lo, hi in index_runs(self._dirty):
+                raster.update(lo, array[lo:hi], self.statusArray(lo, hi))
+        self._full_redraw = False
+        self._dirty.clear()
+        
+        PADDING = int(min(max(10, self.width() * 0.02), 20))
+        render = raster.renderBars if self.style == VisualizationStyle.BARS else raster.renderScatter
+        return render(self.width(), self.height(), PADDING, self.statusColors(),
+                      self.theme.value["background"], self.activeBand(), self.bandColor())
+    
+    def renderCanvas(self, rects: Optional[List[QRect]]):
+        """
+        Redraw the back buffer, either completely or only the given strips.
+        
+        Args:
+            rects: Dirty strips from dirtyRects, or None for a full redraw
+        """
+        if rects is None:
+            strips = [(QRect(0, 0, self.width(), self.height()), 0, len(self.state.array))]
+            self._max_val = max(self.state.array)
+        else:
+            strips = [(rect, *self.indicesInStrip(rect)) for rect in rects]
+        self._full_redraw = False
+        changed, self._dirty = self._dirty, set()
+        if self.style == VisualizationStyle.DOTS:
+            self.updatePolyline(changed)
+        
+        painter = QPainter(self._canvas)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        background = self.theme.value["background"]
+        for rect, lo, hi in strips:
+            painter.setClipRect(rect)
+            painter.fillRect(rect, background)
+            if self.style == VisualizationStyle.BARS:
+                self.drawBars(painter, lo, hi)
+            elif self.style == VisualizationStyle.DOTS:
+                self.drawDots(painter, lo, hi)
+            elif self.style == VisualizationStyle.SCATTER:
+                self.drawScatter(painter, lo, hi)
+            elif self.style == VisualizationStyle.CIRCULAR:
+                self.drawCircular(painter)
+            if self.style != VisualizationStyle.CIRCULAR:
+                self.drawActiveBand(painter, lo, hi)
+        painter.end()
+    
+    def updatePolyline(self, changed: set):
+        """
+        Keep the cached DOTS polyline in sync, moving only the changed points.
         
+        Args:
+            changed: Indices whose values changed since the last frame
+        """
+        width = self.width()
+        height = self.height()
+        array = self.state.array
+        n = len(array)
+        PADDING = int(min(max(10, width * 0.02), 20))
+        available_width = width - (2 * PADDING)
+        spacing = available_width / (n - 1) if n > 1 else available_width
+        height_scale = (height - 60) / self._max_val
+        
+        key = (n, width, height, self._max_val)
+        if self._polyline is None or self._polyline[0] != key:
+            self._polyline = (key, QPolygonF([
+                QPointF(int(PADDING + (i * spacing)), int(height - 30 - (val * height_scale)))
+                for i, val in enumerate(array)]))
+            return
+        polyline = self._polyline[1]
+        for i in changed:
+            polyline[i] = QPointF(int(PADDING + (i * spacing)),
+                                  int(height - 30 - (array[i] * height_scale)))
+    
+    def circularTables(self) -> tuple:
+        """
+        Get the cached trig tables and outer end points for the CIRCULAR style.
+        
+        Returns:
+            tuple: (cos table, sin table, outer points), one entry per index
+        """
+        width = self.width()
+        height = self.height()
+        n = len(self.state.array)
+        key = (n, width, height)
+        if self._trig is None or self._trig[0] != key:
+            center_x = width // 2
+            center_y = height // 2
+            radius = min(width, height) // 2 - 40
+            angle_step = 2 * math.pi / n
+            cos_table = [math.cos(i * angle_step) for i in range(n)]
+            sin_table = [math.sin(i * angle_step) for i in range(n)]
+            outer = [QPointF(int(center_x + (radius * c)), int(center_y + (radius * s)))
+                     for c, s in zip(cos_table, sin_table)]
+            self._trig = (key, cos_table, sin_table, outer)
+        return self._trig[1:]
+    
+    def indicesInStrip(self, rect: QRect) -> tuple:
+        """
+        Get the index range whose drawing can touch a strip of the widget.
+        
+        Args:
+            rect: Strip returned by dirtyRects
+        
+        Returns:
+            tuple: (lo, hi) index range, hi exclusive
+        """
+        n = len(self.state.array)
+        PADDING = int(min(max(10, self.width() * 0.02), 20))
+        available_width = self.width() - (2 * PADDING)
         if self.style == VisualizationStyle.BARS:
-            self.drawBars(painter)
-        elif self.style == VisualizationStyle.DOTS:
-            self.drawDots(painter)
-        elif self.style == VisualizationStyle.SCATTER:
-            self.drawScatter(painter)
-        elif self.style == VisualizationStyle.CIRCULAR:
-            self.drawCircular(painter)
-    
-    def drawBars(self, painter: QPainter):
+            column = max(1, int(available_width / n))
+        else:
+            column = available_width / (n - 1) if n > 1 else available_width
+        # Widen by a column on each side so neighbours overlapping the strip are redrawn too
+        lo = int((rect.left() - PADDING) / column) - 1
+        hi = int((rect.right() - PADDING) / column) + 2
+        return max(0, lo), min(n, hi)
+    
+    def statusArray(self, lo: int = 0, hi: int = None) -> bytearray:
+        """
+        Classify the indices lo..hi-1 once per frame.
+        
+        Args:
+            lo: First index
+            hi: End index (exclusive), defaults to the array length
+        
+        Returns:
+            bytearray: One STATUS_* code per element, offset by lo. Sorted wins
+                       over highlighted (including the pivot range), which
+                       wins over compared.
+        """
+        state = self.state
+        if hi is None:
+            hi = len(state.array)
+        status = bytearray(hi - lo)
+        for i in state.compared_indices:
+            if lo <= i < hi:
+                status[i - lo] = STATUS_COMPARED
+        for i in state.highlighted_indices:
+            if lo <= i < hi:
+                status[i - lo] = STATUS_HIGHLIGHTED
+        # Regions are filled run by run with slice assignments
+        if state.pivot_range:
+            start = max(state.pivot_range.start, lo)
+            end = min(state.pivot_range.stop, hi)
+            if start < end:
+                status[start - lo:end - lo] = bytes((STATUS_HIGHLIGHTED,)) * (end - start)
+        for start, end in state.sorted_runs.overlapping(lo, hi):
+            status[start - lo:end - lo] = bytes((STATUS_SORTED,)) * (end - start)
+        return status
+    
+    def activeBand(self) -> Optional[tuple]:
+        """
+        Get the active region clipped to the array.
+        
+        Returns:
+            tuple: (start, end) index range, or None if there is no active region
+        """
+        active = self.state.active_range
+        if not active:
+            return None
+        start, end = max(0, active.start), min(len(self.state.array), active.stop)
+        return (start, end) if start < end else None
+    
+    def bandColor(self) -> QColor:
+        color = QColor(self.theme.value["text"])
+        color.setAlpha(140)
+        return color
+    
+    def drawActiveBand(self, painter: QPainter, lo: int, hi: int):
+        """Underline the part of the active region within lo..hi-1 below the baseline."""
+        band = self.activeBand()
+        if band is None or band[0] >= hi or band[1] <= lo:
+            return
+        start, end = band
+        width = self.width()
+        n = len(self.state.array)
+        PADDING = int(min(max(10, width * 0.02), 20))
+        available_width = width - (2 * PADDING)
+        if self.style == VisualizationStyle.BARS:
+            bar_width = max(1, int(available_width / n))
+            x0, x1 = PADDING + start * bar_width, PADDING + end * bar_width
+        else:
+            spacing = available_width / (n - 1) if n > 1 else 0
+            half = int(min(spacing / 2, 10))
+            x0 = int(PADDING + start * spacing) - half
+            x1 = int(PADDING + (end - 1) * spacing) + half + 1
+        painter.fillRect(QRect(x0, self.height() - 30 + BAND_GAP, x1 - x0, BAND_HEIGHT),
+                         self.bandColor())
+    
+    def statusColors(self) -> List[QColor]:
+        """Colors indexed by STATUS_* code."""
+        theme = self.theme.value
+        return [theme["primary"], theme["secondary"], theme["highlight"], theme["highlight"]]
+    
+    def drawBars(self, painter: QPainter, lo: int = 0, hi: int = None):
         width = self.width()
         height = self.height()
         n = len(self.state.array)
@@ -124,40 +594,64 @@ class VisualizerWidget(QFrame):
         # Calculate bar width and ensure it's at least 1 pixel
         bar_width = max(1, int(available_width / n))
         gap = min(1, int(bar_width * 0.1))  # Gap is 10% of bar width, but not more than 1 pixel
+        inner_width = max(1, bar_width - 2*gap)
         
         # Scale height to use full available space
-        max_val = max(self.state.array)
+        max_val = self._max_val
         available_height = height - 60  # Reserve space for labels
         height_scale = available_height / max_val
         
-        for i in range(n):
-            val = self.state.array[i]
-            bar_height = int(val * height_scale)
+        if hi is None:
+            hi = n
+        array = self.state.array
+        
+        # Group bars by color so each class is a single drawRects call
+        status = self.statusArray(lo, hi)
+        colors = self.statusColors()
+        buckets = [[] for _ in colors]
+        for i in range(lo, hi):
+            bar_height = int(array[i] * height_scale)
             x = int(PADDING + (i * bar_width))
             y = int(height - 30 - bar_height)
-            
-            # Set color based on state
-            if i in self.state.sorted_indices:
-                color = self.theme.value["secondary"]
-            elif i in self.state.highlighted_indices:
-                color = self.theme.value["highlight"]
-            elif i in self.state.compared_indices:
-                color = self.theme.value["highlight"]
-            else:
-                color = self.theme.value["primary"]
-            
-            # Draw bar with integer coordinates
-            painter.fillRect(x + gap, y, max(1, bar_width - 2*gap), bar_height, color)
-            
-            # Only draw values if there's enough space
-            if bar_width > 15:
-                painter.setPen(self.theme.value["text"])
-                painter.drawText(x, y - 15, bar_width, 20,
-                               Qt.AlignmentFlag.AlignCenter, str(val))
+            buckets[status[i - lo]].append(QRect(x + gap, y, inner_width, bar_height))
+        
+        painter.setPen(Qt.PenStyle.NoPen)
+        for color, rects in zip(colors, buckets):
+            if rects:
+                painter.setBrush(color)
+                painter.drawRects(*rects)
+        
+        # Only draw values if there's enough space
+        if bar_width > 15:
+            painter.setPen(self.theme.value["text"])
+            glyphs = self._glyphs
+            for i in range(lo, hi):
+                val = array[i]
+                glyph = glyphs.get(val)
+                if glyph is None:
+                    glyph = glyphs[val] = QStaticText(str(val))
+                bar_height = int(val * height_scale)
+                x = int(PADDING + (i * bar_width))
+                y = int(height - 30 - bar_height)
+                # Centre the label in the 20 px box above the bar
+                size = glyph.size()
+                painter.drawStaticText(QPointF(x + (bar_width - size.width()) / 2,
+                                               y - 15 + (20 - size.height()) / 2), glyph)
+    
+    def _drawPointBuckets(self, painter: QPainter, colors: List[QColor],
+                          buckets: List[List[QPointF]], dot_size: int):
+        """Draw round dots, one drawPoints call per color class."""
+        if dot_size < 1:
+            return
+        for color, points in zip(colors, buckets):
+            if points:
+                pen = QPen(color, dot_size)
+                pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+                painter.setPen(pen)
+                painter.drawPoints(QPolygonF(points))
 
-    def drawDots(self, painter: QPainter):
+    def drawDots(self, painter: QPainter, lo: int = 0, hi: int = None):
         width = self.width()
-        height = self.height()
         n = len(self.state.array)
         
         # Use full width with minimal padding
@@ -165,39 +659,45 @@ class VisualizerWidget(QFrame):
         available_width = width - (2 * PADDING)
         spacing = available_width / (n - 1) if n > 1 else available_width
         
-        max_val = max(self.state.array)
-        available_height = height - 60
-        height_scale = available_height / max_val
-        
         # Adjust dot size based on spacing but keep it reasonable
         dot_size = int(min(spacing * 0.8, 20))
         
-        for i, val in enumerate(self.state.array):
-            y = int(height - 30 - (val * height_scale))
-            x = int(PADDING + (i * spacing))
-            
-            if i in self.state.sorted_indices:
-                color = self.theme.value["secondary"]
-            elif i in self.state.highlighted_indices:
-                color = self.theme.value["highlight"]
-            elif i in self.state.compared_indices:
-                color = self.theme.value["highlight"]
-            else:
-                color = self.theme.value["primary"]
-            
-            # Draw connecting lines first
-            if i > 0:
-                prev_y = int(height - 30 - (self.state.array[i-1] * height_scale))
-                prev_x = int(PADDING + ((i-1) * spacing))
+        if hi is None:
+            hi = n
+        if self._polyline is None:
+            self.updatePolyline(set())
+        polyline = self._polyline[1]
+        first = max(0, lo - 1)
+        
+        status = self.statusArray(lo, hi)
+        colors = self.statusColors()
+        
+        # Draw connecting lines first: one polyline in the primary color, then
+        # the segments leading to points of any other class on top of it
+        painter.setPen(QPen(colors[STATUS_PRIMARY].lighter(), 1))
+        painter.drawPolyline(polyline.mid(first, hi - first))
+        
+        line_buckets = [[] for _ in colors]
+        point_buckets = [[] for _ in colors]
+        for i in range(lo, hi):
+            code = status[i - lo]
+            if code != STATUS_PRIMARY:
+                if i > 0:
+                    line_buckets[code].append(QLineF(polyline[i - 1], polyline[i]))
+                point_buckets[code].append(polyline[i])
+        for color, lines in zip(colors, line_buckets):
+            if lines:
                 painter.setPen(QPen(color.lighter(), 1))
-                painter.drawLine(prev_x, prev_y, x, y)
-            
-            # Draw dots with integer coordinates
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(color)
-            painter.drawEllipse(x - dot_size//2, y - dot_size//2, dot_size, dot_size)
+                painter.drawLines(*lines)
+        
+        if dot_size >= 1:
+            pen = QPen(colors[STATUS_PRIMARY], dot_size)
+            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+            painter.setPen(pen)
+            painter.drawPoints(polyline.mid(lo, hi - lo))
+        self._drawPointBuckets(painter, colors, point_buckets, dot_size)
 
-    def drawScatter(self, painter: QPainter):
+    def drawScatter(self, painter: QPainter, lo: int = 0, hi: int = None):
         width = self.width()
         height = self.height()
         n = len(self.state.array)
@@ -206,82 +706,209 @@ class VisualizerWidget(QFrame):
         PADDING = int(min(max(10, width * 0.02), 20))
         available_width = width - (2 * PADDING)
         
-        max_val = max(self.state.array)
+        max_val = self._max_val
         available_height = height - 60
         height_scale = available_height / max_val
         
         # Adjust dot size based on available space
         dot_size = int(min(available_width / n * 0.8, 15))
         
-        for i, val in enumerate(self.state.array):
+        if hi is None:
+            hi = n
+        array = self.state.array
+        
+        status = self.statusArray(lo, hi)
+        colors = self.statusColors()
+        guides = []
+        point_buckets = [[] for _ in colors]
+        for i in range(lo, hi):
             x = int(PADDING + (i * available_width / (n-1) if n > 1 else available_width/2))
-            y = int(height - 30 - (val * height_scale))
-            
-            if i in self.state.sorted_indices:
-                color = self.theme.value["secondary"]
-            elif i in self.state.highlighted_indices:
-                color = self.theme.value["highlight"]
-            elif i in self.state.compared_indices:
-                color = self.theme.value["highlight"]
-            else:
-                color = self.theme.value["primary"]
-            
-            # Draw vertical guide line
+            y = int(height - 30 - (array[i] * height_scale))
+            guides.append(QLineF(x, height - 30, x, y))
+            point_buckets[status[i - lo]].append(QPointF(x, y))
+        
+        # Draw vertical guide lines
+        if guides:
             painter.setPen(QPen(self.theme.value["text"], 1, Qt.PenStyle.DotLine))
-            painter.drawLine(x, height - 30, x, y)
-            
-            # Draw dot with integer coordinates
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(color)
-            painter.drawEllipse(x - dot_size//2, y - dot_size//2, dot_size, dot_size)
+            painter.drawLines(*guides)
+        
+        self._drawPointBuckets(painter, colors, point_buckets, dot_size)
 
     def drawCircular(self, painter: QPainter):
         width = self.width()
         height = self.height()
-        n = len(self.state.array)
         
         # Calculate center and radius
         center_x = width // 2
         center_y = height // 2
         radius = min(width, height) // 2 - 40
         
-        max_val = max(self.state.array)
+        max_val = self._max_val
         
-        # Calculate angle step to distribute elements evenly
-        angle_step = 2 * math.pi / n
+        # Angles only depend on n and the widget size, so they come from a table
+        cos_table, sin_table, outer_points = self.circularTables()
         
+        status = self.statusArray()
+        colors = self.statusColors()
+        line_buckets = [[] for _ in colors]
+        point_buckets = [[] for _ in colors]
         for i, val in enumerate(self.state.array):
-            # Calculate normalized bar height
-            bar_height = int((val / max_val) * radius)
-            
-            # Calculate angle for current element
-            angle = i * angle_step
-            
-            if i in self.state.sorted_indices:
-                color = self.theme.value["secondary"]
-            elif i in self.state.highlighted_indices:
-                color = self.theme.value["highlight"]
-            elif i in self.state.compared_indices:
-                color = self.theme.value["highlight"]
-            else:
-                color = self.theme.value["primary"]
-            
-            # Calculate start and end points with integer coordinates
-            inner_x = int(center_x + ((radius - bar_height) * math.cos(angle)))
-            inner_y = int(center_y + ((radius - bar_height) * math.sin(angle)))
-            outer_x = int(center_x + (radius * math.cos(angle)))
-            outer_y = int(center_y + (radius * math.sin(angle)))
+            # Distance of the inner end point from the center
+            inner_radius = radius - int((val / max_val) * radius)
+            inner = QPointF(int(center_x + (inner_radius * cos_table[i])),
+                            int(center_y + (inner_radius * sin_table[i])))
+            line_buckets[status[i]].append(QLineF(inner, outer_points[i]))
+            point_buckets[status[i]].append(inner)
+        
+        # Draw lines
+        for color, lines in zip(colors, line_buckets):
+            if lines:
+                painter.setPen(QPen(color, max(1, radius//100)))
+                painter.drawLines(*lines)
+        
+        # Draw dot at end point
+        dot_size = max(4, radius//50)
+        self._drawPointBuckets(painter, colors, point_buckets, dot_size)
+
+
+class RenderThread(QThread):
+    """
+    Dedicated thread that owns a FrameRenderer.
+    
+    The GUI thread posts updates (new state, steps, style, size...); the thread
+    applies everything posted since its last frame, renders once and hands the
+    finished frame back through frame_ready, so painting never blocks the GUI.
+    
+    Rendering shares the interpreter with the sorting thread, so after a slow
+    frame the thread rests long enough to keep its share of the time at
+    RENDER_SHARE; large arrays then animate at a lower frame rate instead of
+    slowing the sort down.
+    """
+    frame_ready = pyqtSignal(object)  # RenderedFrame
+    failed = pyqtSignal(str)  # once when frames start failing, not on every frame
+    
+    def __init__(self, renderer: FrameRenderer):
+        super().__init__()
+        self.renderer = renderer
+        self._condition = threading.Condition()
+        self._commands = []
+        self._stopping = False
+        self._failing = False
+    
+    def post(self, func, *args):
+        """Queue a call to run on the render thread before the next frame."""
+        with self._condition:
+            self._commands.append((func, args))
+            self._condition.notify()
+    
+    def stop(self):
+        """Stop the thread and wait for it to exit."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self.wait()
+    
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._commands and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                commands, self._commands = self._commands, []
             
-            # Draw line
-            painter.setPen(QPen(color, max(1, radius//100)))
-            painter.drawLine(inner_x, inner_y, outer_x, outer_y)
+            try:
+                start = time.perf_counter()
+                for func, args in commands:
+                    func(*args)
+                image, rects = self.renderer.render()
+                elapsed = time.perf_counter() - start
+                if image is not None:
+                    self.frame_ready.emit(RenderedFrame(image, rects, elapsed * 1000))
+                self._failing = False
+            except Exception as e:
+                # Later updates may fix the frame; until then the last good one stays up
+                if not self._failing:
+                    self._failing = True
+                    self.failed.emit(f"{type(e).__name__}: {e}")
+                continue
             
-            # Draw dot at end point
-            dot_size = max(4, radius//50)
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(color)
-            painter.drawEllipse(inner_x - dot_size//2, inner_y - dot_size//2, 
-                              dot_size, dot_size)
+            rest = elapsed * (1 / RENDER_SHARE - 1)
+            if rest > 0:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopping, rest)
+
+# Enhanced visualization widget
+class VisualizerWidget(QFrame):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.style = VisualizationStyle.BARS
+        self.theme = ColorTheme.CLASSIC
+        self.setMinimumSize(800, 500)
+        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Sunken)
+        self.setAutoFillBackground(True)
+        
+        # Front buffer: the last finished frame; everything else happens on the render thread
+        self.frame = None
+        self.render_ms = 0.0
+        self.renderer = FrameRenderer()
+        self.render_thread = RenderThread(self.renderer)
+        self.render_thread.frame_ready.connect(self.showFrame)
+        self.render_thread.start()
+        
+        self.updateTheme()
+    
+    def updateTheme(self):
+        palette = self.palette()
+        palette.setColor(QPalette.ColorRole.Window, self.theme.value["background"])
+        self.setPalette(palette)
+    
+    def setState(self, state: SortingState):
+        self.render_thread.post(self.renderer.setState, state)
+    
+    def applySteps(self, steps: List[SortingStep]):
+        """Hand steps of operation events to the render thread, which repaints once."""
+        if steps:
+            self.render_thread.post(self.renderer.applySteps, steps)
+    
+    def setStyle(self, style: VisualizationStyle):
+        self.style = style
+        self.render_thread.post(self.renderer.setStyle, style)
+    
+    def setTheme(self, theme: ColorTheme):
+        self.theme = theme
+        self.updateTheme()
+        self.render_thread.post(self.renderer.setTheme, theme)
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.render_thread.post(self.renderer.resize, self.width(), self.height(),
+                                self.devicePixelRatioF())
+    
+    def showFrame(self, frame: RenderedFrame):
+        """Swap in a finished frame and repaint the areas it changed."""
+        self.frame = frame.image
+        self.render_ms = frame.render_ms
+        if frame.rects is None:
+            self.update()
+        else:
+            for rect in frame.rects:
+                self.update(rect)
+    
+    def paintEvent(self, event):
+        if self.frame is None:
+            return
+        
+        rect = event.rect()
+        ratio = self.frame.devicePixelRatio()
+        source = QRect(int(rect.x() * ratio), int(rect.y() * ratio),
+                       int(rect.width() * ratio), int(rect.height() * ratio))
+        painter = QPainter(self)
+        painter.drawImage(rect, self.frame, source)
+    
+    def shutdown(self):
+        """Stop the render thread; call before the widget is destroyed."""
+        self.render_thread.stop()
 
 # Enhanced main window with modern UI
 class MainWindow(QMainWindow):
@@ -297,8 +924,20 @@ class MainWindow(QMainWindow):
         self.algorithms = self._load_all_algorithms()
         self.current_array = []
         self.worker = None
+        self.stats = None
+        self.baselines = None
+        self.baseline_timer = BaselineTimer()
+        self.baseline_timer.measured.connect(self.show_baselines)
+        self.baseline_timer.failed.connect(self.baseline_failed)
+        self.achieved_rate = 0.0
+        self._rate_sample = (0.0, 0)
         self.current_theme = ColorTheme.CLASSIC
         
+        # Frame clock: repaint with the latest state at a fixed rate
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(1000 // FRAME_RATE)
+        self.frame_timer.timeout.connect(self.render_frame)
+        
         # Set application style
         QApplication.setStyle(QStyleFactory.create("Fusion"))
         
@@ -313,17 +952,16 @@ class MainWindow(QMainWindow):
         # Connect visualization settings signals
         self.style_selector.currentIndexChanged.connect(self.update_visualization_style)
         self.theme_selector.currentIndexChanged.connect(self.update_visualization_theme)
-    def _load_all_algorithms(self) -> List[Type[SortingAlgorithm]]:
+    def _load_all_algorithms(self) -> List[PluginInfo]:
             """Load both built-in and plugin algorithms"""
             # First, load built-in algorithms
             builtin_algorithms = [] # i had in previous version, however now they all are in plugins
             
-            # Then load plugins
-            plugin_algorithms = self.plugin_loader.discover_algorithms()
+            # Then list plugins from the metadata index; each module is imported when selected
+            plugin_algorithms = self.plugin_loader.discover_plugins()
             
-            # Combine and sort all algorithms
-            all_algorithms = builtin_algorithms + plugin_algorithms
-            return sorted(all_algorithms, key=lambda x: x().name())
+            # Combine all algorithms (the plugin list is already sorted by name)
+            return builtin_algorithms + plugin_algorithms
 
     def update_visualization_style(self):
         style_name = self.style_selector.currentText()
@@ -350,6 +988,11 @@ class MainWindow(QMainWindow):
         new_action.triggered.connect(self.generate_array)
         toolbar.addAction(new_action)
         
+        open_action = QAction(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogOpenButton),
+                              "Replay Trace", self)
+        open_action.triggered.connect(self.open_trace)
+        toolbar.addAction(open_action)
+        
         self.addToolBar(toolbar)
     
     def setup_ui(self):
@@ -367,14 +1010,22 @@ class MainWindow(QMainWindow):
         
         self.algorithm_selector = QComboBox()
         for algo in self.algorithms:
-            self.algorithm_selector.addItem(algo().name())
+            self.algorithm_selector.addItem(algo.name)
         algo_layout.addWidget(self.algorithm_selector)
         
         # Algorithm info
         self.algo_info = QLabel()
         self.algo_info.setWordWrap(True)
         algo_layout.addWidget(self.algo_info)
+        
+        # Options of the selected algorithm, rebuilt when the selection changes
+        self.options_widget = QWidget()
+        self.options_form = QFormLayout(self.options_widget)
+        self.options_form.setContentsMargins(0, 0, 0, 0)
+        self.option_selectors = {}
+        algo_layout.addWidget(self.options_widget)
         self.algorithm_selector.currentIndexChanged.connect(self.update_algorithm_info)
+        self.update_algorithm_info()
         
         algo_group.setLayout(algo_layout)
         control_panel.addWidget(algo_group)
@@ -386,7 +1037,7 @@ class MainWindow(QMainWindow):
         # Array size control
         size_layout = QHBoxLayout()
         self.size_spinner = QSpinBox()
-        self.size_spinner.setRange(10, 500)
+        self.size_spinner.setRange(10, MAX_ARRAY_SIZE)
         self.size_spinner.setValue(50)
         size_layout.addWidget(QLabel("Size:"))
         size_layout.addWidget(self.size_spinner)
@@ -396,10 +1047,12 @@ class MainWindow(QMainWindow):
         self.random_array = QRadioButton("Random")
         self.nearly_sorted = QRadioButton("Nearly Sorted")
         self.reversed_array = QRadioButton("Reversed")
+        self.few_unique = QRadioButton("Few Unique")
         self.random_array.setChecked(True)
         array_layout.addWidget(self.random_array)
         array_layout.addWidget(self.nearly_sorted)
         array_layout.addWidget(self.reversed_array)
+        array_layout.addWidget(self.few_unique)
         
         array_group.setLayout(array_layout)
         control_panel.addWidget(array_group)
@@ -425,11 +1078,52 @@ class MainWindow(QMainWindow):
         # Speed control
         speed_layout = QHBoxLayout()
         self.speed_slider = QSlider(Qt.Orientation.Horizontal)
-        self.speed_slider.setRange(1, 100)
+        self.speed_slider.setRange(1, SPEED_UNTHROTTLED)
         self.speed_slider.setValue(50)
+        self.speed_label = QLabel()
+        self.speed_label.setMinimumWidth(90)
+        self.speed_slider.valueChanged.connect(self.update_speed)
         speed_layout.addWidget(QLabel("Speed:"))
         speed_layout.addWidget(self.speed_slider)
+        speed_layout.addWidget(self.speed_label)
         vis_layout.addLayout(speed_layout)
+        self.update_speed(self.speed_slider.value())
+        
+        # Fixed-duration playback replaces the speed with whatever rate fills it
+        duration_layout = QHBoxLayout()
+        self.duration_check = QCheckBox("Play in")
+        self.duration_check.setToolTip("Record the sort at full speed first, "
+                                       "then play it back in exactly this time")
+        self.duration_spinner = QSpinBox()
+        self.duration_spinner.setRange(1, 3600)
+        self.duration_spinner.setValue(15)
+        self.duration_spinner.setSuffix(" s")
+        self.duration_spinner.setEnabled(False)
+        self.duration_check.toggled.connect(self.duration_spinner.setEnabled)
+        self.duration_check.toggled.connect(
+            lambda checked: self.speed_slider.setEnabled(not checked))
+        duration_layout.addWidget(self.duration_check)
+        duration_layout.addWidget(self.duration_spinner)
+        vis_layout.addLayout(duration_layout)
+        
+        # Runs can be saved as binary traces and replayed later
+        self.record_check = QCheckBox("Save trace to file")
+        self.record_check.setToolTip("Record every operation of the next sort to a trace file")
+        vis_layout.addWidget(self.record_check)
+        
+        # Timing a run again without visualization can take as long as the run
+        # itself, so it is only done on request
+        self.baseline_check = QCheckBox("Time without visualization")
+        self.baseline_check.setToolTip("After each sort, time the plugin without visualization "
+                                       "and list.sort / numpy.sort on the same input")
+        vis_layout.addWidget(self.baseline_check)
+        
+        # What the sorting thread does when the display falls behind
+        self.queue_selector = QComboBox()
+        for policy, label in QUEUE_POLICY_LABELS.items():
+            self.queue_selector.addItem(label, policy)
+        vis_layout.addWidget(QLabel("When display lags:"))
+        vis_layout.addWidget(self.queue_selector)
         
         vis_group.setLayout(vis_layout)
         control_panel.addWidget(vis_group)
@@ -444,6 +1138,22 @@ class MainWindow(QMainWindow):
         button_layout.addWidget(self.sort_button)
         control_panel.addLayout(button_layout)
         
+        # Run controls, only active while sorting
+        run_layout = QHBoxLayout()
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.pause_button.setEnabled(False)
+        self.back_button = QPushButton("Back")
+        self.back_button.clicked.connect(self.step_back)
+        self.back_button.setEnabled(False)
+        self.step_button = QPushButton("Step")
+        self.step_button.clicked.connect(self.step_sorting)
+        self.step_button.setEnabled(False)
+        run_layout.addWidget(self.pause_button)
+        run_layout.addWidget(self.back_button)
+        run_layout.addWidget(self.step_button)
+        control_panel.addLayout(run_layout)
+        
         # Add stretch to push controls to the top
         control_panel.addStretch()
         
@@ -464,15 +1174,32 @@ class MainWindow(QMainWindow):
         # Create visualizer
         visualization_layout = QVBoxLayout()
         self.visualizer = VisualizerWidget()
+        self.visualizer.render_thread.failed.connect(self.rendering_failed)
         visualization_layout.addWidget(self.visualizer)
         
+        # Timeline of the run, for seeking while paused or after it finished
+        timeline_layout = QHBoxLayout()
+        self.timeline_slider = QSlider(Qt.Orientation.Horizontal)
+        self.timeline_slider.setRange(0, 0)
+        self.timeline_slider.setEnabled(False)
+        self.timeline_slider.valueChanged.connect(self.seek_timeline)
+        self.timeline_label = QLabel()
+        self.timeline_label.setMinimumWidth(160)
+        timeline_layout.addWidget(self.timeline_slider)
+        timeline_layout.addWidget(self.timeline_label)
+        visualization_layout.addLayout(timeline_layout)
+        
         # Add visualization area to main layout
         vis_widget = QWidget()
         vis_widget.setLayout(visualization_layout)
         main_layout.addWidget(vis_widget)
     
     def update_algorithm_info(self):
-        algorithm = self.algorithms[self.algorithm_selector.currentIndex()]()
+        if self.algorithm_selector.currentIndex() < 0:
+            return
+        algorithm = self.algorithms[self.algorithm_selector.currentIndex()]
+        # Import the selected plugin now, so starting a run does not wait on it
+        algorithm_class = algorithm.load()
         info_text = f"""
         <b>Description:</b> {algorithm.description}
         <br><br>
@@ -481,6 +1208,18 @@ class MainWindow(QMainWindow):
         <b>Space Complexity:</b> {algorithm.space_complexity}
         """
         self.algo_info.setText(info_text)
+        
+        # One choice box per option the algorithm declares, defaulting to its first choice
+        while self.options_form.rowCount():
+            self.options_form.removeRow(0)
+        self.option_selectors = {}
+        for option in algorithm_class.options if algorithm_class else ():
+            selector = QComboBox()
+            for choice in option.choices:
+                selector.addItem(str(choice), choice)
+            self.options_form.addRow(f"{option.label}:", selector)
+            self.option_selectors[option.key] = selector
+        self.options_widget.setVisible(bool(self.option_selectors))
     
     def setup_statusbar(self):
         self.statusbar = QStatusBar()
@@ -488,26 +1227,30 @@ class MainWindow(QMainWindow):
         self.statusbar.showMessage("Ready")
     
     def generate_array(self):
+        # A new array replaces the one being sorted, and the timeline of the last run
+        self.cancel_sorting()
+        self.worker = None
+        self.baseline_timer.discard()
+        self.update_timeline()
+        self.set_timeline_enabled(False)
+        self.step_button.setEnabled(False)
         size = self.size_spinner.value()
         
         if self.random_array.isChecked():
-            self.current_array = random.sample(range(1, size + 1), size)
+            self.current_array = generate_array(size, "random")
         elif self.nearly_sorted.isChecked():
-            self.current_array = list(range(1, size + 1))
-            # Introduce some randomness
-            swaps = size // 10
-            for _ in range(swaps):
-                i, j = random.sample(range(size), 2)
-                self.current_array[i], self.current_array[j] = self.current_array[j], self.current_array[i]
+            self.current_array = generate_array(size, "nearly_sorted")
+        elif self.few_unique.isChecked():
+            self.current_array = generate_array(size, "few_unique")
         else:  # reversed
-            self.current_array = list(range(size, 0, -1))
+            self.current_array = generate_array(size, "reversed")
         
         self.visualizer.setState(SortingState(self.current_array))
         self.sort_button.setEnabled(True)
         self.update_stats(None)
         self.statusbar.showMessage("New array generated")
     
-    def update_stats(self, stats: SortingStats):
+    def update_stats(self, stats: SortingStats, buffer: StepBuffer = None):
         if not stats:
             self.stats_label.setText("No sorting in progress")
             return
@@ -517,7 +1260,52 @@ class MainWindow(QMainWindow):
         <br>
         <b>Swaps:</b> {stats.swaps:,}
         <br>
-        <b>Time:</b> {stats.duration:.2f} seconds
+        <b>Reads / Writes:</b> {stats.reads:,} / {stats.writes:,}
+        <br>
+        <b>Wall time:</b> {stats.duration:.2f} seconds
+        <br>
+        <b>Algorithm / Callback / Throttle:</b> {stats.algorithm_ns / 1e6:,.1f} /
+        {stats.callback_ns / 1e6:,.1f} / {stats.throttle_ns / 1e6:,.1f} ms
+        <br>
+        <b>Render:</b> {self.visualizer.render_ms:.1f} ms/frame (budget {1000 / FRAME_RATE:.1f} ms)
+        """
+        if self.worker:
+            stats_text += f"""
+        <br>
+        <b>Operations:</b> {self.worker.driver.ops:,} at {format_rate(self.achieved_rate)}
+        (target {format_rate(self.worker.driver.throttle.rate)})
+        <br>
+        <b>Timeline:</b> {self.worker.timeline.nbytes / 2**20:,.1f} MiB,
+        checkpoint every {self.worker.timeline.interval:,} ops
+        """
+            # Measurements the plugin reports about its own run; a replay has no plugin
+            if self.worker.algorithm:
+                for name, value in self.worker.algorithm.metrics.items():
+                    stats_text += f"""
+        <br>
+        {format_metric(name, value)}
+        """
+        if self.baselines:
+            baselines = self.baselines
+            stats_text += f"""
+        <br>
+        <b>Without visualization:</b> {baselines.pure_time * 1000:,.2f} ms
+        (list.sort {baselines.list_sort_time * 1000:,.3f} ms,
+        numpy.sort {baselines.numpy_sort_time * 1000:,.3f} ms)
+        """
+        if buffer:
+            stats_text += f"""
+        <br>
+        <b>Frames:</b> {buffer.frames:,} ({buffer.coalesced:,} steps coalesced)
+        <br>
+        <b>Queue:</b> {buffer.depth:,}/{buffer.capacity:,} (peak {buffer.peak_depth:,})
+        <br>
+        <b>Dropped:</b> {buffer.dropped:,} steps, {buffer.keyframes:,} keyframes
+        """
+            if buffer.policy is QueuePolicy.BLOCK:
+                stats_text += f"""
+        <br>
+        <b>Blocked:</b> {buffer.blocked_time:.2f} seconds
         """
         self.stats_label.setText(stats_text)
     
@@ -525,66 +1313,438 @@ class MainWindow(QMainWindow):
         if self.worker and self.worker.isRunning():
             return
         
-        # Disable controls
+        info = self.algorithms[self.algorithm_selector.currentIndex()]
+        algorithm_class = info.load()
+        if algorithm_class is None:
+            QMessageBox.critical(self, "Plugin Error", f"Could not load {info.name} from {info.path}")
+            return
+        algorithm = algorithm_class(**{key: selector.currentData()
+                                        for key, selector in self.option_selectors.items()})
+        record_path = None
+        if self.record_check.isChecked():
+            record_path, _ = QFileDialog.getSaveFileName(
+                self, "Save Trace", f"{algorithm.name().replace(' ', '_').lower()}.strace",
+                TRACE_FILTER)
+            if not record_path:
+                return
+        self.start_worker(algorithm, record_path=record_path)
+    
+    def open_trace(self):
+        """Replay a trace file saved by an earlier run."""
+        path, _ = QFileDialog.getOpenFileName(self, "Replay Trace", "", TRACE_FILTER)
+        if not path:
+            return
+        try:
+            trace = TraceFile(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Replay Error", f"Could not open the trace:\n{e}")
+            return
+        self.cancel_sorting()
+        self.current_array = trace.initial
+        self.start_worker(None, replay=trace)
+    
+    def start_worker(self, algorithm: Optional[SortingAlgorithm], record_path: str = None,
+                     replay: TraceFile = None):
+        """Start a sort of the current array, or the replay of a trace."""
+        # Disable controls; Generate stays available and cancels the run
         self.sort_button.setEnabled(False)
-        self.generate_button.setEnabled(False)
         self.algorithm_selector.setEnabled(False)
+        self.options_widget.setEnabled(False)
         self.size_spinner.setEnabled(False)
+        self.queue_selector.setEnabled(False)
+        self.duration_check.setEnabled(False)
+        self.duration_spinner.setEnabled(False)
+        self.record_check.setEnabled(False)
+        self.set_timeline_enabled(False)
         
         # Create and start worker
-        algorithm = self.algorithms[self.algorithm_selector.currentIndex()]()
-        self.worker = SortingWorker(algorithm, self.current_array, self.speed_slider.value())
-        self.worker.update_signal.connect(self.update_visualization)
+        self.stats = SortingStats(start_time=time.time())
+        self.baselines = None
+        self.baseline_timer.discard()
+        self.visualizer.setState(SortingState(self.current_array))
+        duration = self.duration_spinner.value() if self.duration_check.isChecked() else None
+        self.worker = SortingWorker(algorithm, self.current_array, self.speed_slider.value(),
+                                    self.queue_selector.currentData(), self.stats, duration,
+                                    record_path, replay)
         self.worker.finished_signal.connect(self.sorting_finished)
         self.worker.error_signal.connect(self.sorting_error)
+        self.worker.recorded_signal.connect(self.trace_recorded)
+        self.achieved_rate = 0.0
+        self._rate_sample = (time.perf_counter(), 0)
         self.worker.start()
+        self.frame_timer.start()
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(True)
         
-        self.statusbar.showMessage(f"Sorting with {algorithm.name()}...")
+        if replay:
+            self.statusbar.showMessage(
+                f"Replaying {replay.name or 'trace'} ({replay.ops:,} operations) from {replay.path}")
+        elif duration:
+            self.statusbar.showMessage(f"Recording {algorithm.name()} at full speed...")
+        else:
+            self.statusbar.showMessage(f"Sorting with {algorithm.name()}...")
     
-    def update_visualization(self, state: SortingState):
-        self.visualizer.setState(state)
-        self.update_stats(state.stats)
+    def render_frame(self):
+        """Apply every step queued since the last frame and repaint once."""
+        if not self.worker:
+            return
+        if self.worker.driving:
+            self.measure_rate()
+        steps = self.worker.buffer.drain()
+        if steps:
+            self.visualizer.applySteps(steps)
+            last = steps[-1]
+            self.stats.comparisons = last.comparisons
+            self.stats.swaps = last.swaps
+            self.stats.reads = last.reads
+            self.stats.writes = last.writes
+        self.update_stats(self.stats, self.worker.buffer)
+        self.update_timeline()
     
-    def sorting_finished(self):
-        # Re-enable controls
+    def update_timeline(self):
+        """Show the run's position on the timeline, unless the slider is being dragged."""
+        if not self.worker:
+            self.timeline_slider.setRange(0, 0)
+            self.timeline_label.setText("")
+            return
+        timeline = self.worker.timeline
+        if not self.timeline_slider.isSliderDown():
+            # Following the run is not a seek
+            self.timeline_slider.blockSignals(True)
+            self.timeline_slider.setRange(0, len(timeline))
+            self.timeline_slider.setValue(timeline.cursor)
+            self.timeline_slider.blockSignals(False)
+        # Events forgotten to stay within the memory budget still count in the numbering
+        self.timeline_label.setText(f"Event {timeline.dropped + timeline.cursor:,} / "
+                                    f"{timeline.dropped + len(timeline):,}")
+    
+    def set_timeline_enabled(self, enabled: bool):
+        """Allow seeking, which needs a paused or finished run."""
+        self.timeline_slider.setEnabled(enabled)
+        self.back_button.setEnabled(enabled)
+    
+    def seek_timeline(self, event: int):
+        """Move a paused or finished run to the event picked on the timeline."""
+        if not (self.worker and self.timeline_slider.isEnabled()):
+            return
+        self.worker.seek(event)
+        if not self.worker.driving:
+            self.render_frame()
+    
+    def step_back(self):
+        """Undo the last event of a paused or finished run."""
+        if not self.worker:
+            return
+        self.worker.step_back()
+        if not self.worker.driving:
+            self.render_frame()
+    
+    def measure_rate(self):
+        """Update the achieved operation rate, averaged over RATE_WINDOW seconds."""
+        now = time.perf_counter()
+        then, ops = self._rate_sample
+        if now - then >= RATE_WINDOW:
+            current = self.worker.driver.ops
+            self.achieved_rate = (current - ops) / (now - then)
+            self._rate_sample = (now, current)
+    
+    def update_speed(self, speed: int):
+        """Show the target rate of a slider position and apply it to a running sort."""
+        rate = speed_rate(speed)
+        self.speed_label.setText(format_rate(rate))
+        if self.worker and self.worker.isRunning() and not self.worker.duration:
+            self.worker.driver.set_speed(rate)
+    
+    def rendering_failed(self, error_message: str):
+        """Report a frame the render thread could not draw; the last good frame stays shown."""
+        QMessageBox.warning(self, "Rendering Error",
+                            f"The visualization could not be drawn:\n{error_message}")
+    
+    def trace_recorded(self, trace: OperationTrace):
+        """Report the recorded run as its playback starts."""
+        if self.sender() is not None and self.sender() is not self.worker:
+            return
+        self.statusbar.showMessage(
+            f"Recorded {trace.ops:,} operations ({trace.nbytes / 2**20:,.1f} MiB), "
+            f"playing them in {self.worker.duration} s")
+    
+    def toggle_pause(self):
+        if not (self.worker and self.worker.isRunning()):
+            return
+        driver = self.worker.driver
+        if driver.paused:
+            driver.resume()
+            self.pause_button.setText("Pause")
+            self.step_button.setEnabled(False)
+            self.set_timeline_enabled(False)
+            self.statusbar.showMessage("Sorting resumed")
+        else:
+            driver.pause()
+            self.pause_button.setText("Resume")
+            self.step_button.setEnabled(True)
+            self.set_timeline_enabled(True)
+            self.statusbar.showMessage("Sorting paused")
+    
+    def step_sorting(self):
+        if not self.worker:
+            return
+        if self.worker.driving:
+            self.worker.driver.step()
+        else:
+            # A finished run steps forward through its timeline
+            self.worker.seek(self.worker.timeline.cursor + 1)
+            self.render_frame()
+    
+    def cancel_sorting(self):
+        """Stop a running sort; it gives up before its next step."""
+        if not (self.worker and self.worker.isRunning()):
+            return
+        self.worker.cancel()
+        self.worker.wait()
+        self.frame_timer.stop()
+        self.worker = None
+        self.reset_controls()
+        self.statusbar.showMessage("Sorting cancelled")
+    
+    def reset_controls(self):
         self.sort_button.setEnabled(True)
         self.generate_button.setEnabled(True)
         self.algorithm_selector.setEnabled(True)
+        self.options_widget.setEnabled(True)
         self.size_spinner.setEnabled(True)
+        self.queue_selector.setEnabled(True)
+        self.duration_check.setEnabled(True)
+        self.duration_spinner.setEnabled(self.duration_check.isChecked())
+        self.record_check.setEnabled(True)
+        self.pause_button.setText("Pause")
+        self.pause_button.setEnabled(False)
+        self.step_button.setEnabled(False)
+        self.set_timeline_enabled(False)
+    
+    def sorting_finished(self):
+        # Ignore signals a cancelled worker queued before it stopped
+        if self.sender() is not None and self.sender() is not self.worker:
+            return
+        # Flush whatever the worker produced after the last frame
+        self.frame_timer.stop()
+        self.render_frame()
+        if self.stats.end_time == 0.0:
+            self.stats.end_time = time.time()
+        # Report the rate over the whole run, pauses excluded
+        if self.worker and self.worker.driver.run_ns:
+            self.achieved_rate = self.worker.driver.ops * 1e9 / self.worker.driver.run_ns
+        self.update_stats(self.stats, self.worker.buffer if self.worker else None)
         
-        self.statusbar.showMessage("Sorting completed!")
+        # Re-enable controls; the finished run stays on the timeline
+        self.reset_controls()
+        if self.worker:
+            self.step_button.setEnabled(True)
+            self.set_timeline_enabled(True)
+        
+        if self.worker and self.worker.replay:
+            self.statusbar.showMessage("Replay completed!")
+        elif self.worker and self.baseline_check.isChecked():
+            # A fresh instance with the same options, so the run's metrics stay as shown
+            algorithm = type(self.worker.algorithm)(**self.worker.algorithm.settings)
+            self.baseline_timer.request(self.worker, algorithm, self.worker.initial)
+            self.statusbar.showMessage("Sorting completed! Timing it without visualization...")
+        else:
+            self.statusbar.showMessage("Sorting completed!")
         
         # Show completion dialog
         QMessageBox.information(self, "Sorting Complete", 
                               "The sorting algorithm has finished executing!")
     
+    def show_baselines(self, worker: "SortingWorker", baselines: BaselineTimes):
+        """Show the unvisualized timings measured after the run finished."""
+        # Runs or arrays that replaced the timed one make the timings stale
+        if worker is not self.worker:
+            return
+        self.baselines = baselines
+        self.update_stats(self.stats, self.worker.buffer)
+        self.statusbar.showMessage("Sorting completed!")
+    
+    def baseline_failed(self, worker: "SortingWorker", error_message: str):
+        """Report a run that could not be timed without visualization."""
+        if worker is self.worker:
+            self.statusbar.showMessage(f"Could not time the run without visualization: {error_message}")
+    
+    def closeEvent(self, event):
+        self.frame_timer.stop()
+        if self.worker:
+            self.worker.cancel()
+            self.worker.wait()
+        self.visualizer.shutdown()
+        super().closeEvent(event)
+    
     def sorting_error(self, error_message: str):
+        if self.sender() is not None and self.sender() is not self.worker:
+            return
         QMessageBox.critical(self, "Sorting Error", 
                            f"An error occurred during sorting:\n{error_message}")
         self.sorting_finished()
 
+class BaselineTimer(QObject):
+    """
+    Times finished runs without visualization on one background thread.
+    
+    An unvisualized sort cannot be interrupted, so nothing ever waits for the
+    thread. Only the latest request is kept: asking again while a measurement
+    runs replaces the request still waiting, so however many runs finish, at
+    most one measurement runs and one waits.
+    """
+    measured = pyqtSignal(object, object)  # requester, BaselineTimes
+    failed = pyqtSignal(object, str)  # requester, error message
+    
+    def __init__(self):
+        super().__init__()
+        self._condition = threading.Condition()
+        self._pending = None
+        threading.Thread(target=self._run, name="baselines", daemon=True).start()
+    
+    def request(self, requester, algorithm: SortingAlgorithm, data: List[int]):
+        """Time algorithm on data once the measurement running now, if any, is done."""
+        with self._condition:
+            self._pending = (requester, algorithm, data)
+            self._condition.notify()
+    
+    def discard(self):
+        """Drop the request still waiting, if any."""
+        with self._condition:
+            self._pending = None
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                (requester, algorithm, data), self._pending = self._pending, None
+            try:
+                self.measured.emit(requester, measure_baselines(algorithm, data))
+            except Exception as e:
+                self.failed.emit(requester, str(e))
+
 # Enhanced sorting worker thread
 class SortingWorker(QThread):
-    update_signal = pyqtSignal(SortingState)
     finished_signal = pyqtSignal()
     error_signal = pyqtSignal(str)
+    recorded_signal = pyqtSignal(object)  # OperationTrace, before playback starts
     
-    def __init__(self, algorithm: SortingAlgorithm, array: List[int], speed: int):
+    def __init__(self, algorithm: Optional[SortingAlgorithm], array: List[int], speed: int,
+                 policy: QueuePolicy = QueuePolicy.BLOCK, stats: SortingStats = None,
+                 duration: Optional[float] = None, record_path: Optional[str] = None,
+                 replay: Optional[TraceFile] = None):
         super().__init__()
         self.algorithm = algorithm
+        self.initial = array.copy()
         self.array = array.copy()
-        self.delay = (101 - speed) / 1000  # Convert speed (1-100) to delay in seconds
+        self.duration = duration
+        # A replayed trace stands in for the algorithm; any run can be saved to a file
+        self.replay = replay
+        self.record_path = record_path
+        # The driver paces the operations and handles pause, single-step and cancel
+        self.driver = SortDriver(speed_rate(speed), stats)
+        # With a fixed duration the sort first runs unthrottled into a trace,
+        # which the driver then plays back at the rate that fills the duration
+        self.recorder = SortDriver(None, self.driver.stats) if duration and not replay else None
+        # Only compact operation events cross the thread boundary; the timeline
+        # diffs legacy SortingState snapshots and logs the recent events for seeking
+        self.timeline = Timeline(self.array)
+        # Steps are picked up by the GUI's frame clock, not signalled one by one;
+        # keyframes resynchronize it when the policy drops steps or the run seeks
+        self.buffer = StepBuffer(QUEUE_CAPACITY, policy, self.timeline.mirror.snapshot)
+        # Until the driver returns, the timeline is only moved on the worker thread
+        self.driving = True
+        self._seek_to = None
     
     def run(self):
+        writer = None
         try:
-            def update_callback(state: SortingState):
-                self.update_signal.emit(state)
-                time.sleep(self.delay)
+            timeline = self.timeline
+            buffer = self.buffer
             
-            self.algorithm.sort(self.array, update_callback)
-            self.finished_signal.emit()
+            if self.record_path:
+                writer = TraceWriter(self.record_path, self.array, self.algorithm.name())
+                record = writer.record
+                
+                def sink(event: SortingEvent):
+                    # Events replayed after a seek back are already in the file
+                    if timeline.live:
+                        record(event)
+                    buffer.push(timeline.step(event))
+            else:
+                def sink(event: SortingEvent):
+                    buffer.push(timeline.step(event))
+            
+            if self.replay:
+                # A saved trace is fed through the driver exactly like a live run
+                events = self.replay.steps()
+                if self.duration:
+                    self.driver.set_speed(max(1, len(self.replay)) / self.duration)
+            else:
+                # The algorithm is pulled one step at a time, so it never sleeps itself
+                events = self.algorithm.steps(self.array)
+            if self.recorder:
+                trace = OperationTrace(self.array)
+                if not self.recorder.run(events, trace.record):
+                    return
+                self.driver.set_speed(max(1, len(trace)) / self.duration)
+                self.recorded_signal.emit(trace)
+                events = trace.steps()
+            
+            # Waiting on a full queue is timed as throttling, not as callback time
+            completed = self.driver.run(timeline.play(events), sink, buffer)
+            self.driving = False
+            if completed:
+                if writer:
+                    writer.close(complete=True)
+                self.finished_signal.emit()
         except Exception as e:
             self.error_signal.emit(str(e))
+        finally:
+            self.driving = False
+            if writer:
+                # Still open only if the run was cancelled or failed
+                writer.close(complete=False)
+            if self.replay:
+                self.replay.close()
+    
+    def seek(self, event: int):
+        """
+        Move the timeline to an event and queue the state there as a keyframe.
+        
+        A paused run moves on its own thread between two steps, a finished one
+        right away; of several seeks waiting for the thread only the last is made.
+        """
+        self._seek_to = event
+        if self.driving:
+            self.driver.post(self._seek)
+        else:
+            self._seek()
+    
+    def _seek(self):
+        event, self._seek_to = self._seek_to, None
+        if event is not None:
+            self.timeline.seek(event)
+            self.buffer.push(self.timeline.keyframe())
+    
+    def step_back(self):
+        """Undo the last event on the timeline, on the same terms as seek()."""
+        if self.driving:
+            self.driver.post(self._step_back)
+        else:
+            self._step_back()
+    
+    def _step_back(self):
+        self.timeline.step_back()
+        self.buffer.push(self.timeline.keyframe())
+    
+    def cancel(self):
+        """Stop the run before its next step, even if it is blocked on a full queue."""
+        if self.recorder:
+            self.recorder.cancel()
+        self.driver.cancel()
+        self.buffer.close()
 
 # Main entry point with error handling
 def main():
@@ -1,10 +1,53 @@
 import os
 import inspect
+import hashlib
 import importlib.util
-from typing import List, Type
+import json
+from typing import Dict, List, Optional, Type
 from algorithms import SortingAlgorithm
 
 
+# Metadata index kept in the plugins directory, so startup does not import every plugin
+INDEX_FILE = ".plugin_index.json"
+INDEX_VERSION = 1
+
+
+class PluginInfo:
+    """
+    Metadata of one algorithm class in a plugin file, with the class imported on demand.
+    
+    Attributes:
+        path (str): Plugin file defining the class
+        class_name (str): Name of the class in that file
+        name (str): Algorithm name, as returned by name()
+        description (str): Algorithm description
+        time_complexity (str): Time complexity
+        space_complexity (str): Space complexity
+    """
+
+    def __init__(self, loader: "PluginLoader", path: str, class_name: str, name: str,
+                 description: str, time_complexity: str, space_complexity: str):
+        self._loader = loader
+        self.path = path
+        self.class_name = class_name
+        self.name = name
+        self.description = description
+        self.time_complexity = time_complexity
+        self.space_complexity = space_complexity
+
+    def load(self) -> Optional[Type[SortingAlgorithm]]:
+        """
+        Import the plugin module, the first time only, and get the class.
+        
+        Returns:
+            Type[SortingAlgorithm]: The algorithm class, or None if it cannot be loaded
+        """
+        return self._loader.load_class(self.path, self.class_name)
+
+    def __repr__(self) -> str:
+        return f"PluginInfo({self.name!r}, {os.path.basename(self.path)}:{self.class_name})"
+
+
 class PluginLoader:
     def __init__(self, plugin_dir: str = "plugins"):
         """
@@ -14,6 +57,9 @@ class PluginLoader:
             plugin_dir (str): Path to the plugins directory (relative to the main script)
         """
         self.plugin_dir = plugin_dir
+        self.index_path = os.path.join(plugin_dir, INDEX_FILE)
+        # Modules imported so far, by file path; each plugin file is executed once
+        self._modules = {}
         self._create_plugin_dir()
 
     def _create_plugin_dir(self):
@@ -47,30 +93,141 @@ class PluginLoader:
             print(f"Error loading module {module_name}: {e}")
             return None
 
-    def discover_algorithms(self) -> List[Type[SortingAlgorithm]]:
+    def _import(self, filepath: str):
+        """Load a plugin module once and keep it for later lookups."""
+        if filepath not in self._modules:
+            self._modules[filepath] = self._load_module(filepath)
+        return self._modules[filepath]
+
+    def _module_algorithms(self, module) -> List[Type[SortingAlgorithm]]:
+        """Get the SortingAlgorithm subclasses a module defines itself."""
+        return [obj for name, obj in inspect.getmembers(module)
+                if (inspect.isclass(obj) and
+                    obj != SortingAlgorithm and
+                    issubclass(obj, SortingAlgorithm) and
+                    obj.__module__ == module.__name__)]
+
+    def load_class(self, filepath: str, class_name: str) -> Optional[Type[SortingAlgorithm]]:
         """
-        Discover all sorting algorithms in the plugins directory.
+        Get an algorithm class from a plugin file, importing the file if needed.
         
+        Args:
+            filepath (str): Path to the plugin file
+            class_name (str): Name of the class in it
+            
         Returns:
-            List[Type[SortingAlgorithm]]: List of discovered sorting algorithm classes,
-                                         sorted by algorithm name
+            Type[SortingAlgorithm]: The class, or None if the file does not load or define it
         """
+        module = self._import(filepath)
+        if module is None:
+            return None
+        cls = getattr(module, class_name, None)
+        if not (inspect.isclass(cls) and issubclass(cls, SortingAlgorithm)):
+            print(f"Plugin {filepath} no longer defines {class_name}")
+            return None
+        return cls
+
+    def _read_index(self) -> Dict[str, dict]:
+        """Read the cached entries by file name; a missing or stale index is empty."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring plugin index {self.index_path}: {e}")
+            return {}
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("plugins", {})
+
+    def _write_index(self, entries: Dict[str, dict]) -> None:
+        """Replace the index file; the plugins still load if it cannot be written."""
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "plugins": entries}, f, indent=1)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not write plugin index {self.index_path}: {e}")
+
+    def _scan(self, filepath: str, stat: os.stat_result, digest: str) -> dict:
+        """Import a new or changed plugin file and describe its algorithms."""
         algorithms = []
+        module = self._import(filepath)
+        if module is not None:
+            for cls in self._module_algorithms(module):
+                try:
+                    algorithm = cls()
+                    entry = {"class": cls.__name__, "name": algorithm.name()}
+                    for key in ("description", "time_complexity", "space_complexity"):
+                        value = getattr(algorithm, key)
+                        # Tolerate plugins that declare these as methods instead of properties
+                        entry[key] = str(value() if callable(value) else value)
+                    algorithms.append(entry)
+                except Exception as e:
+                    print(f"Error reading plugin {cls.__name__}: {e}")
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest,
+                "algorithms": algorithms}
+
+    def discover_plugins(self) -> List[PluginInfo]:
+        """
+        List the algorithms in the plugins directory from the metadata index.
+        
+        Unchanged files (same modification time and size, or same content hash)
+        are described from the index without being read or imported; only new
+        and changed files are imported to refresh their entries.
+        
+        Returns:
+            List[PluginInfo]: One entry per algorithm class, sorted by algorithm name
+        """
+        cached = self._read_index()
+        entries = {}
+        changed = False
         
         # Scan the plugins directory
-        for filename in os.listdir(self.plugin_dir):
+        for filename in sorted(os.listdir(self.plugin_dir)):
             if filename.endswith('.py') and not filename.startswith('__'):
                 filepath = os.path.join(self.plugin_dir, filename)
-                module = self._load_module(filepath)
-                
-                if module is None:
+                try:
+                    stat = os.stat(filepath)
+                    entry = cached.get(filename)
+                    if (entry is None or entry.get("mtime_ns") != stat.st_mtime_ns
+                            or entry.get("size") != stat.st_size):
+                        with open(filepath, "rb") as f:
+                            digest = hashlib.sha256(f.read()).hexdigest()
+                        if entry is not None and entry.get("sha256") == digest:
+                            # Touched but not edited: keep the metadata
+                            entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                        else:
+                            entry = self._scan(filepath, stat, digest)
+                        changed = True
+                except OSError as e:
+                    print(f"Error reading plugin {filename}: {e}")
                     continue
-                
-                # Find all classes in the module that inherit from SortingAlgorithm
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and
-                        obj != SortingAlgorithm and
-                        issubclass(obj, SortingAlgorithm)):
-                        algorithms.append(obj)
+                entries[filename] = entry
+        
+        if changed or entries.keys() != cached.keys():
+            self._write_index(entries)
         
-        return sorted(algorithms, key=lambda x: x().name())
\ No newline at end of file
+        plugins = [PluginInfo(self, os.path.join(self.plugin_dir, filename), meta["class"],
+                              meta["name"], meta["description"], meta["time_complexity"],
+                              meta["space_complexity"])
+                   for filename, entry in entries.items()
+                   for meta in entry["algorithms"]]
+        return sorted(plugins, key=lambda plugin: plugin.name)
+
+    def discover_algorithms(self) -> List[Type[SortingAlgorithm]]:
+        """
+        Discover all sorting algorithms in the plugins directory.
+        
+        Returns:
+            List[Type[SortingAlgorithm]]: List of discovered sorting algorithm classes,
+                                         sorted by algorithm name
+        """
+        algorithms = []
+        for plugin in self.discover_plugins():
+            cls = plugin.load()
+            if cls is not None:
+                algorithms.append(cls)
+        return algorithms
@@ -1,7 +1,6 @@
 
-import time
 from typing import List, Callable
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 
 class BlockSort(SortingAlgorithm):
@@ -20,8 +19,7 @@ class BlockSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def _insertion_sort_range(self, arr: List[int], start: int, end: int, 
-                            stats: SortingStats, update_callback: Callable[[SortingState], None]) -> None:
+    def _insertion_sort_range(self, arr: TrackedArray, start: int, end: int) -> None:
         """
         Sort a range within the array using insertion sort.
         
@@ -29,31 +27,18 @@ class BlockSort(SortingAlgorithm):
             arr: Array to sort
             start: Starting index of the range
             end: Ending index of the range (exclusive)
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
+        arr.annotate(SortingOp.active(start, end))
         for i in range(start + 1, end):
             key = arr[i]
             j = i - 1
-            while j >= start:
-                stats.comparisons += 1
-                if arr[j] > key:
-                    arr[j + 1] = arr[j]
-                    stats.swaps += 1
-                    update_callback(SortingState(
-                        array=arr.copy(),
-                        compared_indices=[j, j + 1],
-                        highlighted_indices=[i],
-                        sorted_indices=list(range(start, j + 1)),
-                        stats=stats
-                    ))
-                    j -= 1
-                else:
-                    break
-            arr[j + 1] = key
+            while j >= start and arr.compare_value(j, key) > 0:
+                arr[j + 1] = arr[j]
+                j -= 1
+            if j + 1 != i:
+                arr[j + 1] = key
     
-    def _merge_blocks(self, arr: List[int], start1: int, end1: int, start2: int, end2: int,
-                     stats: SortingStats, update_callback: Callable[[SortingState], None]) -> None:
+    def _merge_blocks(self, arr: TrackedArray, start1: int, end1: int, start2: int, end2: int) -> None:
         """
         Merge two sorted blocks within the array.
         
@@ -63,51 +48,59 @@ class BlockSort(SortingAlgorithm):
             end1: End index of first block (exclusive)
             start2: Start index of second block
             end2: End index of second block (exclusive)
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
+        arr.annotate(SortingOp.active(start1, end2))
         merged = []
         i, j = start1, start2
         
         while i < end1 and j < end2:
-            stats.comparisons += 1
-            if arr[i] <= arr[j]:
+            if arr.compare(i, j) <= 0:
                 merged.append(arr[i])
                 i += 1
             else:
                 merged.append(arr[j])
                 j += 1
-            stats.swaps += 1
         
         while i < end1:
             merged.append(arr[i])
-            stats.swaps += 1
             i += 1
         
         while j < end2:
             merged.append(arr[j])
-            stats.swaps += 1
             j += 1
         
         for i, val in enumerate(merged):
             arr[start1 + i] = val
-            update_callback(SortingState(
-                array=arr.copy(),
-                highlighted_indices=[start1 + i],
-                compared_indices=[],
-                sorted_indices=list(range(start1, start1 + i)),
-                stats=stats
-            ))
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def _merged_regions(self, n: int, size: int) -> List[range]:
+        """
+        Get the regions shown as sorted after a merge pass.
+        
+        These are the first merged run plus the first halves of the merge pairs
+        reaching the end of the array, as a few ranges instead of n indices.
+        
+        Args:
+            n: Length of array
+            size: Length of the runs after the pass
+            
+        Returns:
+            List[range]: Sorted regions
+        """
+        regions = [range(min(size, n))]
+        tail = max(0, n - size)
+        for start in range(tail - tail % (size * 2), n, size * 2):
+            regions.append(range(max(start, tail), min(start + size, n)))
+        return regions
+    
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
         """
         Sort the input array using Block Sort algorithm.
         
         Args:
             arr: Array to sort
-            update_callback: Function to call with updated sorting state for visualization
+            update_callback: Function to call with the operation events for visualization
         """
-        stats = SortingStats(start_time=time.time())
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
         
         # Block size - using sqrt(n) as a reasonable block size
@@ -116,13 +109,7 @@ class BlockSort(SortingAlgorithm):
         # Sort individual blocks using insertion sort
         for i in range(0, n, block_size):
             end = min(i + block_size, n)
-            self._insertion_sort_range(arr, i, end, stats, update_callback)
-            update_callback(SortingState(
-                array=arr.copy(),
-                highlighted_indices=list(range(i, end)),
-                sorted_indices=list(range(i)),
-                stats=stats
-            ))
+            self._insertion_sort_range(arr, i, end)
         
         # Merge sorted blocks
         curr_size = block_size
@@ -131,21 +118,12 @@ class BlockSort(SortingAlgorithm):
                 mid = min(start + curr_size, n)
                 end = min(start + curr_size * 2, n)
                 if mid < end:
-                    self._merge_blocks(arr, start, mid, mid, end, stats, update_callback)
+                    self._merge_blocks(arr, start, mid, mid, end)
             
             curr_size *= 2
-            update_callback(SortingState(
-                array=arr.copy(),
-                sorted_indices=[i for i in range(n) if i < curr_size or 
-                              (i % (curr_size * 2) < curr_size and 
-                               i + curr_size >= n)],
-                stats=stats
-            ))
+            regions = self._merged_regions(n, curr_size)
+            arr.annotate(SortingOp.unmark_sorted(0, n),
+                         *(SortingOp.mark_sorted(r.start, r.stop) for r in regions))
         
         # Final state
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(n)),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.active(0, 0), SortingOp.mark_sorted(0, n))
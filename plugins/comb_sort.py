@@ -1,17 +1,18 @@
-import time
 from typing import List, Callable
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 
 class CombSort(SortingAlgorithm):
-    def __init__(self, shrink_factor: float = 1.3):
+    def __init__(self, shrink_factor: float = 1.3, **settings):
         """
         Initialize CombSort with a custom shrink factor.
         
         Args:
             shrink_factor (float): Factor by which the gap is reduced in each iteration.
                                   Default is 1.3, which has been found to be optimal.
+            settings: Values for the declared options, as for SortingAlgorithm
         """
+        super().__init__(**settings)
         self.shrink_factor = shrink_factor
     
     def name(self) -> str:
@@ -30,44 +31,41 @@ class CombSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def _is_sorted(self, arr: List[int]) -> bool:
+    def _sorted_suffix(self, arr: List[int], start: int) -> int:
         """
-        Check if the array is sorted.
+        Extend the sorted tail of the array to the left.
         
-        Args:
-            arr: Array to check
-            
-        Returns:
-            bool: True if array is sorted, False otherwise
-        """
-        return all(arr[i] <= arr[i + 1] for i in range(len(arr) - 1))
-    
-    def _get_sorted_indices(self, arr: List[int], n: int) -> List[int]:
-        """
-        Get indices of elements that are in their final sorted positions.
+        Only used for the visualization; it reads the plain list, so its
+        comparisons are not counted.
         
         Args:
             arr: Current array state
-            n: Length of array
+            start: Start of a non-empty tail known to be in non-decreasing order
             
         Returns:
-            List[int]: Indices of sorted elements
+            int: Start of the longest non-decreasing tail
         """
-        return [j for j in range(n) if all(arr[k] <= arr[k+1] 
-                for k in range(j, n-1))]
+        while start > 0 and arr[start - 1] <= arr[start]:
+            start -= 1
+        return start
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
         """
         Sort the input array using Comb Sort algorithm.
         
         Args:
             arr: Array to sort
-            update_callback: Function to call with updated sorting state for visualization
+            update_callback: Function to call with the operation events for visualization
         """
-        stats = SortingStats(start_time=time.time())
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
         gap = n
         is_sorted = False
+        # Start of the non-decreasing tail shown as sorted; without a callback
+        # there is nothing to show, so the unvisualized run skips tracking it
+        visualize = update_callback is not None
+        sorted_from = self._sorted_suffix(arr.data, n - 1) if n and visualize else 0
+        arr.annotate(SortingOp.mark_sorted(sorted_from, n))
         
         while not is_sorted:
             # Update gap
@@ -76,26 +74,22 @@ class CombSort(SortingAlgorithm):
             
             # Perform comparisons with current gap
             for i in range(n - gap):
-                stats.comparisons += 1
-                if arr[i] > arr[i + gap]:
+                if arr.compare(i, i + gap) > 0:
                     # Swap elements
-                    arr[i], arr[i + gap] = arr[i + gap], arr[i]
-                    stats.swaps += 1
+                    arr.swap(i, i + gap)
                     is_sorted = False
+                    if not visualize:
+                        continue
                     
-                    # Update visualization
-                    update_callback(SortingState(
-                        array=arr.copy(),
-                        compared_indices=[i, i + gap],
-                        highlighted_indices=[i, i + gap],
-                        sorted_indices=self._get_sorted_indices(arr, n),
-                        stats=stats
-                    ))
+                    # Only the part of the tail after the swap is still known to be in order
+                    start = sorted_from
+                    if i + gap >= start:
+                        start = min(i + gap + 1, n - 1)
+                    start = self._sorted_suffix(arr.data, start)
+                    if start != sorted_from:
+                        arr.annotate(SortingOp.unmark_sorted(0, start),
+                                     SortingOp.mark_sorted(start, n))
+                        sorted_from = start
         
         # Final update with fully sorted array
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(n)),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.mark_sorted(0, n))
\ No newline at end of file
@@ -1,16 +1,22 @@
-import time
 from typing import List, Callable
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import AlgorithmOption, SortingAlgorithm, SortingEvent, SortingOp, SortingStats, TrackedArray
 
 
 class HeapSort(SortingAlgorithm):
+    options = (
+        AlgorithmOption("arity", "Heap arity", (2, 3, 4)),
+        AlgorithmOption("sift", "Sift-down", ("floyd", "classic")),
+    )
+    
     def name(self) -> str:
         return "Heap Sort"
     
     @property
     def description(self) -> str:
         return ("A comparison-based sorting algorithm that builds a heap "
-                "and repeatedly extracts the maximum element")
+                "and repeatedly extracts the maximum element. Floyd's sift-down "
+                "follows the larger children to a leaf and then bubbles the key "
+                "back up, instead of comparing it with the children on every level")
     
     @property
     def time_complexity(self) -> str:
@@ -20,111 +26,132 @@ class HeapSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def _get_children(self, i: int) -> tuple[int, int]:
+    def _sift_down_classic(self, arr: TrackedArray, n: int, i: int) -> None:
         """
-        Get indices of left and right children in the heap.
+        Maintain the max heap property at a node by swapping it down level by level.
+        
+        Every level costs d - 1 comparisons among the children plus one with the node.
         
         Args:
-            i: Parent node index
-            
-        Returns:
-            tuple[int, int]: Indices of left and right children
+            arr: Array being heapified
+            n: Size of heap
+            i: Index of root node to sift down
         """
-        return 2 * i + 1, 2 * i + 2
+        d = self.settings["arity"]
+        compare = arr.compare
+        while True:
+            first = d * i + 1
+            if first >= n:
+                return
+            # Largest of the children first..first + d - 1
+            largest = first
+            end = first + d if first + d < n else n
+            for child in range(first + 1, end):
+                if compare(child, largest) > 0:
+                    largest = child
+            if compare(largest, i) <= 0:
+                return
+            arr.swap(i, largest)
+            i = largest
     
-    def _heapify(self, arr: List[int], n: int, i: int, stats: SortingStats, 
-                 update_callback: Callable[[SortingState], None]) -> None:
+    def _sift_down_floyd(self, arr: TrackedArray, n: int, i: int) -> None:
         """
-        Maintain max heap property at given node.
+        Maintain the max heap property at a node with Floyd's bottom-up sift-down.
+        
+        The path of largest children is followed all the way to a leaf without
+        comparing the node's key, which usually belongs near the bottom anyway;
+        the key is then compared upwards from the leaf to find its place, and
+        the path above that place moves up one level.
         
         Args:
             arr: Array being heapified
             n: Size of heap
-            i: Index of root node to heapify
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
+            i: Index of root node to sift down
         """
-        largest = i
-        left, right = self._get_children(i)
-        
-        # Check if left child is larger than root
-        if left < n:
-            stats.comparisons += 1
-            if arr[left] > arr[largest]:
-                largest = left
-        
-        # Check if right child is larger than current largest
-        if right < n:
-            stats.comparisons += 1
-            if arr[right] > arr[largest]:
-                largest = right
-        
-        # If largest is not root
-        if largest != i:
-            arr[i], arr[largest] = arr[largest], arr[i]
-            stats.swaps += 1
-            
-            update_callback(SortingState(
-                array=arr.copy(),
-                compared_indices=[i, largest],
-                highlighted_indices=[i, largest],
-                sorted_indices=list(range(n, len(arr))),
-                stats=stats
-            ))
-            
-            # Recursively heapify the affected sub-tree
-            self._heapify(arr, n, largest, stats, update_callback)
+        d = self.settings["arity"]
+        compare = arr.compare
+        key = arr[i]
+        # Descend to a leaf along the largest children
+        j = i
+        while True:
+            first = d * j + 1
+            if first >= n:
+                break
+            j = first
+            end = first + d if first + d < n else n
+            for child in range(first + 1, end):
+                if compare(child, j) > 0:
+                    j = child
+        # Climb back up to the first element not smaller than the key
+        while j != i and arr.compare_value(j, key) < 0:
+            j = (j - 1) // d
+        if j == i:
+            return
+        # Shift the path i..j up one level and drop the key at j
+        value = key
+        while j != i:
+            value, arr[j] = arr[j], value
+            j = (j - 1) // d
+        arr[i] = value
     
-    def _build_max_heap(self, arr: List[int], stats: SortingStats,
-                       update_callback: Callable[[SortingState], None]) -> None:
+    def _build_max_heap(self, arr: TrackedArray) -> None:
         """
         Convert input array into a max heap.
         
         Args:
             arr: Array to convert to heap
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
         n = len(arr)
+        d = self.settings["arity"]
+        sift_down = self._sift_down_floyd if self.settings["sift"] == "floyd" else self._sift_down_classic
+        arr.annotate(SortingOp.active(0, n))
         # Build heap (rearrange array)
         # Start from last non-leaf node and move up
-        for i in range(n // 2 - 1, -1, -1):
-            self._heapify(arr, n, i, stats, update_callback)
+        for i in range((n - 2) // d, -1, -1):
+            sift_down(arr, n, i)
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
         """
         Sort the input array using Heap Sort algorithm.
         
         Args:
             arr: Array to sort
-            update_callback: Function to call with updated sorting state for visualization
+            update_callback: Function to call with the operation events for visualization
         """
-        stats = SortingStats(start_time=time.time())
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
+        sift_down = self._sift_down_floyd if self.settings["sift"] == "floyd" else self._sift_down_classic
+        stats = arr.stats
         
         # Phase 1: Build max heap
-        self._build_max_heap(arr, stats, update_callback)
+        self._build_max_heap(arr)
+        build = SortingStats(comparisons=stats.comparisons, swaps=stats.swaps,
+                             reads=stats.reads, writes=stats.writes)
         
         # Phase 2: Extract elements from heap one by one
         for i in range(n - 1, 0, -1):
             # Move current root (maximum element) to end
-            arr[0], arr[i] = arr[i], arr[0]
-            stats.swaps += 1
-            
-            update_callback(SortingState(
-                array=arr.copy(),
-                highlighted_indices=[0, i],
-                sorted_indices=list(range(i, n)),
-                stats=stats
-            ))
+            arr.swap(0, i)
+            # The heap shrinks by the element now in its final position
+            arr.annotate(SortingOp.mark_sorted(i, i + 1), SortingOp.active(0, i))
             
-            # Heapify root element to maintain max heap property
-            self._heapify(arr, i, 0, stats, update_callback)
+            # Sift the new root down to maintain max heap property
+            sift_down(arr, i, 0)
+        
+        height = 0
+        size = 1
+        while size < n:
+            height += 1
+            size = size * self.settings["arity"] + 1
+        self.metrics = {
+            "heap_height": height,
+            "build_comparisons": build.comparisons,
+            "build_reads": build.reads,
+            "build_writes": build.writes,
+            "extract_comparisons": stats.comparisons - build.comparisons,
+            "extract_reads": stats.reads - build.reads,
+            "extract_writes": stats.writes - build.writes,
+        }
         
         # Final update with fully sorted array
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(len(arr))),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.active(0, 0), SortingOp.mark_sorted(0, n))
@@ -1,7 +1,6 @@
 
-import time
-from typing import List, Callable
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from typing import Callable, List
+from algorithms import SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 
 class InsertionSort(SortingAlgorithm):
@@ -21,8 +20,7 @@ class InsertionSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def _find_insertion_position(self, arr: List[int], start: int, key: int, 
-                               stats: SortingStats) -> int:
+    def _find_insertion_position(self, arr: TrackedArray, start: int, key: int) -> int:
         """
         Find the correct position for inserting the key element.
         
@@ -30,22 +28,16 @@ class InsertionSort(SortingAlgorithm):
             arr: Array being sorted
             start: Starting position for backward search
             key: Element to insert
-            stats: Statistics tracking object
         
         Returns:
             int: Position where key should be inserted
         """
         j = start
-        while j >= 0:
-            stats.comparisons += 1
-            if arr[j] > key:
-                j -= 1
-            else:
-                break
+        while j >= 0 and arr.compare_value(j, key) > 0:
+            j -= 1
         return j + 1
     
-    def _shift_elements(self, arr: List[int], start: int, end: int, 
-                       stats: SortingStats, update_callback: Callable[[SortingState], None]) -> None:
+    def _shift_elements(self, arr: TrackedArray, start: int, end: int) -> None:
         """
         Shift elements right to make space for insertion.
         
@@ -53,54 +45,31 @@ class InsertionSort(SortingAlgorithm):
             arr: Array being sorted
             start: Starting position for shift
             end: Ending position for shift
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
         for j in range(end - 1, start - 1, -1):
             arr[j + 1] = arr[j]
-            stats.swaps += 1
-            update_callback(SortingState(
-                array=arr.copy(),
-                compared_indices=[j, j + 1],
-                highlighted_indices=[j + 1],
-                sorted_indices=list(range(0, end)),
-                stats=stats
-            ))
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
         """
         Sort the input array using Insertion Sort algorithm.
         
         Args:
             arr: Array to sort
-            update_callback: Function to call with updated sorting state for visualization
+            update_callback: Function to call with the operation events for visualization
         """
-        stats = SortingStats(start_time=time.time())
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
         
         for i in range(1, n):
             key = arr[i]
             # Find where to insert the current element
-            insert_pos = self._find_insertion_position(arr, i - 1, key, stats)
+            insert_pos = self._find_insertion_position(arr, i - 1, key)
             
-            # Shift elements to make space
+            # Shift elements to make space, then insert the element
             if insert_pos < i:
-                self._shift_elements(arr, insert_pos, i, stats, update_callback)
-                
-                # Insert the element
+                self._shift_elements(arr, insert_pos, i)
                 arr[insert_pos] = key
-                stats.swaps += 1
-                update_callback(SortingState(
-                    array=arr.copy(),
-                    highlighted_indices=[insert_pos],
-                    sorted_indices=list(range(0, i + 1)),
-                    stats=stats
-                ))
+            arr.annotate(SortingOp.mark_sorted(0, i + 1))
         
         # Final update with fully sorted array
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(n)),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.mark_sorted(0, n))
@@ -1,144 +1,250 @@
-import time
-from typing import List, Callable, Tuple
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from typing import List, Callable, Union
+from algorithms import AlgorithmOption, SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 
 class MergeSort(SortingAlgorithm):
+    options = (
+        AlgorithmOption("mode", "Mode", ("bottom-up", "top-down")),
+        AlgorithmOption("runs", "Initial runs (bottom-up)", ("natural", "single elements")),
+    )
     
     def name(self) -> str:
         return "Merge Sort"
     
     @property
     def description(self) -> str:
-        return ("A divide-and-conquer algorithm that recursively divides the array "
-                "into two halves, sorts them, and merges them")
+        return ("A divide-and-conquer algorithm that merges sorted runs into longer ones. "
+                "Bottom-up mode merges pairs of runs pass by pass, alternating between the "
+                "array and one auxiliary buffer, and can start from the natural ascending "
+                "(or reversed descending) runs of the input; top-down mode recursively "
+                "divides the array into two halves. Runs already in order are not merged")
     
     @property
     def time_complexity(self) -> str:
-        return "O(n log n)"
+        return "O(n log n), O(n) on sorted or reversed input with natural runs"
     
     @property
     def space_complexity(self) -> str:
         return "O(n)"
     
-    def _get_subarrays(self, arr: List[int], left: int, mid: int, 
-                       right: int) -> Tuple[List[int], List[int]]:
+    def _copy(self, src: Union[TrackedArray, List[int]], dst: Union[TrackedArray, List[int]],
+              start: int, stop: int) -> None:
+        """Copy src[start:stop] to the same positions of dst, element by element."""
+        for k in range(start, stop):
+            dst[k] = src[k]
+    
+    def _merge_into(self, arr: TrackedArray, src: Union[TrackedArray, List[int]],
+                    dst: Union[TrackedArray, List[int]], lo: int, mid: int, hi: int) -> bool:
         """
-        Extract left and right subarrays for merging.
+        Merge the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].
+        
+        One of src and dst is the array being sorted and the other the buffer,
+        so only the array side of the copy is counted and shown. Each element
+        is read from src once and written to dst once.
         
         Args:
-            arr: Original array
-            left: Start index
-            mid: Middle index
-            right: End index
+            arr: Array being sorted, used to count and show the comparisons
+            src: Array or buffer holding the two runs
+            dst: Buffer or array receiving the merged run
+            lo: Start of the first run
+            mid: Start of the second run
+            hi: End of the second run (exclusive)
         
         Returns:
-            Tuple[List[int], List[int]]: Left and right subarrays
+            bool: True if the runs were already in order and only copied
         """
-        return arr[left:mid + 1], arr[mid + 1:right + 1]
+        arr.annotate(SortingOp.active(lo, hi))
+        a, b = src[mid - 1], src[mid]
+        if arr.compare_values(a, b, mid - 1, mid) <= 0:
+            self._copy(src, dst, lo, hi)
+            return True
+        
+        i, j, k = lo, mid, lo
+        a, b = src[i], src[j]
+        while True:
+            if arr.compare_values(a, b, i, j) <= 0:
+                dst[k] = a
+                k += 1
+                i += 1
+                if i == mid:
+                    self._copy(src, dst, j, hi)
+                    return False
+                a = src[i]
+            else:
+                dst[k] = b
+                k += 1
+                j += 1
+                if j == hi:
+                    # The rest of the first run goes to the end of dst[lo:hi]
+                    for t in range(i, mid):
+                        dst[k] = src[t]
+                        k += 1
+                    return False
+                b = src[j]
     
-    def _merge(self, arr: List[int], left: int, mid: int, right: int,
-               stats: SortingStats, update_callback: Callable[[SortingState], None]) -> None:
+    def _natural_runs(self, arr: TrackedArray) -> List[int]:
+        """
+        Split the array into its maximal ascending runs.
+        
+        Strictly descending runs are reversed in place first, so reversed input
+        becomes a single run; strictness keeps equal elements in order.
+        
+        Args:
+            arr: Array to scan
+        
+        Returns:
+            List[int]: Start index of every run
+        """
+        n = len(arr)
+        starts = []
+        i = 0
+        while i < n:
+            starts.append(i)
+            j = i + 1
+            if j < n and arr.compare(i, j) > 0:
+                j += 1
+                while j < n and arr.compare(j - 1, j) > 0:
+                    j += 1
+                arr.reverse(i, j)
+                self.metrics["reversed_runs"] += 1
+            elif j < n:
+                j += 1
+                while j < n and arr.compare(j - 1, j) <= 0:
+                    j += 1
+            i = j
+        return starts
+    
+    def _bottom_up(self, arr: TrackedArray) -> None:
+        """
+        Sort by merging adjacent runs pass by pass, ping-ponging between the array and one buffer.
+        
+        Args:
+            arr: Array to sort
+        """
+        n = len(arr)
+        if n < 2:
+            return
+        if self.settings["runs"] == "natural":
+            starts = self._natural_runs(arr)
+        else:
+            starts = list(range(n))
+        self.metrics["initial_runs"] = len(starts)
+        
+        # Every pass halves the number of runs; start in the buffer when the
+        # number of passes is odd, so the last pass writes into the array
+        passes = (len(starts) - 1).bit_length()
+        self.metrics["passes"] = passes
+        buffer = [0] * n
+        if passes % 2:
+            self._copy(arr, buffer, 0, n)
+            src, dst = buffer, arr
+        else:
+            src, dst = arr, buffer
+        
+        for _ in range(passes):
+            runs = len(starts)
+            for r in range(0, runs, 2):
+                lo = starts[r]
+                if r + 1 < runs:
+                    hi = starts[r + 2] if r + 2 < runs else n
+                    skipped = self._merge_into(arr, src, dst, lo, starts[r + 1], hi)
+                    self.metrics["skipped_merges" if skipped else "merges"] += 1
+                else:
+                    # An odd run out still has to move to the other side
+                    self._copy(src, dst, lo, n)
+            # Merged runs start where every other run did
+            del starts[1::2]
+            src, dst = dst, src
+    
+    def _merge(self, arr: TrackedArray, buffer: List[int], left: int, mid: int, right: int) -> None:
         """
         Merge two sorted subarrays into a single sorted array.
         
+        Only the left run is copied out to the shared buffer; the merge then fills
+        arr[left:right + 1] from the buffer and the right run, which stays in place.
+        Copying an element back into the array counts as a write, not a swap.
+        
         Args:
             arr: Array containing subarrays to merge
+            buffer: Auxiliary buffer of at least half the array's length
             left: Start index of first subarray
             mid: End index of first subarray
             right: End index of second subarray
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
-        left_part, right_part = self._get_subarrays(arr, left, mid, right)
-        i = j = 0
-        k = left
+        arr.annotate(SortingOp.active(left, right + 1))
+        # Runs already in order need no merge
+        if arr.compare(mid, mid + 1) <= 0:
+            self.metrics["skipped_merges"] += 1
+            return
+        self.metrics["merges"] += 1
         
+        size = mid + 1 - left
+        for t in range(size):
+            buffer[t] = arr[left + t]
+        i, j, k = 0, mid + 1, left
+        a = buffer[0]
+        b = arr[j]
         # Merge elements by comparing both parts
-        while i < len(left_part) and j < len(right_part):
-            stats.comparisons += 1
-            if left_part[i] <= right_part[j]:
-                arr[k] = left_part[i]
+        while True:
+            if arr.compare_values(a, b, left + i, j) <= 0:
+                arr[k] = a
+                k += 1
                 i += 1
+                if i == size:
+                    # The rest of the right part is already in place
+                    return
+                a = buffer[i]
             else:
-                arr[k] = right_part[j]
+                arr[k] = b
+                k += 1
                 j += 1
-            stats.swaps += 1
-            
-            update_callback(SortingState(
-                array=arr.copy(),
-                compared_indices=[left + i, mid + 1 + j],
-                highlighted_indices=[k],
-                sorted_indices=list(range(left, k)),
-                stats=stats
-            ))
-            k += 1
+                if j > right:
+                    break
+                b = arr[j]
         
         # Copy remaining elements from left part
-        while i < len(left_part):
-            arr[k] = left_part[i]
-            stats.swaps += 1
-            update_callback(SortingState(
-                array=arr.copy(),
-                highlighted_indices=[k],
-                sorted_indices=list(range(left, k)),
-                stats=stats
-            ))
+        while i < size:
+            arr[k] = buffer[i]
             i += 1
             k += 1
-        
-        # Copy remaining elements from right part
-        while j < len(right_part):
-            arr[k] = right_part[j]
-            stats.swaps += 1
-            update_callback(SortingState(
-                array=arr.copy(),
-                highlighted_indices=[k],
-                sorted_indices=list(range(left, k)),
-                stats=stats
-            ))
-            j += 1
-            k += 1
     
-    def _mergesort(self, arr: List[int], left: int, right: int,
-                   stats: SortingStats, update_callback: Callable[[SortingState], None]) -> None:
+    def _mergesort(self, arr: TrackedArray, buffer: List[int], left: int, right: int) -> None:
         """
         Recursively sort array using merge sort algorithm.
         
         Args:
             arr: Array to sort
+            buffer: Auxiliary buffer shared by all merges
             left: Start index
             right: End index
-            stats: Statistics tracking object
-            update_callback: Function to call for visualization updates
         """
         if left < right:
             mid = (left + right) // 2
             
             # Recursively sort both halves
-            self._mergesort(arr, left, mid, stats, update_callback)
-            self._mergesort(arr, mid + 1, right, stats, update_callback)
+            self._mergesort(arr, buffer, left, mid)
+            self._mergesort(arr, buffer, mid + 1, right)
             
             # Merge the sorted halves
-            self._merge(arr, left, mid, right, stats, update_callback)
+            self._merge(arr, buffer, left, mid, right)
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
         """
         Sort the input array using Merge Sort algorithm.
         
         Args:
             arr: Array to sort
-            update_callback: Function to call with updated sorting state for visualization
+            update_callback: Function to call with the operation events for visualization
         """
-        stats = SortingStats(start_time=time.time())
+        arr = TrackedArray(arr, update_callback)
+        self.metrics = {"merges": 0, "skipped_merges": 0}
         
-        # Start the recursive sorting process
-        self._mergesort(arr, 0, len(arr) - 1, stats, update_callback)
+        if self.settings["mode"] == "bottom-up":
+            self.metrics.update(initial_runs=min(len(arr), 1), reversed_runs=0, passes=0)
+            self._bottom_up(arr)
+        else:
+            # One buffer for every merge; each merge copies its left half into it
+            self._mergesort(arr, [0] * ((len(arr) + 1) // 2), 0, len(arr) - 1)
         
         # Final update with fully sorted array
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(len(arr))),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.active(0, 0), SortingOp.mark_sorted(0, len(arr)))
@@ -1,8 +1,5 @@
-from abc import ABC, abstractmethod
-import time
 from typing import List, Callable
-from dataclasses import dataclass
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 class PancakeSort(SortingAlgorithm):
     def name(self) -> str:
@@ -19,47 +16,23 @@ class PancakeSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
-        stats = SortingStats(start_time=time.time())
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
         
-        def flip(size):
-            for i in range(size // 2):
-                arr[i], arr[size-1-i] = arr[size-1-i], arr[i]
-                stats.swaps += 1
-                update_callback(SortingState(
-                    array=arr.copy(),
-                    highlighted_indices=[i, size-1-i],
-                    compared_indices=[],
-                    sorted_indices=list(range(size, n)),
-                    stats=stats
-                ))
-        
         for size in range(n, 1, -1):
             # Find index of maximum element in arr[0:size]
             max_idx = 0
-            for i in range(size):
-                stats.comparisons += 1
-                if arr[i] > arr[max_idx]:
+            for i in range(1, size):
+                if arr.compare(i, max_idx) > 0:
                     max_idx = i
-                update_callback(SortingState(
-                    array=arr.copy(),
-                    compared_indices=[i, max_idx],
-                    highlighted_indices=[max_idx],
-                    sorted_indices=list(range(size, n)),
-                    stats=stats
-                ))
             
             if max_idx != size - 1:
                 # Flip from 0 to max_idx
                 if max_idx != 0:
-                    flip(max_idx + 1)
+                    arr.reverse(0, max_idx + 1)
                 # Flip from 0 to size-1
-                flip(size)
+                arr.reverse(0, size)
+            arr.annotate(SortingOp.mark_sorted(size - 1, size))
         
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(n)),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.mark_sorted(0, n))
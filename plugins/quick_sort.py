@@ -1,87 +1,126 @@
-from abc import ABC, abstractmethod
-import time
+import random
 from typing import List, Callable
-from dataclasses import dataclass
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import (AlgorithmOption, SortingAlgorithm, SortingEvent, SortingOp, TrackedArray,
+                        choose_pivot, heap_sort_range, insertion_sort_range)
 
 class QuickSort(SortingAlgorithm):
+    options = (
+        AlgorithmOption("pivot", "Pivot", ("median of 3", "ninther", "random", "last")),
+        AlgorithmOption("cutoff", "Insertion sort cutoff", (16, 8, 32, 0)),
+        AlgorithmOption("fallback", "Depth limit fallback", ("heap sort", "none")),
+    )
+    
     def name(self) -> str:
         return "Quick Sort"
     
+    @property
     def description(self) -> str:
-        return "A divide-and-conquer sorting algorithm that picks a 'pivot' element and partitions the array around it"
+        return ("A divide-and-conquer sorting algorithm that picks a 'pivot' element and partitions "
+                "the array around it. Partitions are kept on an explicit stack and the smaller side "
+                "is always sorted first; small partitions are finished with insertion sort, and "
+                "partitions nested deeper than 2·log2(n) are heap sorted (introsort)")
     
     @property
     def time_complexity(self) -> str:
-        return "O(n log n) average, O(n²) worst"
+        return "O(n log n) with the heap sort fallback, O(n²) worst without"
     
     @property
     def space_complexity(self) -> str:
         return "O(log n)"
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
-        # Initialize statistics with start time
-        stats = SortingStats(start_time=time.time())
+    def _partition(self, arr: TrackedArray, low: int, high: int, pivot: int) -> int:
+        """
+        Partition arr[low:high] around the element at pivot.
         
-        def partition(low: int, high: int) -> int:
-            pivot = arr[high]
-            i = low - 1
-            
-            for j in range(low, high):
-                stats.comparisons += 1  # Count comparison with pivot
-                if arr[j] <= pivot:
-                    i += 1
-                    # Count swap
-                    stats.swaps += 1
-                    arr[i], arr[j] = arr[j], arr[i]
-                    
-                    # Update visualization with current state and stats
-                    update_callback(SortingState(
-                        array=arr.copy(),
-                        compared_indices=[j, high],  # Compare with pivot
-                        highlighted_indices=[i],  # Highlight swap position
-                        sorted_indices=[],  # Will be set after partition is complete
-                        pivot_index=high,
-                        stats=stats
-                    ))
-            
-            # Final swap with pivot
-            stats.swaps += 1
-            arr[i + 1], arr[high] = arr[high], arr[i + 1]
-            
-            # Update visualization
-            update_callback(SortingState(
-                array=arr.copy(),
-                compared_indices=[],
-                highlighted_indices=[i + 1, high],
-                sorted_indices=[i + 1],  # Pivot is now in its final position
-                pivot_index=i + 1,
-                stats=stats
-            ))
-            
-            return i + 1
+        Both scans stop on elements equal to the pivot, so runs of duplicates
+        are split evenly instead of all falling on one side.
         
-        def quicksort(low: int, high: int, sorted_indices: List[int]):
-            if low < high:
-                # Find pivot position
-                pi = partition(low, high)
-                # Add pivot to sorted indices as it's now in final position
-                sorted_indices.append(pi)
+        Returns:
+            int: Final index of the pivot
+        """
+        if pivot != low:
+            arr.swap(low, pivot)
+        # Show the partition being split and its pivot, parked at low until the final swap
+        arr.annotate(SortingOp.active(low, high), SortingOp.pivot(low))
+        i, j = low + 1, high - 1
+        while True:
+            while i <= j and arr.compare(i, low) < 0:
+                i += 1
+            while i <= j and arr.compare(j, low) > 0:
+                j -= 1
+            if i >= j:
+                break
+            arr.swap(i, j)
+            i += 1
+            j -= 1
+        
+        if j != low:
+            arr.swap(low, j)
+        # Pivot is now in its final position
+        arr.annotate(SortingOp.mark_sorted(j, j + 1))
+        return j
+    
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
+        # Comparisons, swaps, reads and writes are counted by the tracked array
+        arr = TrackedArray(arr, update_callback)
+        n = len(arr)
+        cutoff = self.settings["cutoff"]
+        strategy = self.settings["pivot"]
+        depth_limit = 2 * n.bit_length() if self.settings["fallback"] == "heap sort" else None
+        rng = random.Random()
+        
+        partitions = heap_sorts = insertion_sorts = 0
+        max_depth = max_stack = 0
+        balance_total = 0.0
+        min_balance = 0.5
+        
+        # Pending partitions as (low, high, depth); the larger side of every split
+        # waits here while the loop continues with the smaller one, so the stack
+        # never holds more than log2(n) entries
+        stack = [(0, n, 0)]
+        while stack:
+            low, high, depth = stack.pop()
+            while high - low > 1:
+                max_depth = max(max_depth, depth)
+                if high - low <= cutoff:
+                    insertion_sort_range(arr, low, high)
+                    insertion_sorts += 1
+                    break
+                if depth_limit is not None and depth >= depth_limit:
+                    heap_sort_range(arr, low, high)
+                    heap_sorts += 1
+                    break
+                
+                pi = self._partition(arr, low, high, choose_pivot(arr, low, high, strategy, rng))
+                left, right = pi - low, high - pi - 1
+                # Share of the partition on its smaller side: 0.5 is an even split
+                balance = min(left, right) / (high - low - 1)
+                partitions += 1
+                balance_total += balance
+                min_balance = min(min_balance, balance)
                 
-                # Recursively sort left and right partitions
-                quicksort(low, pi - 1, sorted_indices)
-                quicksort(pi + 1, high, sorted_indices)
+                depth += 1
+                if left < right:
+                    stack.append((pi + 1, high, depth))
+                    high = pi
+                else:
+                    stack.append((low, pi, depth))
+                    low = pi + 1
+                max_stack = max(max_stack, len(stack))
+            else:
+                if high - low == 1:
+                    arr.annotate(SortingOp.mark_sorted(low, high))
         
-        # Start the sorting process
-        sorted_indices = []
-        quicksort(0, len(arr) - 1, sorted_indices)
+        self.metrics = {
+            "partitions": partitions,
+            "max_depth": max_depth,
+            "depth_limit": depth_limit or 0,
+            "max_stack": max_stack,
+            "mean_balance": balance_total / partitions if partitions else 0.5,
+            "min_balance": min_balance,
+            "heap_sort_fallbacks": heap_sorts,
+            "insertion_sorts": insertion_sorts,
+        }
         
-        # Set end time and show final state
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            compared_indices=[],
-            highlighted_indices=[],
-            sorted_indices=list(range(len(arr))),  # All indices are sorted
-            stats=stats
-        ))
+        # Show final state
+        arr.annotate(SortingOp.active(0, 0), SortingOp.mark_sorted(0, len(arr)))
@@ -1,6 +1,5 @@
-import time
 from typing import List, Callable
-from algorithms import SortingState, SortingAlgorithm, SortingStats
+from algorithms import SortingAlgorithm, SortingEvent, SortingOp, TrackedArray
 
 class SelectionSort(SortingAlgorithm):
     def name(self) -> str:
@@ -17,37 +16,18 @@ class SelectionSort(SortingAlgorithm):
     def space_complexity(self) -> str:
         return "O(1)"
     
-    def sort(self, arr: List[int], update_callback: Callable[[SortingState], None]) -> None:
-        stats = SortingStats(start_time=time.time())
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
+        arr = TrackedArray(arr, update_callback)
         n = len(arr)
         
         for i in range(n):
             min_idx = i
             for j in range(i + 1, n):
-                stats.comparisons += 1
-                if arr[j] < arr[min_idx]:
+                if arr.compare(j, min_idx) < 0:
                     min_idx = j
-                update_callback(SortingState(
-                    array=arr.copy(),
-                    compared_indices=[min_idx, j],
-                    highlighted_indices=[min_idx],
-                    sorted_indices=list(range(i)),
-                    stats=stats
-                ))
             
             if min_idx != i:
-                arr[i], arr[min_idx] = arr[min_idx], arr[i]
-                stats.swaps += 1
-                update_callback(SortingState(
-                    array=arr.copy(),
-                    highlighted_indices=[i, min_idx],
-                    sorted_indices=list(range(i + 1)),
-                    stats=stats
-                ))
+                arr.swap(i, min_idx)
+            arr.annotate(SortingOp.mark_sorted(i, i + 1))
         
-        stats.end_time = time.time()
-        update_callback(SortingState(
-            array=arr.copy(),
-            sorted_indices=list(range(len(arr))),
-            stats=stats
-        ))
\ No newline at end of file
+        arr.annotate(SortingOp.mark_sorted(0, n))
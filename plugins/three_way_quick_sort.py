@@ -0,0 +1,191 @@
+import random
+from typing import List, Callable, Tuple
+from algorithms import (AlgorithmOption, SortingAlgorithm, SortingEvent, SortingOp, TrackedArray,
+                        choose_pivot, heap_sort_range, insertion_sort_range)
+
+
+class ThreeWayQuickSort(SortingAlgorithm):
+    options = (
+        AlgorithmOption("partition", "Partitioning", ("bentley-mcilroy", "dutch flag")),
+        AlgorithmOption("pivot", "Pivot", ("median of 3", "ninther", "random")),
+        AlgorithmOption("cutoff", "Insertion sort cutoff", (16, 8, 32, 0)),
+        AlgorithmOption("fallback", "Depth limit fallback", ("heap sort", "none")),
+    )
+    
+    def name(self) -> str:
+        return "3-Way Quick Sort"
+    
+    @property
+    def description(self) -> str:
+        return ("Quick sort that splits each partition into elements less than, equal to and greater "
+                "than the pivot (Dutch national flag, or Bentley-McIlroy which gathers equal keys at "
+                "the ends and swaps them into the middle). The equal band is final and drops out of "
+                "the recursion, so inputs with k distinct values sort in O(n log k). Partitions past "
+                "2·log2(n) levels fall back to heap sort")
+    
+    @property
+    def time_complexity(self) -> str:
+        return "O(n log n) average, O(n log k) with k distinct keys, O(n log n) worst"
+    
+    @property
+    def space_complexity(self) -> str:
+        return "O(log n)"
+    
+    def _dutch_flag(self, arr: TrackedArray, low: int, high: int, pivot: int) -> Tuple[int, int]:
+        """
+        Partition arr[low:high] in one left-to-right pass (Dijkstra's Dutch national flag).
+        
+        Keeps arr[low:lt] < pivot, arr[lt:i] == pivot and arr[gt:high] > pivot,
+        with arr[i:gt] still to be classified. The equal band is shown as it grows.
+        
+        Returns:
+            Tuple[int, int]: The band of elements equal to the pivot, as [lt, gt)
+        """
+        lt, i, gt = low, low + 1, high
+        arr.marks = (SortingOp.pivot_range(lt, i),)
+        while i < gt:
+            c = arr.compare_value(i, pivot)
+            if c < 0:
+                # The first equal element moves to the end of the band
+                arr.marks = (SortingOp.pivot_range(lt + 1, i + 1),)
+                arr.swap(lt, i)
+                lt += 1
+                i += 1
+            elif c > 0:
+                gt -= 1
+                arr.swap(i, gt)
+            else:
+                i += 1
+                arr.marks = (SortingOp.pivot_range(lt, i),)
+        return lt, gt
+    
+    def _bentley_mcilroy(self, arr: TrackedArray, low: int, high: int, pivot: int) -> Tuple[int, int]:
+        """
+        Partition arr[low:high] with Bentley-McIlroy 3-way partitioning.
+        
+        A Hoare-style scan from both ends parks keys equal to the pivot at the
+        left and right ends of the partition, and the two end blocks are swapped
+        into the middle at the end. Each element is compared with the pivot once
+        per scan; the 3-way result tells whether it is equal without a second
+        comparison. The left block of equal keys is shown as it grows.
+        
+        Returns:
+            Tuple[int, int]: The band of elements equal to the pivot, as [lt, gt)
+        """
+        last = high - 1
+        i, j = low, high
+        # arr[low:p + 1] and arr[q:high] hold keys equal to the pivot
+        p, q = low, high
+        while True:
+            i += 1
+            ci = arr.compare_value(i, pivot)
+            while ci < 0 and i < last:
+                i += 1
+                ci = arr.compare_value(i, pivot)
+            j -= 1
+            cj = arr.compare_value(j, pivot)
+            while cj > 0:
+                # Stops at low at the latest, which holds a key equal to the pivot
+                j -= 1
+                cj = arr.compare_value(j, pivot)
+            if i == j and ci == 0:
+                p += 1
+                arr.marks = (SortingOp.pivot_range(low, p + 1),)
+                if p != i:
+                    arr.swap(p, i)
+            if i >= j:
+                break
+            arr.swap(i, j)
+            # The swapped elements were compared already: cj now describes arr[i]
+            if cj == 0:
+                p += 1
+                arr.marks = (SortingOp.pivot_range(low, p + 1),)
+                if p != i:
+                    arr.swap(p, i)
+            if ci == 0:
+                q -= 1
+                if q != j:
+                    arr.swap(q, j)
+        
+        # Swap the equal keys in from both ends
+        arr.marks = ()
+        i = j + 1
+        for k in range(low, p + 1):
+            if k != j:
+                arr.swap(k, j)
+            j -= 1
+        for k in range(last, q - 1, -1):
+            if k != i:
+                arr.swap(k, i)
+            i += 1
+        return j + 1, i
+    
+    def sort(self, arr: List[int], update_callback: Callable[[SortingEvent], None]) -> None:
+        # Comparisons, swaps, reads and writes are counted by the tracked array
+        arr = TrackedArray(arr, update_callback)
+        n = len(arr)
+        cutoff = self.settings["cutoff"]
+        strategy = self.settings["pivot"]
+        depth_limit = 2 * n.bit_length() if self.settings["fallback"] == "heap sort" else None
+        partition = (self._dutch_flag if self.settings["partition"] == "dutch flag"
+                     else self._bentley_mcilroy)
+        rng = random.Random()
+        
+        partitions = removed = max_removed = heap_sorts = insertion_sorts = 0
+        max_depth = max_stack = 0
+        
+        # Pending partitions as (low, high, depth); the larger side of every split
+        # waits here while the loop continues with the smaller one
+        stack = [(0, n, 0)]
+        while stack:
+            low, high, depth = stack.pop()
+            while high - low > 1:
+                max_depth = max(max_depth, depth)
+                if high - low <= cutoff:
+                    insertion_sort_range(arr, low, high)
+                    insertion_sorts += 1
+                    break
+                if depth_limit is not None and depth >= depth_limit:
+                    heap_sort_range(arr, low, high)
+                    heap_sorts += 1
+                    break
+                
+                pivot_index = choose_pivot(arr, low, high, strategy, rng)
+                if pivot_index != low:
+                    arr.swap(low, pivot_index)
+                pivot = arr[low]
+                arr.annotate(SortingOp.active(low, high), SortingOp.pivot(low))
+                lt, gt = partition(arr, low, high, pivot)
+                arr.marks = ()
+                # The equal band is in its final position and leaves the recursion
+                arr.annotate(SortingOp.pivot_range(lt, gt), SortingOp.mark_sorted(lt, gt))
+                partitions += 1
+                removed += gt - lt
+                max_removed = max(max_removed, gt - lt)
+                
+                depth += 1
+                if lt - low < high - gt:
+                    stack.append((gt, high, depth))
+                    high = lt
+                else:
+                    stack.append((low, lt, depth))
+                    low = gt
+                max_stack = max(max_stack, len(stack))
+            else:
+                if high - low == 1:
+                    arr.annotate(SortingOp.mark_sorted(low, high))
+        
+        self.metrics = {
+            "partitions": partitions,
+            "keys_removed_by_partitions": removed,
+            "mean_removed_per_partition": removed / partitions if partitions else 0.0,
+            "max_removed_by_a_partition": max_removed,
+            "max_depth": max_depth,
+            "depth_limit": depth_limit or 0,
+            "max_stack": max_stack,
+            "heap_sort_fallbacks": heap_sorts,
+            "insertion_sorts": insertion_sorts,
+        }
+        
+        # Show final state
+        arr.annotate(SortingOp.active(0, 0), SortingOp.mark_sorted(0, len(arr)))
@@ -0,0 +1,284 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from PyQt6.QtGui import QColor, QImage
+
+
+def _pixel(color: QColor) -> int:
+    """Convert a QColor to an opaque 0xAARRGGBB pixel value for Format_RGB32."""
+    return (color.rgb() & 0xFFFFFF) | 0xFF000000
+
+
+# The active region is underlined by a band this far below the baseline
+BAND_GAP = 4
+BAND_HEIGHT = 4
+
+
+class RasterRenderer:
+    """
+    Rasterize BARS and SCATTER frames with vectorized NumPy operations.
+
+    The array values and per-index status codes are kept in NumPy buffers that
+    are updated in place, and frames are written straight into a QImage sharing
+    its memory with a NumPy pixel buffer, so a frame costs a handful of vector
+    operations over n elements and width x height pixels instead of one
+    QPainter call per element.
+
+    When there are more elements than pixel columns the renderer switches to a
+    level-of-detail mode: each column is reduced to a min/max/mean envelope of
+    the elements mapped to it plus their most important status, and only the
+    columns touched by update() are recomputed, so a frame costs O(width).
+
+    Attributes:
+        values (np.ndarray): Mirrored array values
+        status (np.ndarray): STATUS_* code per index (higher is more important)
+        image (QImage): Last rendered frame, sharing memory with the pixel buffer
+    """
+
+    def __init__(self):
+        self.values = np.zeros(0, dtype=np.int64)
+        self.status = np.zeros(0, dtype=np.uint8)
+        self.image = None
+        self._pixels = None
+        
+        # Level-of-detail envelope: per-column reductions and the columns to refresh
+        self._starts = None
+        self._ends = None
+        self._envelope = None
+        self._dirty_columns = set()
+
+    def load(self, array: Sequence[int], status: bytearray) -> None:
+        """
+        Replace the buffers with a complete array and its status codes.
+
+        Args:
+            array: Array values
+            status: One status code per element
+        """
+        self.values = np.array(array, dtype=np.int64)
+        self.status = np.frombuffer(bytes(status), dtype=np.uint8).copy()
+        self._envelope = None
+
+    def update(self, lo: int, values: Sequence[int], status: bytearray) -> None:
+        """
+        Overwrite the buffers for the indices lo..lo+len(values)-1.
+
+        Args:
+            lo: First index to overwrite
+            values: New values
+            status: New status codes
+        """
+        hi = lo + len(values)
+        self.values[lo:hi] = values
+        self.status[lo:hi] = np.frombuffer(bytes(status), dtype=np.uint8)
+        if self._envelope is not None:
+            first = int(np.searchsorted(self._starts, lo, side="right")) - 1
+            last = int(np.searchsorted(self._starts, hi - 1, side="right")) - 1
+            self._dirty_columns.update(range(first, last + 1))
+
+    def envelope(self, columns: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Reduce the array to one envelope per pixel column.
+
+        The first call for a given column count is O(n); after that only the
+        columns touched by update() are recomputed.
+
+        Args:
+            columns: Number of pixel columns, smaller than the array length
+
+        Returns:
+            Tuple of per-column (min, max, mean, status) arrays, where status is
+            the most important code in the column (compared > highlighted > sorted)
+        """
+        n = len(self.values)
+        if self._envelope is None or len(self._starts) != columns:
+            self._starts = (np.arange(columns) * n) // columns
+            self._ends = np.append(self._starts[1:], n)
+            self._dirty_columns = set()
+            self._envelope = self._reduce(self._starts)
+        elif self._dirty_columns:
+            if len(self._dirty_columns) * 4 > columns:
+                self._envelope = self._reduce(self._starts)
+            else:
+                mins, maxs, sums, status = self._envelope
+                for c in self._dirty_columns:
+                    lo, hi = self._starts[c], self._ends[c]
+                    segment = self.values[lo:hi]
+                    mins[c] = segment.min()
+                    maxs[c] = segment.max()
+                    sums[c] = segment.sum()
+                    status[c] = self.status[lo:hi].max()
+            self._dirty_columns.clear()
+
+        mins, maxs, sums, status = self._envelope
+        return mins, maxs, sums // (self._ends - self._starts), status
+
+    def _reduce(self, starts: np.ndarray) -> list:
+        """Compute every column's (min, max, sum, status) in one vectorized pass."""
+        return [np.minimum.reduceat(self.values, starts),
+                np.maximum.reduceat(self.values, starts),
+                np.add.reduceat(self.values, starts),
+                np.maximum.reduceat(self.status, starts)]
+
+    def _begin(self, width: int, height: int, background: QColor) -> np.ndarray:
+        """Make sure the pixel buffer matches the widget size and clear it."""
+        if self._pixels is None or self._pixels.shape != (height, width):
+            self._pixels = np.empty((height, width), dtype=np.uint32)
+            # The QImage does not copy the buffer; self._pixels keeps it alive
+            self.image = QImage(self._pixels.data, width, height, width * 4,
+                                QImage.Format.Format_RGB32)
+        self._pixels.fill(_pixel(background))
+        return self._pixels
+
+    def _drawBand(self, pixels: np.ndarray, x0: int, x1: int, top: int, color: QColor) -> None:
+        """Fill the active-region band between pixel columns x0 and x1."""
+        height, width = pixels.shape
+        x0, x1 = max(0, x0), min(width, x1)
+        if x0 < x1 and 0 <= top < height:
+            pixels[top:min(height, top + BAND_HEIGHT), x0:x1] = _pixel(color)
+
+    def _envelopeSpan(self, band: Tuple[int, int]) -> Tuple[int, int]:
+        """Get the envelope columns holding any element of band (after envelope())."""
+        return (int(np.searchsorted(self._ends, band[0], side="right")),
+                int(np.searchsorted(self._starts, band[1], side="left")))
+
+    def renderBars(self, width: int, height: int, padding: int,
+                   colors: List[QColor], background: QColor,
+                   band: Optional[Tuple[int, int]] = None, band_color: QColor = None) -> QImage:
+        """
+        Rasterize the array as vertical bars.
+
+        When there are more elements than pixel columns, each column shows its
+        envelope: solid up to the column minimum, a dimmed band up to the
+        maximum and a brighter line at the mean, in the color of the most
+        important status in the column.
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+            padding: Horizontal padding on each side
+            colors: Color per status code
+            background: Background color
+            band: Optional (start, end) index range underlined below the baseline
+            band_color: Color of the band
+
+        Returns:
+            QImage: The rendered frame
+        """
+        pixels = self._begin(width, height, background)
+        n = len(self.values)
+        available_width = width - 2 * padding
+        if n == 0 or available_width <= 0:
+            return self.image
+
+        max_val = max(int(self.values.max()), 1)
+        base = height - 30
+        scale = height - 60
+        rows = np.arange(height)[:, None]
+        palette = np.array([_pixel(c) for c in colors], dtype=np.uint32)
+
+        if n > available_width:
+            self._renderBarsEnvelope(pixels, available_width, padding, base,
+                                     scale, max_val, rows, colors, palette)
+            if band:
+                x0, x1 = self._envelopeSpan(band)
+                self._drawBand(pixels, padding + x0, padding + x1, base + BAND_GAP, band_color)
+            return self.image
+
+        bar_width = available_width // n
+        if band:
+            self._drawBand(pixels, padding + band[0] * bar_width, padding + band[1] * bar_width,
+                           base + BAND_GAP, band_color)
+        gap = min(1, int(bar_width * 0.1))
+        columns = np.arange(n * bar_width)
+        element = columns // bar_width
+        heights = self.values[element]
+        status = self.status[element]
+        # Leave the gap on both sides of every bar empty
+        offset = columns % bar_width
+        heights = np.where((offset < gap) | (offset >= bar_width - gap), 0, heights)
+
+        tops = base - (heights * scale // max_val)
+        mask = (rows >= tops[None, :]) & (rows < base)
+        target = pixels[:, padding:padding + len(columns)]
+        np.copyto(target, palette[status][None, :], where=mask)
+        return self.image
+
+    def _renderBarsEnvelope(self, pixels, columns, padding, base, scale, max_val,
+                            rows, colors, palette) -> QImage:
+        """Draw one min/max/mean envelope bar per pixel column."""
+        mins, maxs, means, status = self.envelope(columns)
+        top_min = (base - mins * scale // max_val)[None, :]
+        top_max = (base - maxs * scale // max_val)[None, :]
+        top_mean = (base - means * scale // max_val)[None, :]
+        dim = np.array([_pixel(c.darker(170)) for c in colors], dtype=np.uint32)
+        bright = np.array([_pixel(c.lighter(140)) for c in colors], dtype=np.uint32)
+
+        target = pixels[:, padding:padding + columns]
+        np.copyto(target, dim[status][None, :], where=(rows >= top_max) & (rows < top_min))
+        np.copyto(target, palette[status][None, :], where=(rows >= top_min) & (rows < base))
+        np.copyto(target, bright[status][None, :], where=(rows == top_mean) & (top_mean < top_min))
+        return self.image
+
+    def renderScatter(self, width: int, height: int, padding: int,
+                      colors: List[QColor], background: QColor,
+                      band: Optional[Tuple[int, int]] = None, band_color: QColor = None) -> QImage:
+        """
+        Rasterize the array as one pixel per element.
+
+        Elements are plotted in order of increasing status so compared and
+        highlighted points are never hidden under ordinary ones. With more
+        elements than pixel columns, each column instead shows a dimmed line
+        from its minimum to its maximum and a bright point at the mean.
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+            padding: Horizontal padding on each side
+            colors: Color per status code
+            background: Background color
+            band: Optional (start, end) index range underlined below the baseline
+            band_color: Color of the band
+
+        Returns:
+            QImage: The rendered frame
+        """
+        pixels = self._begin(width, height, background)
+        n = len(self.values)
+        available_width = width - 2 * padding
+        if n == 0 or available_width <= 0:
+            return self.image
+
+        max_val = max(int(self.values.max()), 1)
+        scale = height - 60
+        if n > available_width:
+            mins, maxs, means, status = self.envelope(available_width)
+            rows = np.arange(height)[:, None]
+            top_max = ((height - 30) - maxs * scale // max_val)[None, :]
+            top_min = ((height - 30) - mins * scale // max_val)[None, :]
+            top_mean = ((height - 30) - means * scale // max_val)[None, :]
+            dim = np.array([_pixel(c.darker(170)) for c in colors], dtype=np.uint32)
+            bright = np.array([_pixel(c.lighter(140)) for c in colors], dtype=np.uint32)
+            target = pixels[:, padding:padding + available_width]
+            np.copyto(target, dim[status][None, :], where=(rows >= top_max) & (rows <= top_min))
+            np.copyto(target, bright[status][None, :], where=rows == top_mean)
+            if band:
+                x0, x1 = self._envelopeSpan(band)
+                self._drawBand(pixels, padding + x0, padding + x1, height - 30 + BAND_GAP,
+                               band_color)
+            return self.image
+
+        index = np.arange(n)
+        if n > 1:
+            xs = padding + (index * (available_width - 1)) // (n - 1)
+        else:
+            xs = np.full(1, padding + available_width // 2)
+        ys = (height - 30) - (self.values * scale // max_val)
+        np.clip(ys, 0, height - 1, out=ys)
+        if band:
+            self._drawBand(pixels, int(xs[band[0]]), int(xs[band[1] - 1]) + 1,
+                           height - 30 + BAND_GAP, band_color)
+
+        order = np.argsort(self.status, kind="stable")
+        palette = np.array([_pixel(c) for c in colors], dtype=np.uint32)
+        pixels[ys[order], xs[order]] = palette[self.status[order]]
+        return self.image
@@ -0,0 +1,822 @@
+"""
+Operation traces: a sorting run recorded once and played back at any rate.
+
+Recording runs the plugin at full speed and stores every event it reports as
+compact arrays of operations. Playing the trace back yields the same events
+through the steps() protocol, so the GUI can pace a run to a fixed duration
+while the algorithm itself never waits.
+
+Traces can also be written to disk with TraceWriter and replayed with
+TraceFile, which memory-maps the file instead of reading it. The file layout
+(all integers little-endian) is:
+
+    header      TRACE_HEADER: magic, version, flags, keyframe interval K,
+                array length n, operation and event counts, algorithm name
+    initial     n int64 values
+    blocks      K operation records of RECORD_BYTES each, followed by a
+                keyframe of keyframe_bytes(n), repeated; the last block may
+                be partial and has no keyframe
+
+An operation record is its kind byte, with EVENT_END set on the last operation
+of each event, and its two int64 operands. A keyframe holds the number of
+operations applied when it was taken, the active range, the array values and
+a bitmap of the sorted indices.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from operator import attrgetter, itemgetter
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from algorithms import (EventBatch, IntervalSet, OperationAdapter, OpKind, SortingEvent,
+                        SortingOp, SortingStats, SortingStep, StateMirror)
+
+# OpKind members by value, to decode the stored kind codes
+_KINDS = sorted(OpKind)
+_operands = itemgetter(1, 2)
+_SWAP, _WRITE, _REVERSE = int(OpKind.SWAP), int(OpKind.WRITE), int(OpKind.REVERSE)
+
+TRACE_MAGIC = b"SORTTRC\0"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<8sHHIqqq64s")
+KEYFRAME_HEADER = struct.Struct("<qqq")
+
+# Header flag set when the writer was closed at the end of a finished run
+FLAG_COMPLETE = 1
+
+# Set in a record's kind byte on the last operation of an event
+EVENT_END = 0x80
+
+# Fixed-width operation record: kind byte and two operands, unpadded
+RECORD = np.dtype([("kind", "u1"), ("a", "<i8"), ("b", "<i8")])
+RECORD_BYTES = RECORD.itemsize
+
+# Keyframe spacing in operations: at least KEYFRAME_MIN_OPS, and KEYFRAME_SPACING
+# times the array length so keyframes stay a few percent of the file
+KEYFRAME_MIN_OPS = 1 << 16
+KEYFRAME_SPACING = 16
+
+# Write buffer of a TraceWriter; records are appended, never rewritten
+WRITE_BUFFER = 1 << 20
+
+# Operations a TraceFile decodes at a time while replaying
+DECODE_OPS = 1 << 16
+
+# Bytes a Timeline may take, half for its log and half for its checkpoints, and
+# the checkpoint interval in operations until that budget forces checkpoints
+# further apart
+TIMELINE_BUDGET = 256 << 20
+CHECKPOINT_OPS = 1 << 12
+
+# Operations that change the array or its regions; a seek skips all others
+_MUTATING = np.array([OpKind.SWAP, OpKind.WRITE, OpKind.REVERSE, OpKind.MARK_SORTED,
+                      OpKind.UNMARK_SORTED, OpKind.ACTIVE], dtype=np.uint8)
+# Region operations cannot be undone from the operation alone
+_REGION_OPS = frozenset((OpKind.MARK_SORTED, OpKind.UNMARK_SORTED, OpKind.ACTIVE))
+
+
+def keyframe_bytes(n: int) -> int:
+    """Size of a keyframe for an array of n elements."""
+    return KEYFRAME_HEADER.size + 8 * n + (n + 7) // 8
+
+
+class OperationTrace:
+    """
+    A sorting run recorded as flat arrays of operations.
+
+    Every event the plugin reported is stored as the operations it stands for
+    (legacy SortingState snapshots are diffed into operations while recording):
+    one byte for the kind and two 64-bit operands per operation, i.e. 17 bytes
+    instead of a SortingOp object, plus 8 bytes per event for its boundary.
+
+    Attributes:
+        initial (List[int]): Array before the first operation
+        kinds (array): OpKind code of every operation
+        operands (array): The (a, b) operands of every operation, interleaved
+        ends (array): Number of operations recorded up to the end of each event
+    """
+
+    def __init__(self, initial: Iterable[int]):
+        """
+        Args:
+            initial: Array the recorded run starts from (copied)
+        """
+        self.initial = list(initial)
+        self.kinds = array("B")
+        self.operands = array("q")
+        self.ends = array("q")
+        # Diffs legacy snapshots and keeps the counters of the recorded run
+        self._adapter = OperationAdapter(self.initial)
+
+    def __len__(self) -> int:
+        """Number of recorded events."""
+        return len(self.ends)
+
+    @property
+    def ops(self) -> int:
+        """Number of recorded operations."""
+        return len(self.kinds)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the recorded operations in bytes."""
+        return (len(self.kinds) * self.kinds.itemsize
+                + len(self.operands) * self.operands.itemsize
+                + len(self.ends) * self.ends.itemsize)
+
+    @property
+    def stats(self) -> SortingStats:
+        """Counters accumulated over the recorded operations."""
+        return self._adapter.mirror.stats
+
+    def record(self, event: SortingEvent) -> None:
+        """
+        Append an event; usable as a plugin's update callback or a SortDriver sink.
+
+        Args:
+            event: SortingOp, list of SortingOp or legacy SortingState
+        """
+        self._append(self._adapter(event), event)
+
+    def _append(self, ops: List[SortingOp], event: SortingEvent) -> None:
+        """Store the operations an event was converted into."""
+        offset = len(self.kinds)
+        self.kinds.extend(map(itemgetter(0), ops))
+        self.operands.extend(chain.from_iterable(map(_operands, ops)))
+        if isinstance(event, EventBatch):
+            # Keep the boundaries of the events merged into the batch
+            self.ends.extend([offset + end for end in event.ends])
+        else:
+            self.ends.append(len(self.kinds))
+
+    def decode(self, start: int, stop: int) -> List[SortingOp]:
+        """
+        Rebuild the operations of a range of events.
+
+        Args:
+            start: First event
+            stop: Event after the last one
+
+        Returns:
+            List[SortingOp]: Their operations, in order
+        """
+        ends = self.ends
+        lo = ends[start - 1] if start else 0
+        hi = ends[stop - 1] if stop > start else lo
+        operands = self.operands
+        return list(map(SortingOp, map(_KINDS.__getitem__, self.kinds[lo:hi]),
+                        operands[2 * lo:2 * hi:2], operands[2 * lo + 1:2 * hi:2]))
+
+    def batch(self, start: int, stop: int) -> EventBatch:
+        """
+        Rebuild a range of events as one step.
+
+        Args:
+            start: First event
+            stop: Event after the last one
+
+        Returns:
+            EventBatch: Their operations, with the event boundaries
+        """
+        step = EventBatch()
+        step.extend(self.decode(start, stop))
+        offset = self.ends[start - 1] if start else 0
+        step.ends = [end - offset for end in self.ends[start:stop]]
+        return step
+
+    def steps(self) -> Iterator[EventBatch]:
+        """
+        Play the trace back, following the protocol of SortingAlgorithm.steps().
+
+        The number of events wanted per step can be sent to the generator, as
+        with callback_steps(); it defaults to one.
+
+        Yields:
+            EventBatch: The operations of the next events
+        """
+        batch = 1
+        event = 0
+        total = len(self.ends)
+        while event < total:
+            stop = min(total, event + batch)
+            step = self.batch(event, stop)
+            event = stop
+            requested = yield step
+            if requested is not None:
+                batch = max(1, requested)
+
+
+class Checkpoint(NamedTuple):
+    """
+    Copy of a Timeline's mirror after a number of events.
+
+    Attributes:
+        event (int): Events applied
+        op (int): Operations applied
+        overwritten (int): WRITE operations applied, i.e. logged overwritten values
+        array (list): The array
+        sorted_runs (List[Tuple[int, int]]): Runs marked as sorted
+        active_range (range): Active range, if any
+        counts (Tuple[int, int, int, int]): Comparisons, swaps, reads and writes
+    """
+    event: int
+    op: int
+    overwritten: int
+    array: list
+    sorted_runs: List[Tuple[int, int]]
+    active_range: Optional[range]
+    counts: Tuple[int, int, int, int]
+
+
+class Timeline(OperationTrace):
+    """
+    A run that can be rewound: the operation log plus periodic checkpoints.
+
+    The timeline sits between a SortDriver and its sink. play() wraps the
+    algorithm's generator and step() applies every event to the timeline's
+    mirror, recording it while the mirror is at the end of the log. After a
+    seek back, play() replays logged events until it reaches the end of the
+    log again, so a resumed run carries on from wherever the cursor was left.
+
+    Every interval operations a checkpoint copies the mirror. When the
+    checkpoints would outgrow half the memory budget the interval doubles and
+    every other checkpoint is dropped, so seek() costs O(n + interval): restore
+    the nearest checkpoint, then replay at most interval operations. When the
+    log outgrows the other half, the older half of it is forgotten and the
+    timeline starts at a checkpoint further on; events keep their numbers
+    relative to that start. step_back() undoes the last event in place, using
+    the values logged for its writes.
+
+    Attributes:
+        cursor (int): Events applied to the mirror, counted from the start of the log
+        dropped (int): Events forgotten before the start of the log
+        budget (int): Bytes the log and the checkpoints may take
+        interval (int): Operations between checkpoints
+        checkpoints (List[Checkpoint]): Checkpoints in event order, the first at event 0
+        overwritten (array): Value replaced by every recorded WRITE operation
+    """
+
+    def __init__(self, initial: Iterable[int], budget: int = TIMELINE_BUDGET):
+        """
+        Args:
+            initial: Array the run starts from (copied)
+            budget: Bytes the log and the checkpoints may take
+        """
+        super().__init__(initial)
+        self.cursor = 0
+        self.dropped = 0
+        self.budget = budget
+        self.interval = CHECKPOINT_OPS
+        self.checkpoints = []
+        self.overwritten = array("q")
+        # Entries of overwritten that belong to the events before the cursor
+        self._writes = 0
+        self._checkpoint()
+
+    @property
+    def mirror(self) -> StateMirror:
+        """State after cursor events; seeks update it in place."""
+        return self._adapter.mirror
+
+    @property
+    def origin(self) -> Checkpoint:
+        """
+        State at event 0 of the log.
+
+        Until events are forgotten this is the run's input, which stays in
+        initial either way.
+        """
+        return self.checkpoints[0]
+
+    @property
+    def live(self) -> bool:
+        """Whether the cursor is at the end of the log, so new events get recorded."""
+        return self.cursor == len(self.ends)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the log, the overwritten values and the checkpoints in bytes."""
+        return (super().nbytes + len(self.overwritten) * self.overwritten.itemsize
+                + sum(sys.getsizeof(checkpoint.array) for checkpoint in self.checkpoints))
+
+    def play(self, events: Iterator[SortingEvent]) -> Iterator[SortingEvent]:
+        """
+        Pull events through the timeline, following the protocol of SortingAlgorithm.steps().
+
+        Every event yielded must be passed to step() before the next one is
+        requested.
+
+        Args:
+            events: Generator returned by SortingAlgorithm.steps()
+
+        Yields:
+            SortingEvent: Logged events while the cursor is behind the end of
+            the log, then the algorithm's own
+        """
+        request = None
+        started = False
+        try:
+            while True:
+                if self.cursor < len(self.ends):
+                    event = self.batch(self.cursor,
+                                       min(len(self.ends), self.cursor + (request or 1)))
+                else:
+                    try:
+                        # A generator only takes a value once it has started
+                        event = events.send(request) if started else next(events)
+                    except StopIteration:
+                        return
+                    started = True
+                request = yield event
+        finally:
+            events.close()
+
+    def step(self, event: SortingEvent) -> SortingStep:
+        """
+        Apply an event at the cursor; usable as a SortDriver sink.
+
+        Args:
+            event: SortingOp, list of SortingOp or legacy SortingState
+
+        Returns:
+            SortingStep: Operations plus the counters after applying them
+        """
+        if self.cursor < len(self.ends):
+            # Replayed from the log by play(), so there is nothing to record
+            replaced = []
+            ops = self._adapter(event, replaced)
+            self._writes += len(replaced)
+            self.cursor += event.events if event.__class__ is EventBatch else 1
+        else:
+            ops = self._adapter(event, self.overwritten)
+            self._append(ops, event)
+            self._writes = len(self.overwritten)
+            self.cursor = len(self.ends)
+            if len(self.kinds) - self.checkpoints[-1].op >= self.interval:
+                self._checkpoint()
+        stats = self.mirror.stats
+        return SortingStep(ops, stats.comparisons, stats.swaps,
+                           reads=stats.reads, writes=stats.writes)
+
+    def keyframe(self) -> SortingStep:
+        """Get a step carrying the complete state at the cursor, for consumers to resynchronize."""
+        stats = self.mirror.stats
+        return SortingStep([], stats.comparisons, stats.swaps, keyframe=self.mirror.snapshot(),
+                           reads=stats.reads, writes=stats.writes)
+
+    def _checkpoint(self) -> None:
+        """Copy the mirror, thinning the checkpoints out if they exceed the budget."""
+        mirror = self.mirror
+        stats = mirror.stats
+        self.checkpoints.append(Checkpoint(
+            len(self.ends), len(self.kinds), len(self.overwritten), mirror.array[:],
+            mirror.sorted_runs.runs, mirror.active_range,
+            (stats.comparisons, stats.swaps, stats.reads, stats.writes)))
+        log = super().nbytes + len(self.overwritten) * self.overwritten.itemsize
+        if log > self.budget // 2:
+            # Keep the newer half of the log, from the checkpoint before its middle
+            index = bisect_left(self.checkpoints, len(self.kinds) // 2, key=attrgetter("op")) - 1
+            if index > 0:
+                self._forget(self.checkpoints[index])
+        size = sys.getsizeof(self.checkpoints[0].array)
+        if len(self.checkpoints) > 2 and len(self.checkpoints) * size > self.budget // 2:
+            self.interval *= 2
+            self.checkpoints = self.checkpoints[::2]
+
+    def _forget(self, start: Checkpoint) -> None:
+        """Drop the log before a checkpoint, which becomes event 0 of the timeline."""
+        del self.kinds[:start.op]
+        del self.operands[:2 * start.op]
+        del self.overwritten[:start.overwritten]
+        ends = array("q")
+        ends.frombytes((np.frombuffer(self.ends, dtype=np.int64)[start.event:]
+                        - start.op).tobytes())
+        self.ends = ends
+        self.checkpoints = [checkpoint._replace(event=checkpoint.event - start.event,
+                                                op=checkpoint.op - start.op,
+                                                overwritten=checkpoint.overwritten - start.overwritten)
+                            for checkpoint in self.checkpoints
+                            if checkpoint.event >= start.event]
+        self.cursor -= start.event
+        self._writes -= start.overwritten
+        self.dropped += start.event
+
+    def seek(self, event: int) -> None:
+        """
+        Move the cursor to any event, restoring the nearest checkpoint before it.
+
+        Args:
+            event: Number of events to have applied, clamped to the log
+        """
+        event = max(0, min(len(self.ends), event))
+        # The last event is applied on its own so its marks show, which needs
+        # a checkpoint strictly before it
+        index = max(0, bisect_left(self.checkpoints, event, key=attrgetter("event")) - 1)
+        checkpoint = self.checkpoints[index]
+        mirror = self.mirror
+        mirror.array[:] = checkpoint.array
+        mirror.sorted_runs = IntervalSet(checkpoint.sorted_runs)
+        mirror.active_range = checkpoint.active_range
+        stats = mirror.stats
+        stats.comparisons, stats.swaps, stats.reads, stats.writes = checkpoint.counts
+        mirror.begin_step()
+        self._writes = checkpoint.overwritten
+        self.cursor = event
+        if event > checkpoint.event:
+            self._replay(checkpoint.op, self.ends[event - 2] if event > 1 else 0)
+            replaced = []
+            mirror.apply_step(self.decode(event - 1, event), overwritten=replaced)
+            self._writes += len(replaced)
+
+    def _replay(self, start: int, stop: int) -> None:
+        """Apply operations start..stop-1 to the array, regions and counters only."""
+        if stop <= start:
+            return
+        mirror = self.mirror
+        arr = mirror.array
+        kinds = np.frombuffer(self.kinds, dtype=np.uint8, count=stop - start, offset=start)
+        operands = np.frombuffer(self.operands, dtype=np.int64, count=2 * (stop - start),
+                                 offset=16 * start).reshape(-1, 2)
+        # The counters follow from the kinds, as in SortingStats.count()
+        counts = np.bincount(kinds, minlength=len(_KINDS)).tolist()
+        reversed_lengths = np.diff(operands[kinds == OpKind.REVERSE], axis=1)
+        accesses = operands[kinds == OpKind.ACCESS].sum(axis=0).tolist()
+        stats = mirror.stats
+        stats.comparisons += counts[OpKind.COMPARE]
+        stats.swaps += counts[OpKind.SWAP] + int((reversed_lengths // 2).sum())
+        stats.reads += accesses[0]
+        stats.writes += (2 * counts[OpKind.SWAP] + counts[OpKind.WRITE]
+                         + int(reversed_lengths.sum()) + accesses[1])
+        self._writes += counts[OpKind.WRITE]
+
+        changes = np.flatnonzero(np.isin(kinds, _MUTATING))
+        apply = mirror.apply
+        for kind, a, b in zip(kinds[changes].tolist(), operands[changes, 0].tolist(),
+                              operands[changes, 1].tolist()):
+            if kind == _SWAP:
+                arr[a], arr[b] = arr[b], arr[a]
+            elif kind == _WRITE:
+                arr[a] = b
+            else:
+                apply(SortingOp(_KINDS[kind], a, b), count=False)
+
+    def _undo(self, ops: List[SortingOp], count: bool = True) -> None:
+        """Revert the array changes of an event's operations, and optionally their counts."""
+        arr = self.mirror.array
+        overwritten = self.overwritten
+        writes = self._writes
+        undone = SortingStats()
+        for op in reversed(ops):
+            kind, a, b = op
+            if kind == _SWAP:
+                arr[a], arr[b] = arr[b], arr[a]
+            elif kind == _WRITE:
+                writes -= 1
+                arr[a] = overwritten[writes]
+            elif kind == _REVERSE:
+                arr[a:b] = arr[a:b][::-1]
+            if count:
+                undone.count(op)
+        self._writes = writes
+        if count:
+            stats = self.mirror.stats
+            stats.comparisons -= undone.comparisons
+            stats.swaps -= undone.swaps
+            stats.reads -= undone.reads
+            stats.writes -= undone.writes
+
+    def step_back(self) -> None:
+        """Undo the last event applied, moving the cursor back by one."""
+        event = self.cursor
+        if event == 0:
+            return
+        ops = self.decode(event - 1, event)
+        if any(op.kind in _REGION_OPS for op in ops):
+            # What a region covered before is not in the log; a checkpoint knows
+            self.seek(event - 1)
+            return
+        self._undo(ops)
+        self.cursor = event - 1
+        mirror = self.mirror
+        mirror.begin_step()
+        if event > 1:
+            # Redo the event before, so the marks on display are its own;
+            # reapplying its region operations changes nothing
+            previous = self.decode(event - 2, event - 1)
+            self._undo(previous, count=False)
+            replaced = []
+            mirror.apply_step(previous, count=False, overwritten=replaced)
+            self._writes += len(replaced)
+
+
+class TraceWriter:
+    """
+    Record a sorting run to a binary trace file with buffered appends.
+
+    The writer keeps its own mirror of the array, so it can be attached to any
+    stream of events (as an update callback or SortDriver sink) and write a
+    keyframe of the mirrored state at every block boundary. Events without
+    operations are not stored. The header counts are only final after close(),
+    and only close(complete=True) marks the trace as replayable.
+
+    Attributes:
+        path (str): File being written
+        name (str): Name of the recorded algorithm
+        n (int): Array length
+        keyframe_ops (int): Operations between keyframes
+        ops (int): Operations written so far
+        events (int): Events written so far
+    """
+
+    def __init__(self, path: str, initial: Iterable[int], name: str = "",
+                 keyframe_ops: Optional[int] = None):
+        """
+        Args:
+            path: File to create (overwritten if it exists)
+            initial: Array the recorded run starts from
+            name: Name of the algorithm, stored in the header
+            keyframe_ops: Operations between keyframes; derived from the array
+                length if not given
+        """
+        initial = list(initial)
+        self.path = path
+        self.name = name
+        self.n = len(initial)
+        self.keyframe_ops = keyframe_ops or max(KEYFRAME_MIN_OPS, KEYFRAME_SPACING * self.n)
+        self.ops = 0
+        self.events = 0
+        self._adapter = OperationAdapter(initial)
+        self._file = open(path, "wb", buffering=WRITE_BUFFER)
+        self._write_header(0)
+        self._file.write(np.asarray(initial, dtype="<i8").tobytes())
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(complete=exc_type is None)
+
+    def _write_header(self, flags: int) -> None:
+        self._file.write(TRACE_HEADER.pack(
+            TRACE_MAGIC, TRACE_VERSION, flags, self.keyframe_ops, self.n,
+            self.ops, self.events, self.name.encode("utf-8")[:64]))
+
+    def record(self, event: SortingEvent) -> None:
+        """
+        Append an event; usable as a plugin's update callback or a SortDriver sink.
+
+        Args:
+            event: SortingOp, list of SortingOp or legacy SortingState
+        """
+        ops = self._adapter(event)
+        if not ops:
+            return
+        records = np.empty(len(ops), dtype=RECORD)
+        records["kind"] = array("B", map(itemgetter(0), ops))
+        operands = np.frombuffer(array("q", chain.from_iterable(map(_operands, ops))),
+                                 dtype=np.int64)
+        records["a"] = operands[0::2]
+        records["b"] = operands[1::2]
+        if isinstance(event, EventBatch):
+            # Empty events of the batch collapse into their neighbours
+            ends = np.unique(np.asarray(event.ends, dtype=np.int64))
+            ends = ends[ends > 0]
+        else:
+            ends = np.array([len(ops)])
+        records["kind"][ends - 1] |= EVENT_END
+        self.events += len(ends)
+
+        # Fill the current block, then a keyframe of the state after this event
+        data = records.tobytes()
+        start = 0
+        while start < len(ops):
+            room = self.keyframe_ops - self.ops % self.keyframe_ops
+            stop = min(len(ops), start + room)
+            self._file.write(data[start * RECORD_BYTES:stop * RECORD_BYTES])
+            self.ops += stop - start
+            start = stop
+            if self.ops % self.keyframe_ops == 0:
+                # The mirror already holds the whole event, so the keyframe is
+                # past the block end when the event carries on into the next block
+                self._write_keyframe(self.ops + len(ops) - start)
+
+    def _write_keyframe(self, applied: int) -> None:
+        """Write the mirrored state, reached after the given number of operations."""
+        mirror = self._adapter.mirror
+        active = mirror.active_range or range(0, 0)
+        sorted_bits = np.zeros(self.n, dtype=bool)
+        for start, end in mirror.sorted_runs.runs:
+            sorted_bits[start:end] = True
+        self._file.write(KEYFRAME_HEADER.pack(applied, active.start, active.stop))
+        self._file.write(np.asarray(mirror.array, dtype="<i8").tobytes())
+        self._file.write(np.packbits(sorted_bits).tobytes())
+
+    def close(self, complete: bool = True) -> None:
+        """
+        Flush the records and finalize the header.
+
+        Args:
+            complete: Whether the recorded run finished; the file of a cancelled
+                or failed run keeps its counts but is refused by TraceFile
+        """
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._write_header(FLAG_COMPLETE if complete else 0)
+        self._file.close()
+
+
+class TraceFile:
+    """
+    A trace file opened for replay through a read-only memory map.
+
+    Only the header and the initial array are read when the file is opened;
+    operation records and keyframes are paged in as they are replayed, so a
+    trace larger than memory replays in constant space.
+
+    Attributes:
+        path (str): File being replayed
+        name (str): Name of the recorded algorithm
+        initial (List[int]): Array before the first operation
+        n (int): Array length
+        ops (int): Number of recorded operations
+        events (int): Number of recorded events
+        keyframe_ops (int): Operations between keyframes
+        keyframes (int): Number of keyframes, one after every full block
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Trace file written by TraceWriter
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If it is not a complete trace file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+
+    def _read_header(self) -> None:
+        if len(self._map) < TRACE_HEADER.size:
+            raise ValueError(f"{self.path} is not a sort trace")
+        magic, version, flags, keyframe_ops, n, ops, events, name = \
+            TRACE_HEADER.unpack_from(self._map)
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{self.path} is not a sort trace")
+        if version != TRACE_VERSION:
+            raise ValueError(f"{self.path} has unsupported trace version {version}")
+        if not flags & FLAG_COMPLETE:
+            raise ValueError(f"{self.path} is incomplete, its recording did not finish")
+        self.name = name.rstrip(b"\0").decode("utf-8", "replace")
+        self.n = n
+        self.ops = ops
+        self.events = events
+        self.keyframe_ops = keyframe_ops
+        self._data = TRACE_HEADER.size + 8 * n
+        self._block = keyframe_ops * RECORD_BYTES + keyframe_bytes(n)
+        self.keyframes = ops // keyframe_ops
+        size = self._data + ops * RECORD_BYTES + self.keyframes * keyframe_bytes(n)
+        if len(self._map) < size:
+            raise ValueError(f"{self.path} is truncated")
+        self.initial = np.frombuffer(self._map, dtype="<i8", count=n,
+                                     offset=TRACE_HEADER.size).tolist()
+
+    def __enter__(self) -> "TraceFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of recorded events."""
+        return self.events
+
+    def _records(self, start: int, stop: int) -> np.ndarray:
+        """Copy the records of operations start..stop-1 out of the map."""
+        parts = []
+        while start < stop:
+            block, offset = divmod(start, self.keyframe_ops)
+            end = min(stop, start + self.keyframe_ops - offset)
+            parts.append(np.frombuffer(
+                self._map, dtype=RECORD, count=end - start,
+                offset=self._data + block * self._block + offset * RECORD_BYTES))
+            start = end
+        # Copies, so no view keeps the map from being closed
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+
+    @staticmethod
+    def _decode(records: np.ndarray) -> List[SortingOp]:
+        kinds = map(_KINDS.__getitem__, (records["kind"] & ~np.uint8(EVENT_END)).tolist())
+        return list(map(SortingOp, kinds, records["a"].tolist(), records["b"].tolist()))
+
+    def read_ops(self, start: int, stop: int) -> List[SortingOp]:
+        """
+        Rebuild a range of operations.
+
+        Args:
+            start: First operation
+            stop: Operation after the last one
+
+        Returns:
+            List[SortingOp]: The operations, in order
+        """
+        return self._decode(self._records(max(0, start), min(self.ops, stop)))
+
+    def keyframe(self, index: int) -> Tuple[int, StateMirror]:
+        """
+        Load a keyframe.
+
+        Args:
+            index: Keyframe number, below self.keyframes
+
+        Returns:
+            Tuple of the number of operations applied before it and a mirror
+            holding its array, sorted runs and active range
+        """
+        offset = self._data + index * self._block + self.keyframe_ops * RECORD_BYTES
+        applied, active_start, active_stop = KEYFRAME_HEADER.unpack_from(self._map, offset)
+        offset += KEYFRAME_HEADER.size
+        mirror = StateMirror(np.frombuffer(self._map, dtype="<i8", count=self.n,
+                                           offset=offset).tolist())
+        bits = np.unpackbits(np.frombuffer(self._map, dtype=np.uint8, count=(self.n + 7) // 8,
+                                           offset=offset + 8 * self.n), count=self.n)
+        edges = np.flatnonzero(np.diff(bits, prepend=0, append=0)).tolist()
+        mirror.sorted_runs = IntervalSet(zip(edges[0::2], edges[1::2]))
+        if active_stop > active_start:
+            mirror.active_range = range(active_start, active_stop)
+        return applied, mirror
+
+    def restore(self, ops: int) -> StateMirror:
+        """
+        Rebuild the state after a number of operations from the nearest keyframe.
+
+        Costs O(n + keyframe_ops) however far into the trace the state is;
+        the counters of the restored mirror start from zero.
+
+        Args:
+            ops: Number of operations to apply
+
+        Returns:
+            StateMirror: The array and its regions at that point
+        """
+        ops = max(0, min(self.ops, ops))
+        # Keyframe i is taken at or after operation (i + 1) * keyframe_ops
+        for index in range(min(ops // self.keyframe_ops, self.keyframes) - 1, -1, -1):
+            applied, mirror = self.keyframe(index)
+            if applied <= ops:
+                break
+        else:
+            applied, mirror = 0, StateMirror(self.initial)
+        mirror.apply_step(self.read_ops(applied, ops), count=False)
+        return mirror
+
+    def steps(self) -> Iterator[EventBatch]:
+        """
+        Play the trace back, following the protocol of SortingAlgorithm.steps().
+
+        The number of events wanted per step can be sent to the generator, as
+        with callback_steps(); it defaults to one.
+
+        Yields:
+            EventBatch: The operations of the next events
+        """
+        batch = 1
+        step = EventBatch()
+        for chunk in range(0, self.ops, DECODE_OPS):
+            records = self._records(chunk, min(self.ops, chunk + DECODE_OPS))
+            ends = (np.flatnonzero(records["kind"] & EVENT_END) + 1).tolist()
+            ops = self._decode(records)
+            # An event may continue into the next chunk; its head stays in step
+            start = 0
+            i = 0
+            while i < len(ends):
+                take = ends[i:i + batch - len(step.ends)]
+                offset = len(step) - start
+                step.extend(ops[start:take[-1]])
+                step.ends.extend([end + offset for end in take])
+                start = take[-1]
+                i += len(take)
+                if len(step.ends) >= batch:
+                    requested = yield step
+                    if requested is not None:
+                        batch = max(1, requested)
+                    step = EventBatch()
+            step.extend(ops[start:])
+        if step:
+            yield step
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._map.close()